@@ -0,0 +1,96 @@
+"""initial schema
+
+The tables as Base.metadata.create_all created them before migrations existed.
+Databases created that way are stamped at this revision by init_db().
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:20:47.701622
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'rakes',
+        sa.Column('id', sa.String(length=20), nullable=False),
+        sa.Column('wagons', sa.Integer(), nullable=False),
+        sa.Column('capacity', sa.Float(), nullable=False),
+        sa.Column('utilization', sa.Float(), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('transit_progress', sa.Float(), nullable=True),
+        sa.Column('origin', sa.String(length=100), nullable=True),
+        sa.Column('freight_type', sa.String(length=100), nullable=True),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('departure_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('eta', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('arrival_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_rakes_id', 'rakes', ['id'])
+
+    op.create_table(
+        'orders',
+        sa.Column('id', sa.String(length=20), nullable=False),
+        sa.Column('customer_name', sa.String(length=100), nullable=False),
+        sa.Column('material', sa.String(length=100), nullable=False),
+        sa.Column('quantity', sa.Float(), nullable=False),
+        sa.Column('destination', sa.String(length=100), nullable=False),
+        sa.Column('origin', sa.String(length=100), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('expected_delivery_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('rake_id', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['rake_id'], ['rakes.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_orders_id', 'orders', ['id'])
+
+    op.create_table(
+        'stockyards',
+        sa.Column('stockyard_id', sa.String(), nullable=False),
+        sa.Column('material', sa.String(), nullable=True),
+        sa.Column('capacity', sa.Float(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('stockyard_id')
+    )
+    op.create_index('ix_stockyards_stockyard_id', 'stockyards', ['stockyard_id'])
+
+    op.create_table(
+        'optimization_results',
+        sa.Column('task_id', sa.String(), nullable=False),
+        sa.Column('rake_id', sa.String(), nullable=True),
+        sa.Column('plan', sa.JSON(), nullable=True),
+        sa.Column('total_cost', sa.Float(), nullable=True),
+        sa.Column('iteration', sa.Integer(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('num_orders', sa.Integer(), nullable=True),
+        sa.Column('num_stockyards', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('error_message', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index('ix_optimization_results_task_id', 'optimization_results', ['task_id'])
+
+def downgrade():
+    op.drop_index('ix_optimization_results_task_id', table_name='optimization_results')
+    op.drop_table('optimization_results')
+    op.drop_index('ix_stockyards_stockyard_id', table_name='stockyards')
+    op.drop_table('stockyards')
+    op.drop_index('ix_orders_id', table_name='orders')
+    op.drop_table('orders')
+    op.drop_index('ix_rakes_id', table_name='rakes')
+    op.drop_table('rakes')
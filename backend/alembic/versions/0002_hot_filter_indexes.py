@@ -0,0 +1,35 @@
+"""hot filter indexes
+
+Composite indexes for the order, rake and stockyard list filters and the
+simulation's fleet queries. The trailing primary key keeps filtered pages in
+index order.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:30:12.415903
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+ACTIVE_RAKES = sa.text("status != 'Idle'")
+
+def upgrade():
+    op.create_index('ix_orders_status_priority', 'orders', ['status', 'priority', 'id'])
+    op.create_index('ix_orders_priority', 'orders', ['priority', 'id'])
+    op.create_index('ix_orders_rake_id', 'orders', ['rake_id', 'id'])
+    op.create_index('ix_rakes_status', 'rakes', ['status', 'id'])
+    op.create_index('ix_rakes_active', 'rakes', ['id'], sqlite_where=ACTIVE_RAKES, postgresql_where=ACTIVE_RAKES)
+    op.create_index('ix_stockyards_material', 'stockyards', ['material', 'stockyard_id'])
+
+def downgrade():
+    op.drop_index('ix_stockyards_material', table_name='stockyards')
+    op.drop_index('ix_rakes_active', table_name='rakes')
+    op.drop_index('ix_rakes_status', table_name='rakes')
+    op.drop_index('ix_orders_rake_id', table_name='orders')
+    op.drop_index('ix_orders_priority', table_name='orders')
+    op.drop_index('ix_orders_status_priority', table_name='orders')
@@ -0,0 +1,21 @@
+"""order status paging index
+
+Status-filtered order pages are read in ID order for keyset paging; (status, id)
+returns them pre-sorted instead of sorting every matching order.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:41:05.207316
+"""
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_orders_status', 'orders', ['status', 'id'])
+
+def downgrade():
+    op.drop_index('ix_orders_status', table_name='orders')
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pydantic_settings import BaseSettings
 from typing import Optional, Dict, Any, List
 import pathlib
@@ -6,6 +7,11 @@ import pathlib
 # Get the root directory
 ROOT_DIR = pathlib.Path(__file__).parent.parent.parent.absolute()
 
+def _optional_int(name: str) -> Optional[int]:
+    # Unset or empty means "use the engine profile's value"
+    value = os.getenv(name)
+    return int(value) if value else None
+
 class Settings(BaseSettings):
     # API settings
     API_V1_STR: str = "/api"
@@ -26,10 +32,60 @@ class Settings(BaseSettings):
     DATABASE_HOST: str = os.getenv("DATABASE_HOST", "localhost")
     DATABASE_PORT: str = os.getenv("DATABASE_PORT", "5432")
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # Comma-separated read replica URLs; read-only services go to them in turn, empty sends all reads to the primary
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # Threads serving database work for async routes; keep it at or below the connection pool size
+    DB_EXECUTOR_WORKERS: int = int(os.getenv("DB_EXECUTOR_WORKERS", "8"))
+    # Named engine profile (see ENGINE_PROFILES in core/database.py); empty picks one from ENVIRONMENT
+    DB_PROFILE: str = os.getenv("DB_PROFILE", "")
+    # Overrides for the profile's connection pool (PostgreSQL) and pragmas (SQLite)
+    DB_POOL_SIZE: Optional[int] = _optional_int("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: Optional[int] = _optional_int("DB_MAX_OVERFLOW")
+    DB_POOL_RECYCLE: Optional[int] = _optional_int("DB_POOL_RECYCLE")
+    DB_POOL_TIMEOUT: Optional[int] = _optional_int("DB_POOL_TIMEOUT")
+    SQLITE_JOURNAL_MODE: Optional[str] = os.getenv("SQLITE_JOURNAL_MODE") or None
+    SQLITE_SYNCHRONOUS: Optional[str] = os.getenv("SQLITE_SYNCHRONOUS") or None
+    SQLITE_MMAP_SIZE: Optional[int] = _optional_int("SQLITE_MMAP_SIZE")
+    SQLITE_CACHE_SIZE: Optional[int] = _optional_int("SQLITE_CACHE_SIZE")
+    # Compiled SQL statements kept per engine
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = _optional_int("DB_STATEMENT_CACHE_SIZE")
+    # Log every SQL statement; independent of DEBUG because it is very noisy
+    SQL_ECHO: bool = os.getenv("SQL_ECHO", "False").lower() == "true"
+    # Orders, rakes and stockyards cached per entity type for single-entity reads; 0 disables the cache
+    ENTITY_CACHE_SIZE: int = int(os.getenv("ENTITY_CACHE_SIZE", "1024"))
+    # Seconds a cached entity is served; bounds staleness from writes made by other workers
+    ENTITY_CACHE_TTL_SECONDS: float = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", "30"))
+    # Commit order, rake and stockyard writes from concurrent requests together in one transaction
+    GROUP_COMMIT_ENABLED: bool = os.getenv("GROUP_COMMIT_ENABLED", "False").lower() == "true"
+    # How long the first write of a batch waits for others to join, and the most writes per batch
+    GROUP_COMMIT_WINDOW_MS: float = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "5"))
+    GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
     
     # ML settings
     MODEL_PATH: str = os.getenv("MODEL_PATH", "app/ml/models/")
     
+    # Simulation settings
+    # "inprocess" for a single worker, "unix" to share one simulation across uvicorn workers
+    SIMULATION_BACKPLANE: str = os.getenv("SIMULATION_BACKPLANE", "inprocess")
+    SIMULATION_BACKPLANE_PATH: str = os.getenv(
+        "SIMULATION_BACKPLANE_PATH", os.path.join(tempfile.gettempdir(), "rakevision-simulation.sock")
+    )
+    # What the simulation loop does with ticks missed after an overrun: "skip" or "catch_up"
+    SIMULATION_TICK_POLICY: str = os.getenv("SIMULATION_TICK_POLICY", "skip")
+    # Directory for the append-only tick recording used by replay; opt-in because the
+    # recording grows without bound while the simulation runs (empty disables it)
+    SIMULATION_RECORDING_DIR: str = os.getenv("SIMULATION_RECORDING_DIR", "")
+    # Directory for the latest full simulation checkpoint restored on startup; empty disables checkpoints
+    SIMULATION_CHECKPOINT_DIR: str = os.getenv(
+        "SIMULATION_CHECKPOINT_DIR", os.path.join(tempfile.gettempdir(), "rakevision-checkpoints")
+    )
+    # Wall-clock seconds between checkpoints while the simulation runs
+    SIMULATION_CHECKPOINT_SECONDS: float = float(os.getenv("SIMULATION_CHECKPOINT_SECONDS", "30"))
+    # Worker processes the fleet is split across; 0 or 1 runs the simulation in-process
+    SIMULATION_SHARDS: int = int(os.getenv("SIMULATION_SHARDS", "0"))
+    # How rakes are assigned to shards: "hash" of the rake ID or whole "corridor" routes
+    SIMULATION_SHARD_PARTITION: str = os.getenv("SIMULATION_SHARD_PARTITION", "hash")
+    
     def __init__(self, **values: Any):
         super().__init__(**values)
         
@@ -1,48 +1,198 @@
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import Engine, create_engine, event, inspect
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
+import asyncio
+import functools
+import itertools
 import logging
+import os
 
-from app.core.config import settings
+from app.core.config import ROOT_DIR, settings
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# SQLite-specific options
-connect_args = {}
-if settings.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
-    connect_args = {"check_same_thread": False}
+# Named engine profiles; Settings overrides any value that is set
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # SQLAlchemy and SQLite defaults, kept as a baseline for benchmarks
+    "default": {},
+    # Local SQLite: WAL lets readers run alongside the simulation's writes
+    "development": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,  # negative values are KiB, so 64 MB
+        "statement_cache_size": 1000
+    },
+    # Small devices running SQLite: same durability, smaller memory footprint
+    "edge": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 32 * 1024 * 1024,
+        "cache_size": -8000,
+        "statement_cache_size": 500
+    },
+    # PostgreSQL behind several uvicorn workers
+    "production": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_recycle": 1800,
+        "pool_timeout": 30,
+        "statement_cache_size": 1000
+    }
+}
+
+def engine_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve a named engine profile with the Settings overrides applied
+    
+    Raises:
+        ValueError: If the profile does not exist
+    """
+    name = name or settings.DB_PROFILE or ("production" if settings.ENVIRONMENT.lower() == "production" else "development")
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile: {name}")
+    overrides = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+    }
+    return {"name": name, **ENGINE_PROFILES[name], **{key: value for key, value in overrides.items() if value is not None}}
+
+def create_db_engine(uri: str, profile: Optional[Dict[str, Any]] = None, echo: Optional[bool] = None) -> Engine:
+    """
+    Create an engine configured by a resolved engine profile
+    
+    Pool settings apply to server databases; pragmas are set on every new SQLite connection.
+    """
+    profile = profile if profile is not None else engine_profile()
+    options: Dict[str, Any] = {
+        "pool_pre_ping": True,
+        "echo": settings.SQL_ECHO if echo is None else echo
+    }
+    if "statement_cache_size" in profile:
+        options["query_cache_size"] = profile["statement_cache_size"]
+    
+    is_sqlite = uri.startswith("sqlite")
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        for key in ("pool_size", "max_overflow", "pool_recycle", "pool_timeout"):
+            if key in profile:
+                options[key] = profile[key]
     
+    db_engine = create_engine(uri, **options)
+    
+    pragmas = [(key, profile[key]) for key in ("journal_mode", "synchronous", "mmap_size", "cache_size") if key in profile]
+    if is_sqlite and pragmas:
+        @event.listens_for(db_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for key, value in pragmas:
+                    cursor.execute(f"PRAGMA {key}={value}")
+            finally:
+                cursor.close()
+    
+    return db_engine
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
-    connect_args=connect_args,
-    echo=settings.DEBUG
-)
+engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas and their session factories, in round-robin order (see configure_replicas)
+replica_engines: List[Engine] = []
+ReplicaSessions: List[sessionmaker] = []
+_replica_turn = itertools.count()
+
+# Set for the rest of a request once it has written to the primary, so its
+# later reads see the write instead of a replica that may lag behind
+pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+def configure_replicas(uris: Sequence[str]):
+    """
+    Replace the read replica engines; an empty list routes every read to the primary
+    """
+    global replica_engines, ReplicaSessions
+    old_engines = replica_engines
+    replica_engines = [create_db_engine(uri) for uri in uris]
+    ReplicaSessions = [sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in replica_engines]
+    for replica in old_engines:
+        replica.dispose()
+
+def read_sessionmaker() -> sessionmaker:
+    """
+    Session factory for read-only work: the next replica, or the primary if
+    the current request is pinned to it or no replicas are configured
+    """
+    if not ReplicaSessions or pinned_to_primary.get():
+        return SessionLocal
+    return ReplicaSessions[next(_replica_turn) % len(ReplicaSessions)]
+
+def read_engine() -> Engine:
+    """
+    Engine for read-only work outside a session, chosen like read_sessionmaker
+    """
+    return read_sessionmaker().kw["bind"]
+
+def pin_to_primary():
+    """
+    Send the current request's remaining reads to the primary
+    """
+    pinned_to_primary.set(True)
+
+configure_replicas([uri.strip() for uri in settings.DATABASE_REPLICA_URLS.split(",") if uri.strip()])
+
+@event.listens_for(SessionLocal, "after_commit")
+def mark_primary_write(session: Session):
+    # Lets run_db pin the request after a service commits on the primary
+    session.info["committed"] = True
+
 # Create base class for ORM models
 Base = declarative_base()
 
+# Revision that matches databases created by Base.metadata.create_all before migrations existed
+BASELINE_REVISION = "0001"
+
+def run_migrations():
+    """
+    Upgrade the schema to the latest Alembic revision
+    
+    Databases created by create_all (tables but no alembic_version) are
+    stamped at the baseline first, so only the later migrations run on them.
+    """
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT_DIR, "alembic"))
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        existing_tables = inspect(connection).get_table_names()
+        logger.info(f"Existing tables: {existing_tables}")
+        if existing_tables and "alembic_version" not in existing_tables:
+            logger.info(f"Stamping unversioned database at revision {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+
 # Function to create all tables
 def init_db():
     try:
-        # Import all models to ensure they're registered with Base
-        # This must be imported here to avoid circular imports
-        from app.models import rake, order, inventory, optimization
-        
-        # Check if tables exist before creating them
-        inspector = inspect(engine)
-        
-        existing_tables = inspector.get_table_names()
-        logger.info(f"Existing tables: {existing_tables}")
-        
-        # Create tables if they don't exist
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
+        # Schema changes go through the migrations in backend/alembic
+        run_migrations()
+        logger.info("Database schema is up to date")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
@@ -53,4 +203,98 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+T = TypeVar("T")
+
+# Session.info key set while the group-commit writer owns the session's transaction
+GROUP_COMMIT_CALLBACKS = "group_commit_callbacks"
+
+def commit(db: Session, *on_commit: Callable[[], None]):
+    """
+    Commit a service's changes, then run the on_commit callbacks (e.g. cache invalidation)
+    
+    Inside a group-commit batch the changes are only flushed; the batch commits
+    them together with its other writes and runs the callbacks afterwards.
+    """
+    callbacks = db.info.get(GROUP_COMMIT_CALLBACKS)
+    if callbacks is None:
+        db.commit()
+        for callback in on_commit:
+            callback()
+    else:
+        db.flush()
+        callbacks.extend(on_commit)
+
+# Blocking session work from async routes runs here instead of on the event loop,
+# so queries never stall the simulation ticks and WebSocket broadcasts
+db_executor = ThreadPoolExecutor(max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run fn(db, *args, **kwargs) with its own primary session on the database thread pool
+    
+    The session is opened, used and closed on the same worker thread. If fn
+    commits, the rest of the request reads from the primary.
+    """
+    result, committed = await _run_in_session(SessionLocal, fn, args, kwargs)
+    if committed:
+        pin_to_primary()
+    return result
+
+async def run_db_read(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a read-only fn(db, *args, **kwargs) with a session from read_sessionmaker
+    """
+    result, _ = await _run_in_session(read_sessionmaker(), fn, args, kwargs)
+    return result
+
+async def _run_in_session(session_factory: sessionmaker, fn: Callable[..., T], args, kwargs):
+    def call():
+        db = session_factory()
+        try:
+            return fn(db, *args, **kwargs), db.info.get("committed", False)
+        finally:
+            db.close()
+    return await asyncio.get_running_loop().run_in_executor(db_executor, call)
+
+def awaitable(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Awaitable variant of a service function whose first argument is the Session
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_db(fn, *args, **kwargs)
+    return wrapper
+
+def read_only(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Awaitable variant of a read-only service function; runs on a read replica when one is configured
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_db_read(fn, *args, **kwargs)
+    return wrapper
+
+async def iterate_db(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """
+    Drive a blocking iterator (e.g. a streaming query) on the database thread pool
+    
+    The iterator is closed on the pool too, so an abandoned stream still
+    releases its connection.
+    """
+    loop = asyncio.get_running_loop()
+    done = object()
+    try:
+        while True:
+            item = await loop.run_in_executor(db_executor, next, iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await loop.run_in_executor(db_executor, close)
+
+def shutdown_db_executor():
+    db_executor.shutdown(wait=True)
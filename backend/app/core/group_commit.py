@@ -0,0 +1,202 @@
+import asyncio
+import functools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.database import GROUP_COMMIT_CALLBACKS, SessionLocal, db_executor, pin_to_primary, run_db
+
+T = TypeVar("T")
+
+# Batch sizes counted per bucket: 1, 2-4, 5-16, 17-64 and more than 64 writes
+BATCH_SIZE_BUCKETS = (1, 4, 16, 64)
+
+@dataclass
+class PendingWrite:
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: Dict[str, Any]
+    future: asyncio.Future
+    result: Any = None
+    error: Optional[BaseException] = None
+    callbacks: List[Callable[[], None]] = field(default_factory=list)
+
+class GroupCommitWriter:
+    """
+    Commits writes that arrive within a short window in one transaction
+    
+    Each write is a service mutator fn(db, ...) that commits through
+    database.commit(). In a batch, every write runs in its own savepoint, so a
+    failing write only fails its own caller; the batch then commits once (one
+    fsync) and each caller's awaitable resolves. If the batch commit itself
+    fails, its writes are retried one transaction each.
+    """
+    
+    def __init__(self, window_ms: Optional[float] = None, max_batch: Optional[int] = None, session_factory=SessionLocal):
+        self.window = (settings.GROUP_COMMIT_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch = settings.GROUP_COMMIT_MAX_BATCH if max_batch is None else max_batch
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.fallbacks = 0
+        self.max_batch_size = 0
+        self.last_batch_size = 0
+        self.last_commit_ms = 0.0
+        self.size_histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+    
+    async def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run fn(db, *args, **kwargs) in the next batch and return its result once the batch commits
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(PendingWrite(fn, args, kwargs, future))
+        return await future
+    
+    async def stop(self):
+        """
+        Commit the writes already queued and stop the writer
+        """
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                # Take what is already queued without waiting, then wait out the window
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                await loop.run_in_executor(db_executor, self._commit_batch, batch)
+            except Exception as e:
+                logging.error(f"Group commit batch failed: {e}")
+                for write in batch:
+                    if write.error is None:
+                        write.error = e
+            for write in batch:
+                if write.future.done():
+                    continue
+                if write.error is not None:
+                    write.future.set_exception(write.error)
+                else:
+                    write.future.set_result(write.result)
+    
+    def _commit_batch(self, batch: List[PendingWrite]):
+        started = time.perf_counter()
+        # Results outlive the session, so keep their loaded state after the commit
+        db = self.session_factory(expire_on_commit=False)
+        committed: List[PendingWrite] = []
+        try:
+            for write in batch:
+                db.info[GROUP_COMMIT_CALLBACKS] = write.callbacks
+                try:
+                    with db.begin_nested():
+                        write.result = write.fn(db, *write.args, **write.kwargs)
+                except Exception as e:
+                    write.error = e
+                    write.callbacks.clear()
+                    continue
+                committed.append(write)
+            db.info.pop(GROUP_COMMIT_CALLBACKS, None)
+            
+            try:
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logging.error(f"Group commit of {len(committed)} writes failed, retrying them one by one: {e}")
+                self.fallbacks += 1
+                for write in committed:
+                    self._commit_alone(write)
+            else:
+                for write in committed:
+                    for callback in write.callbacks:
+                        callback()
+        finally:
+            db.close()
+        self._record(len(batch), sum(write.error is not None for write in batch), time.perf_counter() - started)
+    
+    def _commit_alone(self, write: PendingWrite):
+        write.result, write.error = None, None
+        db = self.session_factory()
+        try:
+            write.result = write.fn(db, *write.args, **write.kwargs)
+        except Exception as e:
+            db.rollback()
+            write.error = e
+        finally:
+            db.close()
+    
+    def _record(self, size: int, failed: int, seconds: float):
+        self.batches += 1
+        self.writes += size
+        self.failed += failed
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.last_batch_size = size
+        self.last_commit_ms = seconds * 1000
+        bucket = next((i for i, limit in enumerate(BATCH_SIZE_BUCKETS) if size <= limit), len(BATCH_SIZE_BUCKETS))
+        self.size_histogram[bucket] += 1
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Batch counts and sizes since startup
+        """
+        labels = [f"<={limit}" for limit in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        return {
+            "enabled": settings.GROUP_COMMIT_ENABLED,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "writes": self.writes,
+            "failed_writes": self.failed,
+            "fallback_batches": self.fallbacks,
+            "mean_batch_size": self.writes / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "last_batch_size": self.last_batch_size,
+            "last_commit_ms": self.last_commit_ms,
+            "batch_size_histogram": dict(zip(labels, self.size_histogram))
+        }
+
+group_commit_writer = GroupCommitWriter()
+
+def batched(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Awaitable variant of a service mutator; goes through the group-commit writer when enabled
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        if settings.GROUP_COMMIT_ENABLED:
+            result = await group_commit_writer.submit(fn, *args, **kwargs)
+            pin_to_primary()
+            return result
+        return await run_db(fn, *args, **kwargs)
+    return wrapper
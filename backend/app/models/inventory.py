@@ -1,10 +1,13 @@
-from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy import Column, String, Float, DateTime, Index
 from sqlalchemy.sql import func
 
 from app.core.database import Base
 
 class Inventory(Base):
     __tablename__ = "stockyards"
+    __table_args__ = (
+        Index("ix_stockyards_material", "material", "stockyard_id"),
+    )
     
     stockyard_id = Column(String, primary_key=True, index=True)
     material = Column(String)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -6,6 +6,14 @@ from app.core.database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Order list filters (status, status and priority, priority); id last for keyset paging
+        Index("ix_orders_status", "status", "id"),
+        Index("ix_orders_status_priority", "status", "priority", "id"),
+        Index("ix_orders_priority", "priority", "id"),
+        # The simulation's first-order-per-rake lookup
+        Index("ix_orders_rake_id", "rake_id", "id"),
+    )
     
     id = Column(String(20), primary_key=True, index=True)
     customer_name = Column(String(100), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -6,6 +6,11 @@ from app.core.database import Base
 
 class Rake(Base):
     __tablename__ = "rakes"
+    __table_args__ = (
+        Index("ix_rakes_status", "status", "id"),
+        # Partial index over the active fleet the simulation loads (status != 'Idle')
+        Index("ix_rakes_active", "id", sqlite_where=text("status != 'Idle'"), postgresql_where=text("status != 'Idle'")),
+    )
     
     id = Column(String(20), primary_key=True, index=True)
     wagons = Column(Integer, nullable=False, default=0)
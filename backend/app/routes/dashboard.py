@@ -1,21 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException
 from typing import List
 
-from app.core.database import get_db
 from app.schemas.report_schema import DashboardOverview
-from app.services.dashboard_service import get_dashboard_metrics, get_dashboard_charts
+from app.services.dashboard_service import get_dashboard_metrics_async, get_dashboard_charts_async
 
 router = APIRouter()
 
 @router.get("/dashboard/overview", response_model=DashboardOverview)
-async def get_dashboard_overview(db: Session = Depends(get_db)):
+async def get_dashboard_overview():
     """
     Get metrics for dashboard (rake count, utilization, dispatch volume, ETA accuracy)
     """
     try:
-        metrics = get_dashboard_metrics(db)
-        charts = get_dashboard_charts(db)
+        metrics = await get_dashboard_metrics_async()
+        charts = await get_dashboard_charts_async()
         
         return {
             "metrics": metrics,
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.utils.entity_cache import entity_etag, not_modified
+from app.utils.pagination import cursor_key
 from app.schemas.inventory_schema import Inventory, InventoryCreate, InventoryUpdate
-from app.services.inventory_service import get_stockyard, get_all_stockyards, create_stockyard, update_stockyard, delete_stockyard
+from app.services.inventory_service import (
+    get_stockyard_async, get_stockyard_rows_async, stockyard_projection, create_stockyard_async, update_stockyard_async, delete_stockyard_async
+)
 
 router = APIRouter()
 
@@ -13,63 +15,70 @@ async def read_stockyards(
     skip: int = 0, 
     limit: int = 100, 
     material: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (instead of skip)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; all fields by default")
 ):
     """
     Get all stockyards with optional material filter
+    
+    Full pages return an X-Next-Cursor header; pass it as cursor to get the next page.
+    Rows are selected as plain tuples and encoded directly, without ORM or Pydantic objects.
     """
-    stockyards = get_all_stockyards(db, skip=skip, limit=limit, material=material)
-    return stockyards
+    after = cursor_key("stockyards", cursor, skip)
+    names = stockyard_projection.fields(fields)
+    rows = await get_stockyard_rows_async(stockyard_projection.select_columns(names), skip=skip, limit=limit,
+                                          material=material, after=after)
+    return stockyard_projection.response(names, rows, "stockyards", limit)
 
 @router.get("/inventory/stockyards/{stockyard_id}", response_model=Inventory)
 async def read_stockyard(
-    stockyard_id: str = Path(..., description="The ID of the stockyard to get"),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    stockyard_id: str = Path(..., description="The ID of the stockyard to get")
 ):
     """
     Get a single stockyard by ID
+    
+    Responses carry an ETag; send it back as If-None-Match to get 304 Not Modified when unchanged.
     """
-    stockyard = get_stockyard(db, stockyard_id=stockyard_id)
+    stockyard = await get_stockyard_async(stockyard_id=stockyard_id)
     if stockyard is None:
         raise HTTPException(status_code=404, detail="Stockyard not found")
+    etag = entity_etag(stockyard)
+    if not_modified(request, response, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     return stockyard
 
 @router.post("/inventory/stockyards", response_model=Inventory)
 async def add_stockyard(
-    stockyard: InventoryCreate,
-    db: Session = Depends(get_db)
+    stockyard: InventoryCreate
 ):
     """
     Add a new stockyard
     """
-    return create_stockyard(db=db, stockyard=stockyard)
+    return await create_stockyard_async(stockyard=stockyard)
 
 @router.put("/inventory/stockyards/{stockyard_id}", response_model=Inventory)
 async def update_existing_stockyard(
     stockyard_id: str,
-    stockyard: InventoryUpdate,
-    db: Session = Depends(get_db)
+    stockyard: InventoryUpdate
 ):
     """
     Update an existing stockyard
     """
-    db_stockyard = get_stockyard(db, stockyard_id=stockyard_id)
+    db_stockyard = await update_stockyard_async(stockyard_id=stockyard_id, stockyard=stockyard)
     if db_stockyard is None:
         raise HTTPException(status_code=404, detail="Stockyard not found")
-    
-    return update_stockyard(db=db, stockyard_id=stockyard_id, stockyard=stockyard)
+    return db_stockyard
 
 @router.delete("/inventory/stockyards/{stockyard_id}", response_model=dict)
 async def delete_existing_stockyard(
-    stockyard_id: str,
-    db: Session = Depends(get_db)
+    stockyard_id: str
 ):
     """
     Delete an existing stockyard
     """
-    db_stockyard = get_stockyard(db, stockyard_id=stockyard_id)
+    db_stockyard = await delete_stockyard_async(stockyard_id=stockyard_id)
     if db_stockyard is None:
         raise HTTPException(status_code=404, detail="Stockyard not found")
-    
-    delete_stockyard(db=db, stockyard_id=stockyard_id)
     return {"success": True, "message": f"Stockyard {stockyard_id} deleted"}
\ No newline at end of file
@@ -1,24 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, Request
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, Request, Query
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import asyncio
 import random
 import logging
 from datetime import datetime
 
 from app.core.database import get_db
-from app.services.simulation_service import get_live_positions, get_simulation_config, get_active_rakes, active_connections, broadcast_update, start_simulation_loop
+from app.services.simulation_service import get_simulation_config, active_connections, connection_encodings, connection_subscriptions, remove_connection, DEFAULT_SUBSCRIPTION, publish_update, current_snapshot, request_control, submit_event, replay_range, get_replay, stream_replay, REPLAY_SPEED, tick_statistics, set_client_rate, client_statistics, connection_rates
+from app.utils.binary_frames import negotiate_subprotocol, encoding_for_subprotocol, encode_message
+from app.utils.serialization import send_frame
+from app.simulation.subscriptions import Subscription, filter_positions
+from app.simulation.rates import parse_max_fps
 
 router = APIRouter()
 
 @router.get("/simulation/live")
-async def get_live_simulation_data(db: Session = Depends(get_db)):
+async def get_live_simulation_data():
     """
     Get real-time rake positions for the simulation map
     """
     try:
-        positions = get_live_positions(db)
-        return positions
+        # Served from the current tick's snapshot rather than a database scan
+        return (await current_snapshot()).positions
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get live simulation data: {str(e)}")
 
@@ -34,30 +38,13 @@ async def get_simulation_configuration(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to get simulation configuration: {str(e)}")
 
 @router.get("/simulation/active-rakes")
-async def get_active_rakes(db: Session = Depends(get_db)):
+async def get_active_rakes():
     """
     Get all currently active rakes for the simulation
     """
     try:
-        # Convert from service data format to expected frontend format
-        positions = get_live_positions(db)
-        rakes = []
-        
-        for rake in positions["rakes"]:
-            # Format to match frontend expectations
-            rakes.append({
-                "id": rake["rake_id"],
-                "from": "Bokaro",  # Hardcoded for now
-                "to": rake["destination"],
-                "progress": random.randint(10, 95) if rake["status"] == "moving" else 
-                            (0 if rake["status"] == "idle" else 50),
-                "status": "In Transit" if rake["status"] == "moving" else
-                          "Loading" if rake["status"] == "loading" else "Idle",
-                "departureTime": datetime.now().strftime("%H:%M %p"),
-                "eta": datetime.fromisoformat(rake["eta"]).strftime("%H:%M %p") if rake["eta"] else "N/A"
-            })
-        
-        return rakes
+        # The snapshot's rake cards are already in the frontend format
+        return (await current_snapshot()).rake_cards
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get active rakes: {str(e)}")
         
@@ -74,11 +61,14 @@ async def start_simulation(request: Request, db: Session = Depends(get_db)):
         # Log simulation start
         logging.info(f"Starting simulation with speed_factor={speed_factor}, include_random_events={include_random_events}")
         
-        # Start the simulation loop in a background task
-        asyncio.create_task(start_simulation_loop(db, speed_factor, include_random_events))
+        # Start the simulation loop on the producer worker
+        await request_control("start", {
+            "speed_factor": speed_factor,
+            "include_random_events": include_random_events
+        })
         
         # Broadcast to all connected clients that simulation is starting
-        asyncio.create_task(broadcast_update("simulation_started", {
+        asyncio.create_task(publish_update("simulation_started", {
             "speed_factor": speed_factor,
             "include_random_events": include_random_events,
             "message": "Simulation started"
@@ -110,40 +100,79 @@ async def handle_simulation_event(request: Request, db: Session = Depends(get_db
         # Log the event
         logging.info(f"Simulation event received: {event_type} for rake {rake_id} with details {details}")
         
-        # Process different types of events
-        if event_type == "breakdown":
-            # Simulate a rake breakdown
-            # In a real implementation, you would update the rake status in the database
+        # Queue the event for the simulation; only the affected rakes are recomputed
+        try:
+            affected = await submit_event(event_type, rake_id, details)
+        except ValueError as e:
             return {
-                "status": "success",
-                "message": f"Breakdown event processed for rake {rake_id}",
-                "impact": "Rake stopped, ETA updated"
+                "status": "warning",
+                "message": str(e)
             }
+        
+        if event_type == "breakdown":
+            impact = "Rake stopped, ETA updated"
         elif event_type == "delay":
-            # Simulate a delay
-            delay_minutes = details.get("minutes", 30)
-            return {
-                "status": "success",
-                "message": f"Delay event processed for rake {rake_id}",
-                "impact": f"ETA extended by {delay_minutes} minutes"
-            }
-        elif event_type == "weather":
-            # Simulate weather impact
-            severity = details.get("severity", "medium")
-            return {
-                "status": "success",
-                "message": f"Weather event ({severity}) processed",
-                "impact": "Multiple rakes affected, speeds reduced"
-            }
+            impact = f"ETA extended by {details.get('minutes', 30)} minutes"
         else:
-            return {
-                "status": "warning",
-                "message": f"Unknown event type: {event_type}"
-            }
+            impact = f"{affected} rakes affected, speeds reduced"
+        
+        return {
+            "status": "success",
+            "message": f"{event_type.capitalize()} event processed" + (f" for rake {rake_id}" if rake_id else ""),
+            "impact": impact,
+            "rakes_affected": affected
+        }
     except Exception as e:
         logging.error(f"Failed to process simulation event: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to process simulation event: {str(e)}")
         
+@router.get("/simulation/metrics")
+async def get_simulation_metrics():
+    """
+    Get tick timing histograms (advance, encode, fan-out, persist) and schedule lag
+    """
+    try:
+        return tick_statistics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get simulation metrics: {str(e)}")
+
+@router.get("/simulation/clients")
+async def get_simulation_clients():
+    """
+    Get connected clients on this worker with their frame-rate limits and effective rates
+    """
+    try:
+        return client_statistics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get simulation clients: {str(e)}")
+
+@router.get("/simulation/replay/range")
+async def get_replay_range():
+    """
+    Time range and number of ticks available for replay
+    """
+    try:
+        return replay_range()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get replay range: {str(e)}")
+
+@router.get("/simulation/replay")
+async def get_replay_ticks(
+    start: Optional[datetime] = Query(None, description="First wall-clock time to replay"),
+    end: Optional[datetime] = Query(None, description="Last wall-clock time to replay"),
+    step: int = Query(1, ge=1, description="Return every step-th tick"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of ticks")
+):
+    """
+    Get recorded fleet ticks for a time range from the memory-mapped tick log
+    """
+    try:
+        return get_replay(start, end, step, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get replay: {str(e)}")
+
+CONTROL_MESSAGES = {"pause": "paused", "resume": "resumed", "stop": "stopped"}
+
 @router.post("/simulation/control")
 async def control_simulation(request: Request):
     """
@@ -162,45 +191,53 @@ async def control_simulation(request: Request):
         # Log the control action
         logging.info(f"Simulation control: {action}")
         
-        # Process the control action
-        if action == "pause":
-            # In a real implementation, you would pause the simulation loop
-            return {
-                "status": "success",
-                "message": "Simulation paused",
-                "state": "paused"
-            }
-        elif action == "resume":
-            # In a real implementation, you would resume the simulation loop
-            return {
-                "status": "success",
-                "message": "Simulation resumed",
-                "state": "running"
-            }
-        else:  # stop
-            # In a real implementation, you would stop the simulation and reset
-            return {
-                "status": "success",
-                "message": "Simulation stopped",
-                "state": "stopped"
-            }
+        # Process the control action (forwarded to the producer worker if needed)
+        state = await request_control(action)
+        return {
+            "status": "success",
+            "message": f"Simulation {CONTROL_MESSAGES[action]}",
+            "state": state
+        }
     except Exception as e:
         logging.error(f"Failed to control simulation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to control simulation: {str(e)}")
 
+async def snapshot_frame(subscription: Subscription, encoding: str):
+    """
+    Current snapshot's position_update frame narrowed to a subscription
+    """
+    snapshot = await current_snapshot()
+    if not subscription.is_filtered:
+        return snapshot.frame(encoding)
+    return encode_message({
+        **snapshot.message,
+        "data": filter_positions(snapshot.positions, subscription, snapshot.index)
+    }, encoding)
+
 @router.websocket("/ws/simulation")
-async def websocket_simulation(websocket: WebSocket, client_id: str = None):
+async def websocket_simulation(websocket: WebSocket, client_id: str = None, max_fps: float = None):
     """
     WebSocket endpoint for real-time simulation updates
+    
+    max_fps caps how many position updates per second this client receives;
+    intermediate ticks are coalesced into the latest state.
     """
-    # Accept the connection
-    await websocket.accept()
+    # Accept the connection, negotiating JSON (default) or binary position frames
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    encoding = encoding_for_subprotocol(subprotocol)
     
     if not client_id:
         client_id = f"client-{random.randint(1000, 9999)}"
     
     # Store the connection
     active_connections[client_id] = websocket
+    connection_encodings[client_id] = encoding
+    try:
+        set_client_rate(client_id, parse_max_fps(max_fps))
+    except ValueError:
+        set_client_rate(client_id, None)
+    replay_task: Optional[asyncio.Task] = None
     
     try:
         # Send initial welcome message
@@ -214,13 +251,8 @@ async def websocket_simulation(websocket: WebSocket, client_id: str = None):
         # Create a database session for this connection
         db = next(get_db())
         
-        # Send initial data immediately
-        positions = get_live_positions(db)
-        await websocket.send_json({
-            "type": "position_update",
-            "data": positions,
-            "timestamp": datetime.now().isoformat()
-        })
+        # Send initial data immediately from the current snapshot (encoded once for all clients)
+        await send_frame(websocket, (await current_snapshot()).frame(encoding))
         
         # Also send configuration data
         config = get_simulation_config(db)
@@ -239,11 +271,84 @@ async def websocket_simulation(websocket: WebSocket, client_id: str = None):
             message_type = data.get("type", "")
             
             if message_type == "get_positions":
-                # Get current rake positions
-                positions = get_live_positions(db)
+                # Get current rake positions, narrowed to the client's subscription
+                subscription = connection_subscriptions.get(client_id, DEFAULT_SUBSCRIPTION)
+                await send_frame(websocket, await snapshot_frame(subscription, encoding))
+            
+            elif message_type == "subscribe":
+                # Narrow what this client receives: topics, bounding box and/or rake IDs
+                try:
+                    subscription = Subscription.from_message(data)
+                except (TypeError, ValueError) as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Invalid subscription: {str(e)}",
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    continue
+                
+                connection_subscriptions[client_id] = subscription
                 await websocket.send_json({
-                    "type": "position_update",
-                    "data": positions,
+                    "type": "subscription_updated",
+                    "subscription": subscription.to_dict(),
+                    "timestamp": datetime.now().isoformat()
+                })
+                
+                # Send the new view straight away rather than waiting for the next tick
+                if subscription.wants("position_update"):
+                    await send_frame(websocket, await snapshot_frame(subscription, encoding))
+            
+            elif message_type == "set_rate":
+                # Cap this client's position update rate; events are never coalesced
+                try:
+                    set_client_rate(client_id, parse_max_fps(data.get("max_fps")))
+                except (TypeError, ValueError) as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Invalid max_fps: {str(e)}",
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    continue
+                
+                await websocket.send_json({
+                    "type": "rate_updated",
+                    "max_fps": connection_rates[client_id].max_fps,
+                    "timestamp": datetime.now().isoformat()
+                })
+            
+            elif message_type == "get_stats":
+                # Report this client's effective update rate and coalesced frames
+                stats = next((client for client in client_statistics() if client["client_id"] == client_id), {})
+                await websocket.send_json({
+                    "type": "client_stats",
+                    "data": stats,
+                    "timestamp": datetime.now().isoformat()
+                })
+            
+            elif message_type == "replay":
+                # Stream recorded ticks for a time range to this client; a new request seeks
+                try:
+                    start = datetime.fromisoformat(data["start"]) if data.get("start") else None
+                    end = datetime.fromisoformat(data["end"]) if data.get("end") else None
+                    speed = float(data.get("speed", REPLAY_SPEED))
+                except (TypeError, ValueError) as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Invalid replay request: {str(e)}",
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    continue
+                
+                if replay_task:
+                    replay_task.cancel()
+                replay_task = asyncio.create_task(stream_replay(websocket, start, end, speed))
+            
+            elif message_type == "replay_stop":
+                if replay_task:
+                    replay_task.cancel()
+                    replay_task = None
+                await websocket.send_json({
+                    "type": "replay_stopped",
                     "timestamp": datetime.now().isoformat()
                 })
             
@@ -260,8 +365,19 @@ async def websocket_simulation(websocket: WebSocket, client_id: str = None):
                 rake_id = data.get("rake_id", "")
                 details = data.get("details", {})
                 
-                # Use the broadcast helper
-                await broadcast_update("event_notification", {
+                # Apply the event to the simulation (batched into the next tick)
+                try:
+                    affected = await submit_event(event_type, rake_id or None, details)
+                except ValueError as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Invalid event: {str(e)}",
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    continue
+                
+                # Publish to clients on every worker
+                await publish_update("event_notification", {
                     "event_type": event_type,
                     "rake_id": rake_id,
                     "details": details,
@@ -272,6 +388,7 @@ async def websocket_simulation(websocket: WebSocket, client_id: str = None):
                 await websocket.send_json({
                     "type": "event_acknowledged",
                     "event_type": event_type,
+                    "rakes_affected": affected,
                     "timestamp": datetime.now().isoformat()
                 })
             
@@ -280,8 +397,10 @@ async def websocket_simulation(websocket: WebSocket, client_id: str = None):
                 action = data.get("action", "")
                 
                 if action in ["pause", "resume", "stop"]:
+                    await request_control(action)
+                    
                     # Broadcast to all clients
-                    await broadcast_update("simulation_control", {
+                    await publish_update("simulation_control", {
                         "action": action,
                         "initiated_by": client_id
                     })
@@ -310,11 +429,14 @@ async def websocket_simulation(websocket: WebSocket, client_id: str = None):
     except Exception as e:
         logging.error(f"WebSocket error: {str(e)}")
     finally:
+        if replay_task:
+            replay_task.cancel()
+        
         # Remove the connection when closed
         if client_id in active_connections:
-            del active_connections[client_id]
+            remove_connection(client_id)
             # Notify other clients that this client disconnected
-            asyncio.create_task(broadcast_update("client_disconnected", {
+            asyncio.create_task(publish_update("client_disconnected", {
                 "client_id": client_id,
                 "message": f"Client {client_id} disconnected"
             }))
\ No newline at end of file
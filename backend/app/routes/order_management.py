@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, File, HTTPException, Path, Query, Request, Response, UploadFile
 from typing import List, Optional
 
-from app.core.database import get_db
-from app.schemas.order_schema import Order, OrderCreate, OrderUpdate
-from app.services.order_service import get_order, get_all_orders, create_order, update_order, delete_order
+from app.utils.entity_cache import entity_etag, not_modified
+from app.utils.pagination import cursor_key
+from app.schemas.order_schema import Order, OrderCreate, OrderUpdate, OrderImportResult
+from app.services.order_service import (
+    get_order_async, get_order_rows_async, order_projection, create_order_async, update_order_async, delete_order_async,
+    import_orders_async, import_format, IMPORT_FORMATS
+)
 
 router = APIRouter()
 
@@ -14,63 +17,87 @@ async def read_orders(
     limit: int = 100, 
     status: Optional[str] = None,
     priority: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (instead of skip)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; all fields by default")
 ):
     """
     Get all customer orders with optional filters
+    
+    Full pages return an X-Next-Cursor header; pass it as cursor to get the next page.
+    Rows are selected as plain tuples and encoded directly, without ORM or Pydantic objects.
     """
-    orders = get_all_orders(db, skip=skip, limit=limit, status=status, priority=priority)
-    return orders
+    after = cursor_key("orders", cursor, skip)
+    names = order_projection.fields(fields)
+    rows = await get_order_rows_async(order_projection.select_columns(names), skip=skip, limit=limit,
+                                      status=status, priority=priority, after=after)
+    return order_projection.response(names, rows, "orders", limit)
 
 @router.get("/orders/{order_id}", response_model=Order)
 async def read_order(
-    order_id: str = Path(..., description="The ID of the order to get"),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    order_id: str = Path(..., description="The ID of the order to get")
 ):
     """
     Get a single order by ID
+    
+    Responses carry an ETag; send it back as If-None-Match to get 304 Not Modified when unchanged.
     """
-    order = get_order(db, order_id=order_id)
+    order = await get_order_async(order_id=order_id)
     if order is None:
         raise HTTPException(status_code=404, detail="Order not found")
+    etag = entity_etag(order)
+    if not_modified(request, response, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     return order
 
 @router.post("/orders/add", response_model=Order)
 async def add_order(
-    order: OrderCreate,
-    db: Session = Depends(get_db)
+    order: OrderCreate
 ):
     """
     Add a new customer order
     """
-    return create_order(db=db, order=order)
+    return await create_order_async(order=order)
+
+@router.post("/orders/import", response_model=OrderImportResult)
+async def import_orders_file(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON with one order per line"),
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the file extension")
+):
+    """
+    Bulk import orders, reporting per-row errors instead of rejecting the whole file
+    """
+    fmt = (format or import_format(file.filename) or "").lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format; use one of {', '.join(IMPORT_FORMATS)}")
+    
+    try:
+        return await import_orders_async(file.file, fmt)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import orders: {str(e)}")
 
 @router.put("/orders/{order_id}", response_model=Order)
 async def update_existing_order(
     order_id: str,
-    order: OrderUpdate,
-    db: Session = Depends(get_db)
+    order: OrderUpdate
 ):
     """
     Update an existing order
     """
-    db_order = get_order(db, order_id=order_id)
+    db_order = await update_order_async(order_id=order_id, order=order)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    
-    return update_order(db=db, order_id=order_id, order=order)
+    return db_order
 
 @router.delete("/orders/{order_id}", response_model=dict)
 async def delete_existing_order(
-    order_id: str,
-    db: Session = Depends(get_db)
+    order_id: str
 ):
     """
     Delete an existing order
     """
-    db_order = get_order(db, order_id=order_id)
+    db_order = await delete_order_async(order_id=order_id)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    
-    delete_order(db=db, order_id=order_id)
     return {"success": True, "message": f"Order {order_id} deleted"}
\ No newline at end of file
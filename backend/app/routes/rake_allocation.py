@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
 from typing import List, Optional
+import asyncio
 
-from app.core.database import get_db
+from app.utils.entity_cache import entity_etag, not_modified
+from app.utils.pagination import cursor_key
 from app.schemas.rake_schema import Rake, RakeCreate, RakeUpdate
-from app.schemas.optimize_schema import OptimizationRequest, OptimizationResponse
-from app.services.rake_service import get_rake, get_all_rakes, create_rake, update_rake, delete_rake
-from app.services.optimize_service import optimize_rake_allocation
+from app.schemas.optimize_schema import OptimizationRequest, OptimizationResponse, WhatIfRequest, WhatIfResponse
+from app.services.rake_service import get_rake_async, get_rake_rows_async, rake_projection, create_rake_async, update_rake_async, delete_rake_async
+from app.services.optimize_service import optimize_rake_allocation_async, get_plan_for_what_if_async, run_what_if_analysis
 
 router = APIRouter()
 
@@ -15,37 +16,48 @@ async def read_rakes(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (instead of skip)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; all fields by default")
 ):
     """
     Get all rakes with optional status filter
+    
+    Full pages return an X-Next-Cursor header; pass it as cursor to get the next page.
+    Rows are selected as plain tuples and encoded directly, without ORM or Pydantic objects.
     """
-    rakes = get_all_rakes(db, skip=skip, limit=limit, status=status)
-    return rakes
+    after = cursor_key("rakes", cursor, skip)
+    names = rake_projection.fields(fields)
+    rows = await get_rake_rows_async(rake_projection.select_columns(names), skip=skip, limit=limit, status=status, after=after)
+    return rake_projection.response(names, rows, "rakes", limit)
 
 @router.get("/rake/{rake_id}", response_model=Rake)
 async def read_rake(
-    rake_id: str = Path(..., description="The ID of the rake to get"),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    rake_id: str = Path(..., description="The ID of the rake to get")
 ):
     """
     Get a single rake by ID
+    
+    Responses carry an ETag; send it back as If-None-Match to get 304 Not Modified when unchanged.
     """
-    rake = get_rake(db, rake_id=rake_id)
+    rake = await get_rake_async(rake_id=rake_id)
     if rake is None:
         raise HTTPException(status_code=404, detail="Rake not found")
+    etag = entity_etag(rake)
+    if not_modified(request, response, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     return rake
 
 @router.post("/rake/optimize", response_model=OptimizationResponse)
 async def optimize_rakes(
-    request: OptimizationRequest,
-    db: Session = Depends(get_db)
+    request: OptimizationRequest
 ):
     """
     Run AI optimization and get loading plan
     """
     try:
-        result = optimize_rake_allocation(db, request)
+        result = await optimize_rake_allocation_async(request)
         return {
             "result": result,
             "status": "success",
@@ -54,42 +66,60 @@ async def optimize_rakes(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
 
+@router.post("/rake/optimize/what-if", response_model=WhatIfResponse)
+async def what_if_optimization(
+    request: WhatIfRequest
+):
+    """
+    Monte Carlo what-if: how a plan holds up under random delays, breakdowns and weather
+    """
+    plan = await get_plan_for_what_if_async(request)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Optimization plan not found")
+    
+    try:
+        # Replications run in a process pool; keep the event loop free while they do
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, run_what_if_analysis, plan, request)
+        return {
+            "task_id": request.task_id,
+            "result": result,
+            "status": "success",
+            "message": f"Simulated {result['replications']} replications of {request.days} days"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"What-if simulation failed: {str(e)}")
+
 @router.post("/rake/", response_model=Rake)
 async def create_new_rake(
-    rake: RakeCreate,
-    db: Session = Depends(get_db)
+    rake: RakeCreate
 ):
     """
     Create a new rake
     """
-    return create_rake(db=db, rake=rake)
+    return await create_rake_async(rake=rake)
 
 @router.put("/rake/{rake_id}", response_model=Rake)
 async def update_existing_rake(
     rake_id: str,
-    rake: RakeUpdate,
-    db: Session = Depends(get_db)
+    rake: RakeUpdate
 ):
     """
     Update an existing rake
     """
-    db_rake = get_rake(db, rake_id=rake_id)
+    db_rake = await update_rake_async(rake_id=rake_id, rake=rake)
     if db_rake is None:
         raise HTTPException(status_code=404, detail="Rake not found")
-    
-    return update_rake(db=db, rake_id=rake_id, rake=rake)
+    return db_rake
 
 @router.delete("/rake/{rake_id}", response_model=dict)
 async def delete_existing_rake(
-    rake_id: str,
-    db: Session = Depends(get_db)
+    rake_id: str
 ):
     """
     Delete an existing rake
     """
-    db_rake = get_rake(db, rake_id=rake_id)
+    db_rake = await delete_rake_async(rake_id=rake_id)
     if db_rake is None:
         raise HTTPException(status_code=404, detail="Rake not found")
-    
-    delete_rake(db=db, rake_id=rake_id)
     return {"success": True, "message": f"Rake {rake_id} deleted"}
\ No newline at end of file
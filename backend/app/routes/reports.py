@@ -1,19 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime, timedelta
 
-from app.core.database import get_db
 from app.schemas.report_schema import DailyReport
-from app.services.report_service import get_daily_summary, get_custom_report, export_report_to_pdf
+from app.core.database import iterate_db
+from app.services.report_service import get_daily_summary_async, get_custom_report_async, export_report_to_pdf_async
+from app.services.export_service import EXPORT_FORMATS, export_columns, stream_export
 
 router = APIRouter()
 
 @router.get("/reports/summary", response_model=DailyReport)
 async def get_summary_report(
     date_from: Optional[date] = Query(None, description="Start date for the report"),
-    date_to: Optional[date] = Query(None, description="End date for the report"),
-    db: Session = Depends(get_db)
+    date_to: Optional[date] = Query(None, description="End date for the report")
 ):
     """
     Get daily summary report with metrics, charts and recommendations
@@ -25,7 +25,7 @@ async def get_summary_report(
         date_to = date_from
     
     try:
-        report = get_daily_summary(db, date_from=date_from, date_to=date_to)
+        report = await get_daily_summary_async(date_from=date_from, date_to=date_to)
         return report
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
@@ -35,8 +35,7 @@ async def get_custom_report_data(
     report_type: str = Query(..., description="Type of report to generate"),
     date_from: Optional[date] = Query(None, description="Start date for the report"),
     date_to: Optional[date] = Query(None, description="End date for the report"),
-    filters: Optional[str] = Query(None, description="Additional filters for the report as JSON string"),
-    db: Session = Depends(get_db)
+    filters: Optional[str] = Query(None, description="Additional filters for the report as JSON string")
 ):
     """
     Generate a custom report based on provided parameters
@@ -51,8 +50,7 @@ async def get_custom_report_data(
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Invalid JSON in filters parameter")
         
-        report = get_custom_report(
-            db, 
+        report = await get_custom_report_async(
             report_type=report_type,
             date_from=date_from,
             date_to=date_to,
@@ -66,19 +64,42 @@ async def get_custom_report_data(
 async def export_report_as_pdf(
     report_type: str = Query(..., description="Type of report to export"),
     date_from: Optional[date] = Query(None, description="Start date for the report"),
-    date_to: Optional[date] = Query(None, description="End date for the report"),
-    db: Session = Depends(get_db)
+    date_to: Optional[date] = Query(None, description="End date for the report")
 ):
     """
     Export a report as PDF
     """
     try:
-        pdf_path = export_report_to_pdf(
-            db, 
+        pdf_path = await export_report_to_pdf_async(
             report_type=report_type,
             date_from=date_from,
             date_to=date_to
         )
         return {"success": True, "file_path": pdf_path}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to export PDF: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to export PDF: {str(e)}")
+
+@router.get("/reports/export/{resource}")
+async def export_table(
+    resource: str = Path(..., description="orders, rakes or optimization-results"),
+    format: str = Query("csv", description="csv or ndjson"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to export; all columns by default"),
+    date_from: Optional[date] = Query(None, description="First creation date to export"),
+    date_to: Optional[date] = Query(None, description="Last creation date to export")
+):
+    """
+    Stream a whole table as CSV or NDJSON for analytics
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format; use one of {', '.join(EXPORT_FORMATS)}")
+    try:
+        columns = export_columns(resource, [name.strip() for name in fields.split(",") if name.strip()] if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    filename = f"{resource}-{datetime.now():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        iterate_db(stream_export(resource, format, columns, date_from=date_from, date_to=date_to)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
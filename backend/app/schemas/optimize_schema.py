@@ -33,4 +33,18 @@ class OptimizationResult(BaseModel):
 class OptimizationResponse(BaseModel):
     result: OptimizationResult
     status: str = "success"
-    message: Optional[str] = None
\ No newline at end of file
+    message: Optional[str] = None
+
+class WhatIfRequest(BaseModel):
+    task_id: Optional[str] = Field(None, description="ID of a stored optimization result to evaluate")
+    optimized_plan: Optional[List[AllocationItem]] = Field(None, description="Plan to evaluate when no task_id is given")
+    replications: int = Field(1000, ge=1, le=10000, description="Number of seeded Monte Carlo replications")
+    days: float = Field(30, gt=0, le=365, description="Simulated days per replication")
+    seed: int = Field(0, description="Base seed; replication i uses seed + i")
+    event_rate_per_hour: float = Field(0.5, ge=0, description="Fleet-wide rate of delays, breakdowns and weather events")
+
+class WhatIfResponse(BaseModel):
+    task_id: Optional[str] = None
+    result: Dict[str, Any]
+    status: str = "success"
+    message: Optional[str] = None
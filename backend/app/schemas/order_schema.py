@@ -25,4 +25,30 @@ class OrderInDB(OrderBase):
     }
 
 class Order(OrderInDB):
-    pass
\ No newline at end of file
+    pass
+
+class OrderImportRow(BaseModel):
+    """
+    One row of a bulk order import (CSV columns or NDJSON keys match the orders table)
+    """
+    id: Optional[str] = Field(None, max_length=20, description="Order ID; generated when empty")
+    customer_name: str = Field(..., min_length=1, max_length=100)
+    material: str = Field(..., min_length=1, max_length=100)
+    quantity: float = Field(..., gt=0, description="Quantity in tons")
+    destination: str = Field(..., min_length=1, max_length=100)
+    origin: str = Field("Bokaro", max_length=100)
+    priority: int = Field(3, ge=1, le=5)
+    status: str = Field("Pending", max_length=50)
+    notes: Optional[str] = None
+    expected_delivery_date: Optional[datetime] = None
+    rake_id: Optional[str] = Field(None, max_length=20)
+
+class OrderImportError(BaseModel):
+    row: int = Field(..., description="1-based data row number in the upload")
+    error: str
+
+class OrderImportResult(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[OrderImportError] = Field(default_factory=list, description="First errors, capped per import")
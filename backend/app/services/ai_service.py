@@ -4,6 +4,7 @@ import random
 from datetime import datetime
 
 from app.schemas.report_schema import AIRecommendation
+from app.core.database import read_only
 
 def get_recommendations(
     db: Session, 
@@ -77,4 +78,7 @@ def get_recommendations(
     # Sort by priority (lower number = higher priority)
     sorted_recommendations = sorted(filtered_recommendations, key=lambda x: x.priority)
     
-    return sorted_recommendations[:limit]
\ No newline at end of file
+    return sorted_recommendations[:limit]
+
+# Awaitable variants for async routes; each call gets its own read replica session on the database thread pool
+get_recommendations_async = read_only(get_recommendations)
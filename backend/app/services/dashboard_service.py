@@ -4,6 +4,7 @@ import random
 from datetime import datetime, timedelta
 
 from app.schemas.report_schema import MetricItem, ChartData
+from app.core.database import read_only
 
 def get_dashboard_metrics(db: Session) -> List[MetricItem]:
     """
@@ -93,4 +94,8 @@ def get_dashboard_charts(db: Session) -> Dict[str, ChartData]:
         )
     }
     
-    return charts
\ No newline at end of file
+    return charts
+
+# Awaitable variants for async routes; each call gets its own read replica session on the database thread pool
+get_dashboard_metrics_async = read_only(get_dashboard_metrics)
+get_dashboard_charts_async = read_only(get_dashboard_charts)
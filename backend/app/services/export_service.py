@@ -0,0 +1,103 @@
+from sqlalchemy import Engine, select
+from typing import Iterator, List, Optional
+from datetime import date, datetime, time, timedelta, timezone
+import csv
+import io
+import json
+
+from app.core.database import read_engine
+from app.models.optimization import OptimizationResult
+from app.models.order import Order
+from app.models.rake import Rake
+from app.utils.serialization import dumps
+
+# Exportable tables: model and the timestamp column date ranges filter on
+EXPORTS = {
+    "orders": (Order, "created_at"),
+    "rakes": (Rake, "created_at"),
+    "optimization-results": (OptimizationResult, "timestamp")
+}
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Rows fetched from the cursor and encoded per chunk of the response
+EXPORT_BATCH_SIZE = 1000
+
+def export_columns(resource: str, fields: Optional[List[str]] = None) -> List[str]:
+    """
+    Validate an export request's resource and column names
+    
+    Returns:
+        The requested columns, or every column of the table when none are given
+    
+    Raises:
+        ValueError: If the resource or a column does not exist
+    """
+    if resource not in EXPORTS:
+        raise ValueError(f"Unknown export: {resource}; use one of {', '.join(EXPORTS)}")
+    table = EXPORTS[resource][0].__table__
+    if not fields:
+        return [column.name for column in table.columns]
+    unknown = [name for name in fields if name not in table.columns]
+    if unknown:
+        raise ValueError(f"Unknown {resource} fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+def _day_start(day: date) -> datetime:
+    # Timestamp columns are timezone-aware, so compare against UTC midnight
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _encode_csv(rows, columns: List[str], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+def _encode_ndjson(rows, columns: List[str]) -> bytes:
+    return "".join(dumps(dict(zip(columns, row))) + "\n" for row in rows).encode("utf-8")
+
+def stream_export(
+    resource: str,
+    fmt: str,
+    columns: List[str],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    bind: Optional[Engine] = None
+) -> Iterator[bytes]:
+    """
+    Stream a table as CSV or NDJSON chunks of EXPORT_BATCH_SIZE rows
+    
+    Only the requested columns are selected, as plain rows rather than ORM
+    objects, and they are fetched through a server-side cursor, so memory use
+    does not depend on the size of the table. The connection is held until the
+    iterator is exhausted or closed.
+    
+    Args:
+        columns: Column names already checked by export_columns
+        date_from: First UTC day (inclusive) of the resource's timestamp column
+        date_to: Last UTC day (inclusive) of the resource's timestamp column
+        bind: Engine to read from; a read replica (or the primary) by default
+    """
+    model, timestamp = EXPORTS[resource]
+    table = model.__table__
+    query = select(*(table.c[name] for name in columns)).order_by(*table.primary_key.columns)
+    if date_from:
+        query = query.where(table.c[timestamp] >= _day_start(date_from))
+    if date_to:
+        query = query.where(table.c[timestamp] < _day_start(date_to + timedelta(days=1)))
+    
+    if fmt == "csv":
+        yield _encode_csv([], columns, header=True)
+    with (bind or read_engine()).connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(query)
+        for rows in result.partitions():
+            yield _encode_csv(rows, columns, header=False) if fmt == "csv" else _encode_ndjson(rows, columns)
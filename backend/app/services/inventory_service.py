@@ -1,32 +1,64 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime
 
 from app.models.inventory import Inventory
-from app.schemas.inventory_schema import InventoryCreate, InventoryUpdate
+from app.schemas.inventory_schema import Inventory as InventoryResponse, InventoryCreate, InventoryUpdate
+from app.core.database import awaitable, commit, read_only
+from app.core.group_commit import batched
+from app.utils.entity_cache import EntityCache, snapshot
+from app.utils.projection import Projection
 
-def get_stockyard(db: Session, stockyard_id: str):
+# Read-through cache of single stockyard lookups, keyed by ID
+stockyard_cache = EntityCache("stockyards")
+
+# Stockyard list fields as columns
+stockyard_projection = Projection(Inventory, InventoryResponse)
+
+def get_stockyard(db: Session, stockyard_id: str) -> Optional[Dict[str, Any]]:
     """
-    Get a stockyard by ID
+    Get a stockyard by ID as a dict of its columns, from stockyard_cache when fresh
     """
-    return db.query(Inventory).filter(Inventory.stockyard_id == stockyard_id).first()
+    return stockyard_cache.get_or_load(stockyard_id, lambda: snapshot(db.get(Inventory, stockyard_id)))
 
 def get_all_stockyards(
     db: Session, 
     skip: int = 0, 
     limit: int = 100, 
-    material: Optional[str] = None
+    material: Optional[str] = None,
+    after: Optional[str] = None
 ):
     """
-    Get all stockyards with optional material filter
-    """
-    query = db.query(Inventory)
+    Get all stockyards with optional material filter, in stockyard ID order
     
+    Pass the last ID of the previous page as `after` for keyset paging.
+    """
+    return _filter_stockyards(db.query(Inventory), material, after).offset(skip).limit(limit).all()
+
+def get_stockyard_rows(
+    db: Session,
+    columns: list,
+    skip: int = 0,
+    limit: int = 100,
+    material: Optional[str] = None,
+    after: Optional[str] = None
+) -> List[tuple]:
+    """
+    Same listing as get_all_stockyards, as plain tuples of the given columns
+    """
+    return db.execute(_filter_stockyards(select(*columns), material, after).offset(skip).limit(limit)).all()
+
+def _filter_stockyards(query, material: Optional[str], after: Optional[str]):
+    # Works on both ORM queries and select() statements
     if material:
         query = query.filter(Inventory.material == material)
     
-    return query.offset(skip).limit(limit).all()
+    if after is not None:
+        query = query.filter(Inventory.stockyard_id > after)
+    
+    return query.order_by(Inventory.stockyard_id)
 
 def create_stockyard(db: Session, stockyard: InventoryCreate):
     """
@@ -34,29 +66,44 @@ def create_stockyard(db: Session, stockyard: InventoryCreate):
     """
     db_stockyard = Inventory(**stockyard.dict())
     db.add(db_stockyard)
-    db.commit()
+    commit(db, lambda: stockyard_cache.invalidate(db_stockyard.stockyard_id))
     db.refresh(db_stockyard)
     return db_stockyard
 
 def update_stockyard(db: Session, stockyard_id: str, stockyard: InventoryUpdate):
     """
-    Update an existing stockyard
+    Update an existing stockyard; returns None if it does not exist
     """
-    db_stockyard = get_stockyard(db, stockyard_id=stockyard_id)
+    db_stockyard = db.get(Inventory, stockyard_id)
+    if db_stockyard is None:
+        return None
     
     # Update stockyard fields
     for key, value in stockyard.dict().items():
         setattr(db_stockyard, key, value)
     
-    db.commit()
+    commit(db, lambda: stockyard_cache.invalidate(stockyard_id))
     db.refresh(db_stockyard)
     return db_stockyard
 
 def delete_stockyard(db: Session, stockyard_id: str):
     """
-    Delete a stockyard
+    Delete a stockyard; returns None if it does not exist
     """
-    db_stockyard = get_stockyard(db, stockyard_id=stockyard_id)
+    db_stockyard = db.get(Inventory, stockyard_id)
+    if db_stockyard is None:
+        return None
     db.delete(db_stockyard)
-    db.commit()
-    return db_stockyard
\ No newline at end of file
+    commit(db, lambda: stockyard_cache.invalidate(stockyard_id))
+    return db_stockyard
+
+# Awaitable variants for async routes; each call gets its own session on the database thread pool,
+# and create/update/delete join a group-commit batch when GROUP_COMMIT_ENABLED is set
+# Listings read from a replica; get_stockyard reads the primary so a lagging replica cannot
+# refill stockyard_cache with a row a write has just invalidated
+get_stockyard_async = awaitable(get_stockyard)
+get_all_stockyards_async = read_only(get_all_stockyards)
+get_stockyard_rows_async = read_only(get_stockyard_rows)
+create_stockyard_async = batched(create_stockyard)
+update_stockyard_async = batched(update_stockyard)
+delete_stockyard_async = batched(delete_stockyard)
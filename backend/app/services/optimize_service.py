@@ -3,9 +3,11 @@ from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime
 
-from app.schemas.optimize_schema import OptimizationRequest, OptimizationResult, AllocationItem
+from app.schemas.optimize_schema import OptimizationRequest, OptimizationResult, AllocationItem, WhatIfRequest
 from app.models.optimization import OptimizationResult as OptimizationResultModel
 from app.ml.rake_optimizer import optimize_rakes
+from app.simulation.montecarlo import run_monte_carlo
+from app.core.database import awaitable
 
 def optimize_rake_allocation(db: Session, request: OptimizationRequest) -> OptimizationResult:
     """
@@ -52,4 +54,37 @@ def optimize_rake_allocation(db: Session, request: OptimizationRequest) -> Optim
         optimized_plan=optimized_plan,
         total_cost=result["total_cost"],
         timestamp=datetime.now()
-    )
\ No newline at end of file
+    )
+
+def get_plan_for_what_if(db: Session, request: WhatIfRequest) -> Optional[List[Dict[str, Any]]]:
+    """
+    Resolve the allocation plan to evaluate from a stored task or the request body
+    """
+    if request.task_id:
+        db_result = db.query(OptimizationResultModel).filter(OptimizationResultModel.task_id == request.task_id).first()
+        if db_result is None or not db_result.plan:
+            return None
+        return db_result.plan.get("optimized_plan", [])
+    
+    if request.optimized_plan is not None:
+        return [allocation.dict() for allocation in request.optimized_plan]
+    
+    return None
+
+def run_what_if_analysis(plan: List[Dict[str, Any]], request: WhatIfRequest) -> Dict[str, Any]:
+    """
+    Fast-forward seeded replications of a plan under random delays, breakdowns and weather
+    
+    CPU-bound; call from a thread or process, not directly on the event loop.
+    """
+    return run_monte_carlo(
+        plan,
+        replications=request.replications,
+        days=request.days,
+        seed=request.seed,
+        event_rate_per_hour=request.event_rate_per_hour
+    )
+
+# Awaitable variants for async routes; each call gets its own session on the database thread pool
+optimize_rake_allocation_async = awaitable(optimize_rake_allocation)
+get_plan_for_what_if_async = awaitable(get_plan_for_what_if)
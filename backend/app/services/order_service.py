@@ -1,36 +1,82 @@
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from pydantic import ValidationError
+from typing import List, Optional, Dict, Any, BinaryIO, Iterator, Tuple
+import csv
+import io
+import json
+import os
+import secrets
 import uuid
 from datetime import datetime
 
 from app.models.order import Order
-from app.schemas.order_schema import OrderCreate, OrderUpdate
+from app.schemas.order_schema import Order as OrderResponse, OrderCreate, OrderUpdate, OrderImportRow
+from app.core.database import awaitable, commit, read_only
+from app.core.group_commit import batched
+from app.utils.entity_cache import EntityCache, snapshot
+from app.utils.projection import Projection
 
-def get_order(db: Session, order_id: str):
+# Read-through cache of single order lookups, keyed by ID
+order_cache = EntityCache("orders")
+
+# The order schema calls the ID column order_id
+ORDER_ALIASES = {"order_id": "id"}
+
+# Order list fields as columns
+order_projection = Projection(Order, OrderResponse, aliases=ORDER_ALIASES)
+
+def get_order(db: Session, order_id: str) -> Optional[Dict[str, Any]]:
     """
-    Get an order by ID
+    Get an order by ID as a dict of its response fields, from order_cache when fresh
     """
-    return db.query(Order).filter(Order.order_id == order_id).first()
+    return order_cache.get_or_load(order_id, lambda: snapshot(db.get(Order, order_id), ORDER_ALIASES))
 
 def get_all_orders(
     db: Session, 
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[str] = None,
-    priority: Optional[int] = None
+    priority: Optional[int] = None,
+    after: Optional[str] = None
 ):
     """
-    Get all orders with optional filters
+    Get all orders with optional filters, in order ID order
+    
+    Pass the last ID of the previous page as `after` for keyset paging, which
+    stays fast deep into the table; skip is kept for offset paging.
+    """
+    return _filter_orders(db.query(Order), status, priority, after).offset(skip).limit(limit).all()
+
+def get_order_rows(
+    db: Session,
+    columns: list,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    priority: Optional[int] = None,
+    after: Optional[str] = None
+) -> List[tuple]:
     """
-    query = db.query(Order)
+    Same listing as get_all_orders, as plain tuples of the given columns
     
+    Skips building ORM objects for large pages; see utils.projection.
+    """
+    return db.execute(_filter_orders(select(*columns), status, priority, after).offset(skip).limit(limit)).all()
+
+def _filter_orders(query, status: Optional[str], priority: Optional[int], after: Optional[str]):
+    # Works on both ORM queries and select() statements
     if status:
         query = query.filter(Order.status == status)
     
     if priority:
         query = query.filter(Order.priority == priority)
     
-    return query.offset(skip).limit(limit).all()
+    if after is not None:
+        query = query.filter(Order.id > after)
+    
+    return query.order_by(Order.id)
 
 def create_order(db: Session, order: OrderCreate):
     """
@@ -44,29 +90,158 @@ def create_order(db: Session, order: OrderCreate):
     
     db_order = Order(**order_dict)
     db.add(db_order)
-    db.commit()
+    commit(db, lambda: order_cache.invalidate(db_order.id))
     db.refresh(db_order)
     return db_order
 
 def update_order(db: Session, order_id: str, order: OrderUpdate):
     """
-    Update an existing order
+    Update an existing order; returns None if it does not exist
     """
-    db_order = get_order(db, order_id=order_id)
+    db_order = db.get(Order, order_id)
+    if db_order is None:
+        return None
     
     # Update order fields
     for key, value in order.dict(exclude_unset=True).items():
         setattr(db_order, key, value)
     
-    db.commit()
+    commit(db, lambda: order_cache.invalidate(order_id))
     db.refresh(db_order)
     return db_order
 
 def delete_order(db: Session, order_id: str):
     """
-    Delete an order
+    Delete an order; returns None if it does not exist
     """
-    db_order = get_order(db, order_id=order_id)
+    db_order = db.get(Order, order_id)
+    if db_order is None:
+        return None
     db.delete(db_order)
-    db.commit()
-    return db_order
\ No newline at end of file
+    commit(db, lambda: order_cache.invalidate(order_id))
+    return db_order
+
+# Bulk import: accepted formats, rows per transaction and the most row errors reported
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_CHUNK_SIZE = 1000
+MAX_IMPORT_ERRORS = 1000
+
+def import_format(filename: Optional[str]) -> Optional[str]:
+    """
+    Import format implied by an upload's file name (.csv, .ndjson or .jsonl)
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    return {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(extension)
+
+def _read_records(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    # Yield (row number, raw record) one at a time, so memory use does not grow with the file
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for row_number, record in enumerate(csv.DictReader(text), start=1):
+                # Empty cells mean "use the default", like a missing NDJSON key
+                yield row_number, {key: value for key, value in record.items() if key and value not in ("", None)}
+        else:
+            row_number = 0
+            for line in text:
+                if not line.strip():
+                    continue
+                row_number += 1
+                try:
+                    yield row_number, json.loads(line)
+                except ValueError as e:
+                    yield row_number, ValueError(f"Invalid JSON: {e}")
+    finally:
+        # Leave the upload's file open for its owner
+        text.detach()
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors())
+
+def _assign_order_ids(chunk: List[Tuple[int, Dict[str, Any]]]):
+    # 12 random hex digits keep collisions negligible across tens of thousands of rows
+    for _, values in chunk:
+        if not values["id"]:
+            values["id"] = f"ORD-{secrets.token_hex(6).upper()}"
+
+def _insert_chunk(db: Session, chunk: List[Tuple[int, Dict[str, Any]]], result: Dict[str, Any]):
+    # One executemany in one transaction; if any row fails, retry the chunk row by
+    # row so only the offending rows (duplicate IDs, constraint violations) fail
+    try:
+        db.execute(insert(Order), [values for _, values in chunk])
+        db.commit()
+        result["imported"] += len(chunk)
+        return
+    except SQLAlchemyError:
+        db.rollback()
+    
+    for row_number, values in chunk:
+        try:
+            db.execute(insert(Order), [values])
+            db.commit()
+            result["imported"] += 1
+        except SQLAlchemyError as e:
+            db.rollback()
+            _record_import_error(result, row_number, str(getattr(e, "orig", e)))
+
+def _record_import_error(result: Dict[str, Any], row_number: int, message: str):
+    result["failed"] += 1
+    if len(result["errors"]) < MAX_IMPORT_ERRORS:
+        result["errors"].append({"row": row_number, "error": message})
+
+def import_orders(db: Session, stream: BinaryIO, fmt: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Stream orders from a CSV or NDJSON upload into the orders table
+    
+    Rows are validated and inserted chunk by chunk, each chunk in its own
+    transaction, so invalid rows are reported without aborting the file and
+    rows from earlier chunks stay imported. Rows without an ID get a generated
+    ORD- ID.
+    
+    Args:
+        stream: Binary file object positioned at the start of the upload
+        fmt: "csv" (header row with orders column names) or "ndjson"
+    
+    Returns:
+        total_rows, imported, failed and the first MAX_IMPORT_ERRORS row errors
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    
+    result: Dict[str, Any] = {"total_rows": 0, "imported": 0, "failed": 0, "errors": []}
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    for row_number, record in _read_records(stream, fmt):
+        result["total_rows"] += 1
+        if isinstance(record, Exception):
+            _record_import_error(result, row_number, str(record))
+            continue
+        try:
+            values = OrderImportRow.model_validate(record).model_dump()
+        except ValidationError as e:
+            _record_import_error(result, row_number, _validation_message(e))
+            continue
+        
+        chunk.append((row_number, values))
+        if len(chunk) >= chunk_size:
+            _assign_order_ids(chunk)
+            _insert_chunk(db, chunk, result)
+            chunk = []
+    
+    if chunk:
+        _assign_order_ids(chunk)
+        _insert_chunk(db, chunk, result)
+    # Constraint errors are found when a chunk is flushed, after later rows were validated
+    result["errors"].sort(key=lambda error: error["row"])
+    return result
+
+# Awaitable variants for async routes; each call gets its own session on the database thread pool,
+# and create/update/delete join a group-commit batch when GROUP_COMMIT_ENABLED is set
+# Listings read from a replica; get_order reads the primary so a lagging replica cannot
+# refill order_cache with a row a write has just invalidated
+get_order_async = awaitable(get_order)
+get_all_orders_async = read_only(get_all_orders)
+get_order_rows_async = read_only(get_order_rows)
+create_order_async = batched(create_order)
+update_order_async = batched(update_order)
+delete_order_async = batched(delete_order)
+import_orders_async = awaitable(import_orders)
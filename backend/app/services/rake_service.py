@@ -1,28 +1,56 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime
 
 from app.models.rake import Rake
-from app.schemas.rake_schema import RakeCreate, RakeUpdate
+from app.schemas.rake_schema import Rake as RakeResponse, RakeCreate, RakeUpdate
 from app.schemas.optimize_schema import OptimizationRequest, OptimizationResult
 from app.ml.rake_optimizer import optimize_rakes
+from app.core.database import awaitable, commit, read_only
+from app.core.group_commit import batched
+from app.utils.entity_cache import EntityCache, snapshot
+from app.utils.projection import Projection
 
-def get_rake(db: Session, rake_id: str):
+# Read-through cache of single rake lookups, keyed by ID
+rake_cache = EntityCache("rakes")
+
+# The rake schema calls the ID column rake_id
+RAKE_ALIASES = {"rake_id": "id"}
+
+# Rake list fields as columns
+rake_projection = Projection(Rake, RakeResponse, aliases=RAKE_ALIASES)
+
+def get_rake(db: Session, rake_id: str) -> Optional[Dict[str, Any]]:
     """
-    Get a rake by ID
+    Get a rake by ID as a dict of its response fields, from rake_cache when fresh
     """
-    return db.query(Rake).filter(Rake.rake_id == rake_id).first()
+    return rake_cache.get_or_load(rake_id, lambda: snapshot(db.get(Rake, rake_id), RAKE_ALIASES))
 
-def get_all_rakes(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None):
+def get_all_rakes(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None,
+                  after: Optional[str] = None):
     """
-    Get all rakes with optional status filter
+    Get all rakes with optional status filter, in rake ID order
+    
+    Pass the last ID of the previous page as `after` for keyset paging.
+    """
+    return _filter_rakes(db.query(Rake), status, after).offset(skip).limit(limit).all()
+
+def get_rake_rows(db: Session, columns: list, skip: int = 0, limit: int = 100, status: Optional[str] = None,
+                  after: Optional[str] = None) -> List[tuple]:
     """
-    query = db.query(Rake)
+    Same listing as get_all_rakes, as plain tuples of the given columns
+    """
+    return db.execute(_filter_rakes(select(*columns), status, after).offset(skip).limit(limit)).all()
+
+def _filter_rakes(query, status: Optional[str], after: Optional[str]):
+    # Works on both ORM queries and select() statements
     if status:
         query = query.filter(Rake.status == status)
-    
-    return query.offset(skip).limit(limit).all()
+    if after is not None:
+        query = query.filter(Rake.id > after)
+    return query.order_by(Rake.id)
 
 def create_rake(db: Session, rake: RakeCreate):
     """
@@ -30,29 +58,44 @@ def create_rake(db: Session, rake: RakeCreate):
     """
     db_rake = Rake(**rake.dict())
     db.add(db_rake)
-    db.commit()
+    commit(db, lambda: rake_cache.invalidate(db_rake.id))
     db.refresh(db_rake)
     return db_rake
 
 def update_rake(db: Session, rake_id: str, rake: RakeUpdate):
     """
-    Update an existing rake
+    Update an existing rake; returns None if it does not exist
     """
-    db_rake = get_rake(db, rake_id=rake_id)
+    db_rake = db.get(Rake, rake_id)
+    if db_rake is None:
+        return None
     
     # Update rake fields
     for key, value in rake.dict().items():
         setattr(db_rake, key, value)
     
-    db.commit()
+    commit(db, lambda: rake_cache.invalidate(rake_id))
     db.refresh(db_rake)
     return db_rake
 
 def delete_rake(db: Session, rake_id: str):
     """
-    Delete a rake
+    Delete a rake; returns None if it does not exist
     """
-    db_rake = get_rake(db, rake_id=rake_id)
+    db_rake = db.get(Rake, rake_id)
+    if db_rake is None:
+        return None
     db.delete(db_rake)
-    db.commit()
-    return db_rake
\ No newline at end of file
+    commit(db, lambda: rake_cache.invalidate(rake_id))
+    return db_rake
+
+# Awaitable variants for async routes; each call gets its own session on the database thread pool,
+# and create/update/delete join a group-commit batch when GROUP_COMMIT_ENABLED is set
+# Listings read from a replica; get_rake reads the primary so a lagging replica cannot
+# refill rake_cache with a row a write has just invalidated
+get_rake_async = awaitable(get_rake)
+get_all_rakes_async = read_only(get_all_rakes)
+get_rake_rows_async = read_only(get_rake_rows)
+create_rake_async = batched(create_rake)
+update_rake_async = batched(update_rake)
+delete_rake_async = batched(delete_rake)
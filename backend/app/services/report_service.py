@@ -5,6 +5,7 @@ from datetime import datetime, date, timedelta
 import random
 
 from app.schemas.report_schema import DailyReport, MetricItem, ChartData
+from app.core.database import read_only
 
 def get_daily_summary(db: Session, date_from: date, date_to: date) -> DailyReport:
     """
@@ -129,4 +130,9 @@ def export_report_to_pdf(
     
     # In a real implementation, this would create the actual PDF file
     
-    return file_path
\ No newline at end of file
+    return file_path
+
+# Awaitable variants for async routes; each call gets its own read replica session on the database thread pool
+get_daily_summary_async = read_only(get_daily_summary)
+get_custom_report_async = read_only(get_custom_report)
+export_report_to_pdf_async = read_only(export_report_to_pdf)
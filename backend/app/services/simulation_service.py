@@ -1,251 +1,107 @@
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional, Callable
-import random
+from typing import List, Dict, Any, Optional, Callable, Set, Tuple, TypeVar
+import copy
 import logging
 import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from fastapi import WebSocket
 
+from app.core.config import settings
+from app.core.database import SessionLocal, db_executor, read_sessionmaker
 from app.models.rake import Rake
 from app.models.order import Order
+from app.services.rake_service import rake_cache
+from app.simulation.backplane import create_backplane, UPDATES_CHANNEL, DASHBOARD_CHANNEL, CONTROL_CHANNEL, EVENTS_CHANNEL
+from app.simulation.checkpoint import CheckpointStore
+from app.simulation.engine import SimulationEngine
+from app.simulation.ingest import EventInbox, expand_event
+from app.simulation.loops import LoopRegistry
+from app.simulation.rates import COALESCED_TYPES, ClientRate
+from app.simulation.recorder import TickLog, TickRecorder
+from app.simulation.scheduler import TickMetrics, TickScheduler
+from app.simulation.sharding import ShardedSimulation
+from app.simulation.network import SIMULATION_CONFIG
+from app.simulation.snapshot import Snapshot, SnapshotCache
+from app.simulation.subscriptions import SpatialGrid, Subscription, filter_positions
+from app.utils.serialization import broadcast_frame, dumps, send_frame
+from app.utils.binary_frames import ENCODING_JSON, encode_message
 
 # Dictionary to store active WebSocket connections
 # This is shared with the WebSocket handler in live_simulation.py
 active_connections: Dict[str, WebSocket] = {}
 
-def get_live_positions(db: Session) -> Dict[str, Any]:
-    """
-    Get real-time rake positions for the simulation map based on real database data
-    """
-    try:
-        # Query active rakes from database
-        active_rakes = db.query(Rake).filter(Rake.status != "Idle").all()
-        
-        rakes_data = []
-        
-        if active_rakes:
-            for rake in active_rakes:
-                # Get associated order for destination info
-                order = db.query(Order).filter(Order.rake_id == rake.id).first()
-                destination = order.destination if order else "Unknown"
-                
-                # Calculate position based on progress
-                origin_pos = {"lat": 23.6345, "lng": 86.1432}  # Bokaro
-                
-                # Determine destination coordinates based on destination name
-                if "Kolkata" in destination:
-                    dest_pos = {"lat": 22.5672, "lng": 88.3694}  # Kolkata
-                elif "Mumbai" in destination:
-                    dest_pos = {"lat": 19.0760, "lng": 72.8777}  # Mumbai
-                elif "Durgapur" in destination:
-                    dest_pos = {"lat": 23.5489, "lng": 87.3198}  # Durgapur
-                else:
-                    # Random destination within reasonable range
-                    dest_pos = {"lat": 23.0 + random.uniform(-1, 1), "lng": 87.0 + random.uniform(-1, 1)}
-                
-                # Interpolate position based on progress
-                progress = rake.transit_progress / 100.0
-                current_pos = {
-                    "lat": origin_pos["lat"] + (dest_pos["lat"] - origin_pos["lat"]) * progress,
-                    "lng": origin_pos["lng"] + (dest_pos["lng"] - origin_pos["lng"]) * progress
-                }
-                
-                # Calculate speed based on status
-                speed = 0
-                if rake.status == "In Transit":
-                    speed = random.randint(35, 50)
-                elif rake.status == "Departed":
-                    speed = random.randint(20, 35)
-                elif rake.status == "Arriving":
-                    speed = random.randint(10, 20)
-                
-                # Add to result
-                rakes_data.append({
-                    "rake_id": rake.id,
-                    "position": current_pos,
-                    "status": rake.status.lower(),
-                    "speed": speed,
-                    "destination": destination,
-                    "eta": rake.eta.isoformat() if rake.eta else (datetime.now() + timedelta(hours=5)).isoformat(),
-                    "utilization": rake.utilization,
-                    "load_details": f"{rake.freight_type} - {rake.weight} tons" if rake.freight_type else "Unknown"
-                })
-        
-        # If no rakes in database, provide sample data
-        if not rakes_data:
-            rakes_data = [
-                {
-                    "rake_id": "R-1001",
-                    "position": {"lat": 23.6345, "lng": 86.1432},
-                    "status": "moving",
-                    "speed": 45,  # km/h
-                    "destination": "Kolkata",
-                    "eta": (datetime.now() + timedelta(hours=5)).isoformat(),
-                    "utilization": 92,
-                    "load_details": "HR Coil - 1200 tons"
-                },
-                {
-                    "rake_id": "R-1002",
-                    "position": {"lat": 23.7890, "lng": 86.4231},
-                    "status": "loading",
-                    "speed": 0,  # km/h
-                    "destination": "Durgapur",
-                    "eta": (datetime.now() + timedelta(hours=8)).isoformat(),
-                    "utilization": 65,
-                    "load_details": "CR Coil - 800 tons"
-                }
-            ]
-        
-        return {
-            "rakes": rakes_data,
-            "timestamp": datetime.now().isoformat()
-        }
-    
-    except Exception as e:
-        logging.error(f"Error getting live positions: {e}")
-        # Return fallback data in case of error
-        return {
-            "rakes": [
-                {
-                    "rake_id": "R-1001",
-                    "position": {"lat": 23.6345, "lng": 86.1432},
-                    "status": "moving",
-                    "speed": 45,
-                    "destination": "Kolkata",
-                    "eta": (datetime.now() + timedelta(hours=5)).isoformat(),
-                    "utilization": 92,
-                    "load_details": "HR Coil - 1200 tons"
-                }
-            ],
-            "timestamp": datetime.now().isoformat()
-        }
+# Frame encoding negotiated by each connection (see app.utils.binary_frames)
+connection_encodings: Dict[str, str] = {}
 
-def get_active_rakes(db: Session) -> List[Dict[str, Any]]:
-    """
-    Get all currently active rakes for simulation display
-    """
-    try:
-        # Query active rakes from database
-        active_rakes = db.query(Rake).filter(Rake.status != "Idle").all()
-        
-        rakes_data = []
-        
-        if active_rakes:
-            for rake in active_rakes:
-                # Get associated order for destination info
-                order = db.query(Order).filter(Order.rake_id == rake.id).first()
-                destination = order.destination if order else "Unknown"
-                
-                rakes_data.append({
-                    "id": rake.id,
-                    "from": rake.origin or "Bokaro",
-                    "to": destination,
-                    "progress": rake.transit_progress or 0,
-                    "status": rake.status,
-                    "departureTime": rake.departure_time.strftime("%H:%M %p") if rake.departure_time else "N/A",
-                    "eta": rake.eta.strftime("%H:%M %p") if rake.eta else "N/A",
-                    "freight": rake.freight_type or "N/A",
-                    "weight": f"{rake.weight or 0} Tons"
-                })
-        
-        # If no rakes in database, provide sample data
-        if not rakes_data:
-            rakes_data = [
-                {"id": "R1234", "from": "Bokaro", "to": "CMO Kolkata", "progress": 45, "status": "In Transit", "departureTime": "08:30 AM", "eta": "14:45 PM", "freight": "Steel Coils", "weight": "1250 Tons"},
-                {"id": "R5678", "from": "Bokaro", "to": "Customer A123", "progress": 78, "status": "In Transit", "departureTime": "07:15 AM", "eta": "12:30 PM", "freight": "Steel Plates", "weight": "980 Tons"},
-                {"id": "R9012", "from": "Bokaro", "to": "CMO Mumbai", "progress": 92, "status": "Arriving", "departureTime": "06:00 AM", "eta": "15:10 PM", "freight": "Steel Tubes", "weight": "1080 Tons"},
-                {"id": "R3456", "from": "Bokaro", "to": "Customer B456", "progress": 15, "status": "Departed", "departureTime": "09:45 AM", "eta": "18:20 PM", "freight": "Steel Beams", "weight": "1320 Tons"}
-            ]
-        
-        return rakes_data
-    
-    except Exception as e:
-        logging.error(f"Error getting active rakes: {e}")
-        # Return fallback data in case of error
-        return [
-            {"id": "R1234", "from": "Bokaro", "to": "CMO Kolkata", "progress": 45, "status": "In Transit", "departureTime": "08:30 AM", "eta": "14:45 PM", "freight": "Steel Coils", "weight": "1250 Tons"},
-            {"id": "R5678", "from": "Bokaro", "to": "Customer A123", "progress": 78, "status": "In Transit", "departureTime": "07:15 AM", "eta": "12:30 PM", "freight": "Steel Plates", "weight": "980 Tons"}
-        ]
+# Topics, viewport and rake filters requested by each connection
+connection_subscriptions: Dict[str, Subscription] = {}
+DEFAULT_SUBSCRIPTION = Subscription()
+
+# Maximum frame rate and delivery statistics of each connection
+connection_rates: Dict[str, ClientRate] = {}
+# Coalesced-frame flushes in flight; the loop only keeps weak references to tasks
+_flush_tasks: Set[asyncio.Task] = set()
+
+# The single simulation shared by every WebSocket endpoint and REST control route;
+# very large fleets can be split across SIMULATION_SHARDS worker processes
+if settings.SIMULATION_SHARDS > 1:
+    simulation_engine = ShardedSimulation(settings.SIMULATION_SHARDS, settings.SIMULATION_SHARD_PARTITION)
+else:
+    simulation_engine = SimulationEngine()
+
+# Guarantees one running loop per simulation; start requests reuse it
+simulation_loops = LoopRegistry()
+SIMULATION_ID = "live"
+
+# Carries simulation ticks between uvicorn workers; only the producer runs the simulation
+backplane = create_backplane(settings.SIMULATION_BACKPLANE, settings.SIMULATION_BACKPLANE_PATH)
+
+# Fleet snapshot taken once per tick; every read path (REST, reconnects, get_positions) serves it
+snapshots = SnapshotCache()
+
+# Submitted delays, breakdowns and weather, applied by the producer in one batch per tick
+event_inbox = EventInbox()
+_published_event_seq = 0
+# Publishes events submitted while the loop is stopped, one coalesced update per interval
+_event_flush: Optional[asyncio.Task] = None
+
+# Append-only recording of every tick (producer only) and the shared memory-mapped reader
+tick_recorder: Optional[TickRecorder] = None
+tick_log: Optional[TickLog] = None
+
+# Latest full-state checkpoint (producer only); startup restores it before touching the database
+checkpoint_store: Optional[CheckpointStore] = None
+_last_checkpoint: Optional[float] = None
+_reconcile_pending = False
+
+# Replay pacing: default acceleration and the longest pause between two replayed ticks
+REPLAY_SPEED = 10.0
+MAX_REPLAY_GAP_SECONDS = 2.0
+
+# Latest run state received over the backplane, served by workers that are not the producer
+latest_status: Dict[str, Any] = {"type": "simulation_status", "is_running": False, "speed": 1.0}
+
+# Wall-clock seconds between simulation broadcasts; acceleration is the engine's speed
+TICK_INTERVAL_SECONDS = 1.0
+
+# Per-phase tick timings (advance, encode, fan-out, persist) and schedule lag
+tick_metrics = TickMetrics()
+
+# Fleet used when the database has no active rakes
+SAMPLE_FLEET = [
+    {"id": "R1234", "from": "Bokaro", "to": "CMO Kolkata", "progress": 45, "status": "In Transit", "freight": "Steel Coils", "weight": 1250},
+    {"id": "R5678", "from": "Bokaro", "to": "Customer A123", "progress": 78, "status": "In Transit", "freight": "Steel Plates", "weight": 980},
+    {"id": "R9012", "from": "Bokaro", "to": "CMO Mumbai", "progress": 92, "status": "Arriving", "freight": "Steel Tubes", "weight": 1080},
+    {"id": "R3456", "from": "Bokaro", "to": "Customer B456", "progress": 15, "status": "Departed", "freight": "Steel Beams", "weight": 1320},
+]
 
 def get_simulation_config(db: Session) -> Dict[str, Any]:
     """
     Get configuration data for the simulation (routes, stations, etc.)
     """
-    # For now, we're returning a standard configuration
-    # In a future version, this could be stored in the database
-    
-    config = {
-        "routes": [
-            {
-                "id": "route-001",
-                "name": "Bokaro-Kolkata",
-                "path": [
-                    {"lat": 23.6345, "lng": 86.1432},
-                    {"lat": 23.5489, "lng": 86.3562},
-                    {"lat": 23.4567, "lng": 86.7890},
-                    {"lat": 22.9865, "lng": 87.3421},
-                    {"lat": 22.5672, "lng": 88.3694}  # Kolkata
-                ],
-                "distance": 260,  # km
-                "avg_transit_time": 8  # hours
-            },
-            {
-                "id": "route-002",
-                "name": "Bokaro-Durgapur",
-                "path": [
-                    {"lat": 23.6345, "lng": 86.1432},
-                    {"lat": 23.5832, "lng": 86.7023},
-                    {"lat": 23.5489, "lng": 87.3198}  # Durgapur
-                ],
-                "distance": 128,  # km
-                "avg_transit_time": 4  # hours
-            }
-        ],
-        "stations": [
-            {
-                "id": "station-001",
-                "name": "Bokaro Steel City",
-                "position": {"lat": 23.6345, "lng": 86.1432},
-                "capacity": 12,  # rakes
-                "facilities": ["loading", "unloading", "maintenance"]
-            },
-            {
-                "id": "station-002",
-                "name": "Kolkata Terminal",
-                "position": {"lat": 22.5672, "lng": 88.3694},
-                "capacity": 8,  # rakes
-                "facilities": ["unloading"]
-            },
-            {
-                "id": "station-003",
-                "name": "Durgapur",
-                "position": {"lat": 23.5489, "lng": 87.3198},
-                "capacity": 6,  # rakes
-                "facilities": ["unloading"]
-            },
-            {
-                "id": "station-004",
-                "name": "Mumbai Terminal",
-                "position": {"lat": 19.0760, "lng": 72.8777},
-                "capacity": 10,  # rakes
-                "facilities": ["unloading", "maintenance"]
-            }
-        ],
-        "stockyards": [
-            {
-                "id": "stockyard-001",
-                "name": "Bokaro Main Yard",
-                "position": {"lat": 23.6298, "lng": 86.1458},
-                "materials": [
-                    {"type": "HR Coil", "quantity": 2500},
-                    {"type": "CR Coil", "quantity": 1800},
-                    {"type": "Plate", "quantity": 950}
-                ]
-            }
-        ]
-    }
-    
-    return config
+    # The network is static for now; copy it so callers cannot mutate the shared definition
+    return copy.deepcopy(SIMULATION_CONFIG)
     
 async def broadcast_update(update_type: str, data: Dict[str, Any], exclude_client_id: str = None):
     """
@@ -259,88 +115,772 @@ async def broadcast_update(update_type: str, data: Dict[str, Any], exclude_clien
     if not active_connections:
         return
         
-    # Prepare the message
-    message = {
-        "type": update_type,
-        "data": data,
-        "timestamp": datetime.now().isoformat()
-    }
-    
-    # Track failed connections to clean up later
-    failed_connections = []
+    # Position ticks come from the snapshot, which encodes and indexes them once;
+    # every subscriber's viewport query shares its spatial index
+    snapshot = snapshots.current
+    index = None
+    if update_type == "position_update" and snapshot is not None and snapshot.positions is data:
+        message = snapshot.message
+        index = snapshot.index
+    else:
+        snapshot = None
+        message = {
+            "type": update_type,
+            "data": data,
+            "timestamp": datetime.now().isoformat()
+        }
+        if update_type == "position_update":
+            index = SpatialGrid(data.get("rakes", []))
+    latest_index = snapshots.current.index if snapshots.current is not None else None
     
-    # Send to all connections
+    # Group recipients by what they see and how it is encoded so each frame is encoded once
+    groups: Dict[Any, List] = {}
     for client_id, connection in active_connections.items():
         if exclude_client_id and client_id == exclude_client_id:
             continue
-            
-        try:
-            await connection.send_json(message)
-        except Exception as e:
-            logging.error(f"Failed to send to client {client_id}: {str(e)}")
-            failed_connections.append(client_id)
+        subscription = connection_subscriptions.get(client_id, DEFAULT_SUBSCRIPTION)
+        if not subscription.wants(update_type):
+            continue
+        if index is None and not subscription.matches_rake(data.get("rake_id"), latest_index):
+            continue
+        filter_key = subscription.filter_key if index is not None else None
+        encoding = connection_encodings.get(client_id, ENCODING_JSON)
+        group = groups.setdefault((filter_key, encoding), (subscription, []))
+        group[1].append((client_id, connection))
+    
+    failed_connections = []
+    filtered_messages: Dict[Any, Dict[str, Any]] = {}
+    coalesce = update_type in COALESCED_TYPES
+    now = time.monotonic()
+    for (filter_key, encoding), (subscription, recipients) in groups.items():
+        if filter_key is None and snapshot is not None:
+            frame = snapshot.frame(encoding)
+        else:
+            if filter_key is None:
+                filtered = message
+            else:
+                filtered = filtered_messages.get(filter_key)
+                if filtered is None:
+                    filtered = filtered_messages[filter_key] = {
+                        **message, "data": filter_positions(data, subscription, index)
+                    }
+            frame = encode_message(filtered, encoding)
+        if coalesce:
+            # Rate-limited clients keep only the latest state until their next slot
+            recipients = [
+                (client_id, connection) for client_id, connection in recipients
+                if _admit_frame(client_id, frame, now)
+            ]
+        failed_connections.extend(await broadcast_frame(recipients, frame))
+    for client_id in failed_connections:
+        logging.error(f"Failed to send to client {client_id}")
     
     # Clean up failed connections
     for client_id in failed_connections:
-        if client_id in active_connections:
-            del active_connections[client_id]
+        remove_connection(client_id)
+
+def _admit_frame(client_id: str, frame, now: float) -> bool:
+    rate = connection_rates.get(client_id)
+    if rate is None:
+        rate = connection_rates[client_id] = ClientRate()
+    if rate.admit(frame, now):
+        return True
+    if not rate.flush_scheduled:
+        rate.flush_scheduled = True
+        asyncio.get_running_loop().call_later(rate.next_due(now), _schedule_flush, client_id, rate)
+    return False
+
+def _schedule_flush(client_id: str, rate: ClientRate):
+    task = asyncio.create_task(_flush_pending(client_id, rate))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+async def _flush_pending(client_id: str, rate: ClientRate):
+    # Deliver the latest coalesced frame once the client's next slot has come
+    rate.flush_scheduled = False
+    connection = active_connections.get(client_id)
+    if connection is None or connection_rates.get(client_id) is not rate:
+        return
+    frame = rate.take_pending(time.monotonic())
+    if frame is None:
+        return
+    try:
+        await send_frame(connection, frame)
+    except Exception:
+        logging.error(f"Failed to send to client {client_id}")
+        remove_connection(client_id)
+
+def set_client_rate(client_id: str, max_fps: Optional[float]):
+    """
+    Set a client's maximum position frame rate (None for every tick)
+    """
+    rate = connection_rates.get(client_id)
+    if rate is None:
+        connection_rates[client_id] = ClientRate(max_fps)
+    else:
+        rate.max_fps = max_fps
+
+def client_statistics() -> List[Dict[str, Any]]:
+    """
+    Per-client encoding, subscription, frame-rate limit and effective rate on this worker
+    """
+    now = time.monotonic()
+    clients = []
+    for client_id in active_connections:
+        rate = connection_rates.get(client_id) or ClientRate()
+        clients.append({
+            "client_id": client_id,
+            "encoding": connection_encodings.get(client_id, ENCODING_JSON),
+            "subscription": connection_subscriptions.get(client_id, DEFAULT_SUBSCRIPTION).to_dict(),
+            **rate.stats(now)
+        })
+    return clients
+
+def remove_connection(client_id: str):
+    """
+    Forget a WebSocket client and its negotiated settings
+    """
+    active_connections.pop(client_id, None)
+    connection_encodings.pop(client_id, None)
+    connection_subscriptions.pop(client_id, None)
+    connection_rates.pop(client_id, None)
+
+def fetch_active_fleet(db: Session) -> List[Dict[str, Any]]:
+    """
+    Read the active (non-idle) rakes and their destinations in the engine's fleet format
+    """
+    rakes = db.query(Rake).filter(Rake.status != "Idle").all()
+    
+    # Destinations of every rake's first order in one query rather than one per rake
+    destinations = {}
+    orders = db.query(Order.rake_id, Order.destination).filter(Order.rake_id.in_([rake.id for rake in rakes]))
+    for rake_id, destination in orders.order_by(Order.id):
+        destinations.setdefault(rake_id, destination)
+    
+    fleet = []
+    for rake in rakes:
+        fleet.append({
+            "id": rake.id,
+            "from": rake.origin or "Bokaro",
+            "to": destinations.get(rake.id, "Unknown"),
+            "progress": rake.transit_progress or 0,
+            "status": rake.status,
+            "departure_time": rake.departure_time,
+            "freight": rake.freight_type,
+            "weight": rake.weight or 0,
+            "utilization": rake.utilization or 0
+        })
+    return fleet
+
+T = TypeVar("T")
+
+async def run_engine(engine, fn: Callable[..., T], *args) -> T:
+    """
+    Call into the simulation engine from async code
+    
+    A sharded engine blocks until every shard process answers, so its calls run
+    on its coordinator thread while the event loop keeps serving clients; the
+    in-process engine is called directly.
+    """
+    if isinstance(engine, ShardedSimulation):
+        return await engine.call(fn, *args)
+    return fn(*args)
+
+def advance_engine(engine, batch: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Bring the engine up to the current clock, apply an event batch and read back the fleet
+    
+    Returns:
+        (positions, rake_cards) for the next snapshot
+    """
+    engine.sync()
+    if batch:
+        engine.apply_events(batch)
+    return engine.positions(), engine.rake_cards()
+
+def read_active_fleet() -> List[Dict[str, Any]]:
+    """
+    Active fleet from the database (blocking), or an empty list if it cannot be read
+
+    Uses its own session because simulation loops outlive any request. Like
+    other polling reads it goes to a read replica when one is configured.
+    """
+    try:
+        db = read_sessionmaker()()
+        try:
+            return fetch_active_fleet(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logging.error(f"Error loading rakes from database: {e}")
+        return []
+
+async def load_fleet_from_db(engine: Optional[SimulationEngine] = None) -> SimulationEngine:
+    """
+    (Re)load the simulation fleet from the database, falling back to sample rakes
+
+    The query runs on the database thread pool, never on the event loop.
+    """
+    engine = engine or simulation_engine
+    fleet = await asyncio.get_running_loop().run_in_executor(db_executor, read_active_fleet)
+    await run_engine(engine, engine.load_fleet, fleet or SAMPLE_FLEET)
+    return engine
+
+async def persist_fleet_async(engine: Optional[SimulationEngine] = None):
+    """
+    Write simulated progress and status back to the rakes table on the database thread pool
+    """
+    engine = engine or simulation_engine
+    if engine.rakes:
+        rows = await run_engine(engine, engine.persisted_rows)
+        await asyncio.get_running_loop().run_in_executor(db_executor, write_fleet_rows, rows)
+
+def write_fleet_rows(fleet_rows: List[Dict[str, Any]]):
+    """
+    Write persisted_rows() output to the rakes table in one transaction
+    """
+    rows = {row["id"]: row for row in fleet_rows}
+    db = SessionLocal()
+    try:
+        db_rakes = db.query(Rake).filter(Rake.id.in_(list(rows))).all()
+        for db_rake in db_rakes:
+            row = rows[db_rake.id]
+            db_rake.transit_progress = row["transit_progress"]
+            db_rake.status = row["status"]
+            db_rake.eta = row["eta"]
+            if row["arrival_time"] is not None:
+                db_rake.arrival_time = row["arrival_time"]
+        db.commit()
+        rake_cache.invalidate(*rows)
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Error persisting simulation state: {e}")
+    finally:
+        db.close()
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    global checkpoint_store
+    if not settings.SIMULATION_CHECKPOINT_DIR:
+        return None
+    if checkpoint_store is None:
+        checkpoint_store = CheckpointStore(settings.SIMULATION_CHECKPOINT_DIR)
+    return checkpoint_store
+
+async def save_checkpoint(engine: Optional[SimulationEngine] = None) -> Optional[int]:
+    """
+    Write a checkpoint of the full simulation state
+    
+    The state is copied on the loop so the checkpoint is consistent with the
+    tick; the write runs on the database thread pool.
+    
+    Returns:
+        Checkpoint size in bytes, or None if checkpoints are disabled or unsupported
+    """
+    global _last_checkpoint
+    engine = engine or simulation_engine
+    store = get_checkpoint_store()
+    # Sharded fleets live in the shard processes and are rebuilt from the database
+    if store is None or not isinstance(engine, SimulationEngine) or not engine.rakes:
+        return None
+    _last_checkpoint = time.monotonic()
+    state = engine.state()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(db_executor, store.save, state)
+    except Exception as e:
+        logging.error(f"Error writing simulation checkpoint: {e}")
+        return None
+
+async def checkpoint_if_due(engine: Optional[SimulationEngine] = None):
+    """
+    Checkpoint once every SIMULATION_CHECKPOINT_SECONDS
+    """
+    engine = engine or simulation_engine
+    if _last_checkpoint is not None and time.monotonic() - _last_checkpoint < settings.SIMULATION_CHECKPOINT_SECONDS:
+        return
+    await save_checkpoint(engine)
+
+async def restore_checkpoint(engine: Optional[SimulationEngine] = None) -> bool:
+    """
+    Restore the simulation from the latest checkpoint, paused
+    
+    The fleet is reconciled with the database on the next tick rather than here,
+    so startup does not wait for the database.
+    
+    Returns:
+        True if a checkpoint was restored
+    """
+    global _reconcile_pending
+    engine = engine or simulation_engine
+    store = get_checkpoint_store()
+    if store is None or not isinstance(engine, SimulationEngine):
+        return False
+    state = await asyncio.get_running_loop().run_in_executor(db_executor, store.load)
+    if state is None:
+        return False
+    try:
+        engine.restore(state)
+    except Exception as e:
+        logging.error(f"Error restoring simulation checkpoint: {e}")
+        return False
+    _reconcile_pending = True
+    logging.info(f"Restored simulation checkpoint ({len(engine.rakes)} rakes, clock {engine.clock:.0f}s)")
+    return True
+
+def read_active_rake_ids() -> Optional[set]:
+    """
+    IDs of the active rakes in the database (blocking), or None if they cannot be read
+    
+    Reads a replica when one is configured, like read_active_fleet.
+    """
+    try:
+        db = read_sessionmaker()()
+        try:
+            return {rake_id for (rake_id,) in db.query(Rake.id).filter(Rake.status != "Idle")}
+        finally:
+            db.close()
+    except Exception as e:
+        logging.error(f"Error reconciling simulation fleet: {e}")
+        return None
+
+async def reconcile_fleet(engine: Optional[SimulationEngine] = None):
+    """
+    Reload the fleet from the database if its active rakes differ from the restored ones
+    """
+    global _reconcile_pending
+    engine = engine or simulation_engine
+    _reconcile_pending = False
+    active = await asyncio.get_running_loop().run_in_executor(db_executor, read_active_rake_ids)
+    # An empty table means the checkpoint holds the sample fleet
+    if active and active != set(engine.index):
+        logging.info("Active rakes changed since the checkpoint; reloading the fleet from the database")
+        await load_fleet_from_db(engine)
 
-async def start_simulation_loop(db: Session, speed_factor: float = 1.0, include_random_events: bool = False):
+async def start_simulation_loop(speed_factor: Optional[float] = None, include_random_events: Optional[bool] = None,
+                                tick_interval: float = TICK_INTERVAL_SECONDS) -> Optional[asyncio.Task]:
     """
-    Start a continuous simulation loop that updates rake positions and broadcasts updates
+    Start the shared simulation, reusing its loop if one is already running
+    
+    Only the backplane producer runs the loop; every worker fans the published
+    ticks out to its own clients.
     
     Args:
-        db: Database session
-        speed_factor: Speed multiplier for the simulation (1.0 = real-time)
-        include_random_events: Whether to generate random events
+        speed_factor: Simulated seconds per wall-clock second (1.0 = real-time); None keeps the current speed
+        include_random_events: Whether to generate random delays, breakdowns and weather; None keeps the current setting
+        tick_interval: Wall-clock seconds between broadcasts (used when a new loop is started)
+    
+    Returns:
+        The simulation loop task, or None on workers that are not the producer
     """
+    if not backplane.is_producer:
+        return None
+    
+    engine = simulation_engine
+    if not engine.rakes:
+        await load_fleet_from_db(engine)
+    if speed_factor is not None:
+        await run_engine(engine, engine.set_speed, speed_factor)
+    if include_random_events is not None:
+        engine.set_random_events(include_random_events)
+    await run_engine(engine, engine.start)
+    return simulation_loops.ensure(SIMULATION_ID, lambda: run_simulation_loop(tick_interval))
+
+async def run_simulation_loop(tick_interval: float = TICK_INTERVAL_SECONDS):
+    """
+    Advance the shared engine and publish a tick at every deadline until cancelled
+    
+    Use start_simulation_loop, which keeps this loop single-flight.
+    """
+    engine = simulation_engine
     try:
-        # Set initial state
-        is_running = True
+        # Ticks are due at fixed deadlines, so their own latency never stretches the period
+        scheduler = TickScheduler(tick_interval, settings.SIMULATION_TICK_POLICY, metrics=tick_metrics)
         
-        # Main simulation loop
-        while is_running:
-            # Get current positions
-            positions = get_live_positions(db)
-            
-            # Broadcast the positions to all clients
-            await broadcast_update("position_update", positions)
-            
-            # Generate random events if enabled
-            if include_random_events and random.random() < 0.1:  # 10% chance each iteration
-                event_types = ["delay", "breakdown", "weather"]
-                event_type = random.choice(event_types)
-                
-                # Select a random rake
-                if positions["rakes"]:
-                    rake = random.choice(positions["rakes"])
-                    rake_id = rake["rake_id"]
-                    
-                    # Create event data
-                    event_data = {
-                        "event_type": event_type,
-                        "rake_id": rake_id,
-                        "details": {}
-                    }
-                    
-                    # Add specific details based on event type
-                    if event_type == "delay":
-                        event_data["details"]["minutes"] = random.randint(15, 90)
-                        event_data["details"]["reason"] = random.choice(["Traffic congestion", "Signal failure", "Track maintenance"])
-                    elif event_type == "breakdown":
-                        event_data["details"]["severity"] = random.choice(["minor", "major"])
-                        event_data["details"]["estimated_fix_time"] = random.randint(30, 180)  # minutes
-                    elif event_type == "weather":
-                        event_data["details"]["severity"] = random.choice(["light", "medium", "severe"])
-                        event_data["details"]["condition"] = random.choice(["rain", "fog", "heat"])
-                    
-                    # Broadcast the event
-                    await broadcast_update("event", event_data)
-            
-            # Sleep based on speed factor (default update every 5 seconds)
-            await asyncio.sleep(5.0 / speed_factor)
+        # Main simulation loop; pausing the engine idles the loop without ending it,
+        # though submitted events are still applied while paused
+        while True:
+            await scheduler.wait()
+            if engine.running or len(event_inbox):
+                await publish_tick(engine)
     
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
         logging.error(f"Error in simulation loop: {str(e)}")
+        await publish_dashboard({"type": "simulation_error", "message": f"Simulation error: {str(e)}"})
+        await run_engine(engine, engine.pause)
     finally:
-        logging.info("Simulation loop stopped")
\ No newline at end of file
+        logging.info("Simulation loop stopped")
+
+async def shutdown_simulation():
+    """
+    Stop every simulation loop and persist the final fleet state (application shutdown)
+    """
+    await simulation_loops.shutdown()
+    if _event_flush is not None:
+        _event_flush.cancel()
+    if backplane.is_producer and simulation_engine.rakes:
+        await run_engine(simulation_engine, simulation_engine.pause)
+        await persist_fleet_async(simulation_engine)
+        await save_checkpoint(simulation_engine)
+    if isinstance(simulation_engine, ShardedSimulation):
+        simulation_engine.close()
+
+async def publish_tick(engine: Optional[SimulationEngine] = None):
+    """
+    Advance the engine, apply the queued event batch and publish one tick
+    """
+    engine = engine or simulation_engine
+    with tick_metrics.phase("total"):
+        with tick_metrics.phase("advance"):
+            if not engine.rakes:
+                await load_fleet_from_db(engine)
+            elif _reconcile_pending:
+                await reconcile_fleet(engine)
+            
+            # Every queued event only touches the rake it targets
+            snapshot = snapshots.update(*await run_engine(engine, advance_engine, engine, event_inbox.drain()))
+        
+        with tick_metrics.phase("encode"):
+            # Encode this tick's frame once for each encoding clients negotiated
+            for encoding in set(connection_encodings.values()):
+                snapshot.frame(encoding)
+        
+        with tick_metrics.phase("fanout"):
+            await _publish_snapshot(engine, snapshot)
+        
+        with tick_metrics.phase("persist"):
+            record_tick(snapshot)
+            await persist_fleet_async(engine)
+            await checkpoint_if_due(engine)
+
+async def _publish_snapshot(engine, snapshot: Snapshot):
+    global _published_event_seq
+    # Publish the snapshot for every worker's clients
+    await publish_update("position_update", snapshot.positions)
+    await publish_dashboard({"type": "simulation_update", "rakes": snapshot.rake_cards})
+    
+    # Publish delays, breakdowns, weather, departures and arrivals since the last tick
+    for event in engine.events_since(_published_event_seq):
+        _published_event_seq = event["seq"]
+        await publish_update("event", event)
+
+async def flush_events(engine: Optional[SimulationEngine] = None):
+    """
+    Apply events queued while the simulation loop is stopped and publish the result
+    
+    Unlike publish_tick this neither persists nor records the fleet: the batch
+    only touches its target rakes, and pause, stop and shutdown save the state.
+    """
+    engine = engine or simulation_engine
+    batch = event_inbox.drain()
+    if not batch:
+        return
+    if not engine.rakes:
+        await load_fleet_from_db(engine)
+    snapshot = snapshots.update(*await run_engine(engine, advance_engine, engine, batch))
+    await _publish_snapshot(engine, snapshot)
+
+async def _flush_events_while_stopped():
+    # The first batch is published at once; later ones coalesce into at most one update per interval
+    while len(event_inbox) and not simulation_loops.is_running(SIMULATION_ID):
+        await flush_events()
+        await asyncio.sleep(TICK_INTERVAL_SECONDS)
+
+def tick_statistics() -> Dict[str, Any]:
+    """
+    Tick schedule settings, missed ticks, lag and per-phase timing histograms
+    """
+    return {
+        "tick_interval": TICK_INTERVAL_SECONDS,
+        "policy": settings.SIMULATION_TICK_POLICY,
+        **tick_metrics.to_dict()
+    }
+
+def record_tick(snapshot: Snapshot):
+    """
+    Append a snapshot to the tick recording, if recording is enabled
+    """
+    global tick_recorder
+    if not settings.SIMULATION_RECORDING_DIR:
+        return
+    try:
+        if tick_recorder is None:
+            tick_recorder = TickRecorder(settings.SIMULATION_RECORDING_DIR)
+        tick_recorder.record(snapshot.positions, snapshot.rake_cards)
+    except Exception as e:
+        # A full or read-only disk must not stop the simulation
+        logging.error(f"Error recording simulation tick: {e}")
+
+def get_tick_log() -> Optional[TickLog]:
+    """
+    Memory-mapped view of the tick recording, refreshed to include the latest ticks
+    """
+    global tick_log
+    if not settings.SIMULATION_RECORDING_DIR:
+        return None
+    if tick_log is None:
+        tick_log = TickLog(settings.SIMULATION_RECORDING_DIR)
+    else:
+        tick_log.refresh()
+    return tick_log
+
+def replay_range() -> Dict[str, Any]:
+    """
+    Number of recorded ticks and the wall-clock time range they cover
+    """
+    log = get_tick_log()
+    time_range = log.time_range() if log else None
+    return {
+        "ticks": len(log) if log else 0,
+        "start": time_range[0].isoformat() if time_range else None,
+        "end": time_range[1].isoformat() if time_range else None
+    }
+
+def get_replay(start: Optional[datetime] = None, end: Optional[datetime] = None,
+               step: int = 1, limit: int = 500) -> Dict[str, Any]:
+    """
+    Recorded ticks between start and end, every step-th tick, at most limit of them
+    """
+    log = get_tick_log()
+    if log is None:
+        return {"ticks": [], "count": 0, "first": 0, "last": 0}
+    first, last = log.span(start, end)
+    last = min(last, first + limit * max(step, 1))
+    ticks = list(log.ticks(first, last, step))
+    return {"ticks": ticks, "count": len(ticks), "first": first, "last": last}
+
+async def stream_replay(websocket: WebSocket, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                        speed: float = REPLAY_SPEED):
+    """
+    Stream recorded ticks to one client, speed times faster than they were recorded
+    
+    A speed of 0 streams as fast as the client can take them. Gaps longer than
+    MAX_REPLAY_GAP_SECONDS (e.g. while the simulation was stopped) are shortened.
+    """
+    log = get_tick_log()
+    first, last = log.span(start, end) if log else (0, 0)
+    previous = None
+    for i in range(first, last):
+        recorded_at = log.wall_time(i)
+        if previous is not None and speed > 0:
+            gap = (recorded_at - previous).total_seconds() / speed
+            await asyncio.sleep(min(max(gap, 0.0), MAX_REPLAY_GAP_SECONDS))
+        previous = recorded_at
+        await send_frame(websocket, dumps({
+            "type": "replay_update",
+            "tick": i,
+            "data": log.tick(i),
+            "timestamp": datetime.now().isoformat()
+        }))
+    await send_frame(websocket, dumps({
+        "type": "replay_complete",
+        "ticks": last - first,
+        "timestamp": datetime.now().isoformat()
+    }))
+
+async def submit_event(event_type: str, rake_id: Optional[str] = None,
+                       details: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Queue a delay, breakdown or weather event for the simulation
+    
+    Weather regions are resolved to rakes here through the snapshot's spatial
+    index; the producer applies the resulting events in its next tick or, when
+    no simulation loop is running, in one coalesced update per tick interval.
+    
+    Returns:
+        Number of rakes the event affects
+    
+    Raises:
+        ValueError: If the event type or rake is unknown
+    """
+    events = expand_event(event_type, rake_id, details, (await current_snapshot()).index)
+    if not events:
+        return 0
+    if backplane.is_producer:
+        await _enqueue_events(events)
+    else:
+        await backplane.publish(EVENTS_CHANNEL, {"events": events})
+    return len(events)
+
+async def _enqueue_events(events: List[Dict[str, Any]]):
+    global _event_flush
+    if event_inbox.submit(events) < len(events):
+        logging.warning(f"Simulation event inbox full; {event_inbox.rejected} events rejected so far")
+    # A running loop applies the inbox on its next tick
+    if not simulation_loops.is_running(SIMULATION_ID) and (_event_flush is None or _event_flush.done()):
+        _event_flush = asyncio.create_task(_flush_events_while_stopped())
+
+async def publish_update(update_type: str, data: Dict[str, Any], exclude_client_id: str = None):
+    """
+    Publish an update over the backplane; every worker broadcasts it to its clients
+    """
+    await backplane.publish(UPDATES_CHANNEL, {
+        "type": update_type,
+        "data": data,
+        "exclude_client_id": exclude_client_id
+    })
+
+async def publish_dashboard(message: Dict[str, Any]):
+    """
+    Publish a message for the dashboard WebSocket (/ws/simulation) on every worker
+    """
+    await backplane.publish(DASHBOARD_CHANNEL, message)
+
+def simulation_status() -> Dict[str, Any]:
+    """
+    Current run state as a simulation_status message
+    """
+    if backplane.is_producer:
+        return {
+            "type": "simulation_status",
+            "is_running": simulation_engine.running,
+            "speed": simulation_engine.speed,
+            "loop_active": simulation_loops.is_running(SIMULATION_ID)
+        }
+    return dict(latest_status)
+
+async def refresh_snapshot() -> Snapshot:
+    """
+    Snapshot the producer's engine now, loading the fleet the first time
+    """
+    engine = simulation_engine
+    if not engine.rakes:
+        await load_fleet_from_db(engine)
+    return snapshots.update(*await run_engine(engine, advance_engine, engine, []))
+
+async def current_snapshot() -> Snapshot:
+    """
+    Latest fleet snapshot, without touching the database once the simulation is loaded
+
+    The producer takes a snapshot on first use and then once per tick; other
+    workers keep the snapshots they receive over the backplane.
+    """
+    snapshot = snapshots.current
+    if snapshot is None:
+        snapshot = await refresh_snapshot() if backplane.is_producer else snapshots.update()
+    return snapshot
+
+async def current_positions() -> Dict[str, Any]:
+    """
+    Latest fleet positions in the position_update format
+    """
+    return (await current_snapshot()).positions
+
+async def current_rake_cards() -> List[Dict[str, Any]]:
+    """
+    Latest dashboard rake cards in the simulation_update format
+    """
+    return (await current_snapshot()).rake_cards
+
+CONTROL_ACTIONS = ("start", "pause", "resume", "stop", "set_speed")
+
+async def apply_control(action: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Apply a control action to the engine; runs on the producer only
+    
+    Returns:
+        Resulting simulation state: running, paused or stopped
+    """
+    params = params or {}
+    engine = simulation_engine
+    if action == "start":
+        await start_simulation_loop(params.get("speed_factor"), params.get("include_random_events"))
+        state = "running"
+    elif action == "pause":
+        await run_engine(engine, engine.pause)
+        state = "paused"
+    elif action == "resume":
+        # Restarts the loop too if the simulation was stopped
+        await start_simulation_loop()
+        state = "running"
+    elif action == "stop":
+        # End the loop, then reset the fleet to its persisted state
+        await run_engine(engine, engine.pause)
+        await simulation_loops.stop(SIMULATION_ID)
+        await load_fleet_from_db(engine)
+        state = "stopped"
+    elif action == "set_speed":
+        await run_engine(engine, engine.set_speed, max(float(params.get("speed", 1.0)), 0.0))
+        state = "running" if engine.running else "paused"
+    else:
+        raise ValueError(f"Invalid action: {action}")
+    
+    # A paused or reset simulation would otherwise keep an older checkpoint until the next tick
+    if action in ("pause", "stop"):
+        await save_checkpoint(engine)
+    
+    # Reloads and speed changes are visible to readers straight away, not at the next tick
+    if action in ("stop", "set_speed"):
+        snapshot = await refresh_snapshot()
+        await publish_update("position_update", snapshot.positions)
+        await publish_dashboard({"type": "simulation_update", "rakes": snapshot.rake_cards})
+    
+    await publish_dashboard(simulation_status())
+    return state
+
+async def request_control(action: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Apply a control action locally on the producer or forward it to the producer
+    
+    Returns:
+        Resulting state, or "requested" when the action was forwarded to another worker
+    """
+    if action not in CONTROL_ACTIONS:
+        raise ValueError(f"Invalid action: {action}")
+    if backplane.is_producer:
+        return await apply_control(action, params)
+    await backplane.publish(CONTROL_CHANNEL, {"action": action, "params": params or {}})
+    return "requested"
+
+async def _on_update(message: Dict[str, Any]):
+    # The producer took its snapshot before publishing; other workers take it from the tick
+    if message["type"] == "position_update" and not backplane.is_producer:
+        snapshots.update(positions=message["data"])
+    await broadcast_update(message["type"], message["data"], message.get("exclude_client_id"))
+
+async def _on_dashboard(message: Dict[str, Any]):
+    global latest_status
+    if message.get("type") == "simulation_update":
+        if not backplane.is_producer:
+            snapshots.update(rake_cards=message.get("rakes", []))
+    elif message.get("type") == "simulation_status":
+        latest_status = message
+
+async def _on_control(message: Dict[str, Any]):
+    if backplane.is_producer:
+        await apply_control(message["action"], message.get("params"))
+
+async def _on_events(message: Dict[str, Any]):
+    if backplane.is_producer:
+        await _enqueue_events(message.get("events", []))
+
+async def _on_role_change(is_producer: bool):
+    # A worker promoted after the previous producer exited picks the simulation up
+    if is_producer:
+        logging.info("This worker is now the simulation producer")
+        if not await restore_checkpoint(simulation_engine):
+            await load_fleet_from_db(simulation_engine)
+        await refresh_snapshot()
+        if latest_status.get("is_running"):
+            await apply_control("start", {"speed_factor": latest_status.get("speed")})
+
+async def start_backplane():
+    """
+    Wire the simulation channels and join the backplane (call once at startup)
+    """
+    backplane.subscribe(UPDATES_CHANNEL, _on_update)
+    backplane.subscribe(DASHBOARD_CHANNEL, _on_dashboard)
+    backplane.subscribe(CONTROL_CHANNEL, _on_control)
+    backplane.subscribe(EVENTS_CHANNEL, _on_events)
+    backplane.on_role_change(_on_role_change)
+    await backplane.start()
+    logging.info(f"Simulation backplane started ({settings.SIMULATION_BACKPLANE}, producer={backplane.is_producer})")
+    
+    # Resume from the last checkpoint instead of rebuilding the fleet from the database
+    if backplane.is_producer and not simulation_engine.rakes and await restore_checkpoint(simulation_engine):
+        await refresh_snapshot()
+
+async def stop_backplane():
+    await backplane.close()
+    if tick_recorder is not None:
+        tick_recorder.close()
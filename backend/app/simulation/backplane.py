@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+import os
+import struct
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Channels used by the simulation
+UPDATES_CHANNEL = "simulation.updates"      # position updates, events, control notices
+DASHBOARD_CHANNEL = "simulation.dashboard"  # rake cards and status for the dashboard socket
+CONTROL_CHANNEL = "simulation.control"      # start/pause/resume/stop/speed requests for the producer
+EVENTS_CHANNEL = "simulation.events"        # delays, breakdowns and weather submitted on any worker
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+RoleHandler = Callable[[bool], Awaitable[None]]
+
+_LENGTH = struct.Struct(">I")
+RECONNECT_DELAY_SECONDS = 0.5
+PEER_WRITE_TIMEOUT_SECONDS = 5.0
+# Peers with more than this much unsent data are too far behind to catch up
+PEER_BUFFER_LIMIT_BYTES = 32 * 1024 * 1024
+
+class Backplane:
+    """
+    Publish/subscribe bus that carries simulation ticks between workers
+
+    Exactly one worker is the producer: it runs the simulation and publishes
+    ticks. Every worker, producer included, receives each published message
+    and fans it out to its own WebSocket clients.
+    """
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._role_handlers: List[RoleHandler] = []
+        self.is_producer = True
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers[channel].append(handler)
+
+    def on_role_change(self, handler: RoleHandler):
+        """
+        Register a callback invoked with is_producer whenever this worker's role changes
+        """
+        self._role_handlers.append(handler)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def _deliver(self, channel: str, message: Dict[str, Any]):
+        for handler in self._handlers.get(channel, []):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"Backplane handler for {channel} failed: {e}")
+
+    async def _set_role(self, is_producer: bool):
+        changed = is_producer != self.is_producer
+        self.is_producer = is_producer
+        if changed:
+            for handler in self._role_handlers:
+                try:
+                    await handler(is_producer)
+                except Exception as e:
+                    logger.error(f"Backplane role handler failed: {e}")
+
+class InProcessBackplane(Backplane):
+    """
+    Single-worker backplane: published messages are delivered directly
+    """
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        await self._deliver(channel, message)
+
+class UnixSocketBackplane(Backplane):
+    """
+    Broker-less backplane for several workers on one host
+
+    Workers elect a hub with an exclusive lock on a lock file. The hub listens
+    on a Unix domain socket, becomes the simulation producer and relays every
+    published frame to all connected workers. The other workers connect as
+    peers. If the hub exits, its lock is released and the peers re-elect.
+    Frames are a 4-byte length followed by a JSON body, encoded once per publish.
+    """
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.is_producer = False
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._hub: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def start(self):
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+        # Give the election a moment so callers see the initial role
+        for _ in range(50):
+            if self.is_producer or self._hub is not None:
+                break
+            await asyncio.sleep(0.01)
+
+    async def close(self):
+        self._closing = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        for writer in list(self._peers):
+            writer.close()
+        self._peers.clear()
+        if self._hub:
+            self._hub.close()
+            self._hub = None
+        if self._server:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._release_lock()
+
+    def _try_lock(self) -> bool:
+        import fcntl
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release_lock(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def _run(self):
+        while not self._closing:
+            if self._try_lock():
+                await self._serve()
+                return
+            try:
+                reader, self._hub = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+            await self._set_role(False)
+            logger.info(f"Backplane connected to hub at {self.path}")
+            await self._read_frames(reader, None)
+            self._hub = None
+            if not self._closing:
+                logger.warning("Backplane hub went away; re-electing")
+
+    async def _serve(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        self._server = await asyncio.start_unix_server(self._accept_peer, path=self.path)
+        logger.info(f"Backplane hub listening on {self.path}")
+        await self._set_role(True)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _accept_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._peers.add(writer)
+        try:
+            await self._read_frames(reader, writer)
+        except asyncio.CancelledError:
+            # Hub shutting down
+            pass
+        finally:
+            self._drop_peer(writer)
+
+    async def _read_frames(self, reader: asyncio.StreamReader, source: Optional[asyncio.StreamWriter]):
+        try:
+            while True:
+                header = await reader.readexactly(_LENGTH.size)
+                body = await reader.readexactly(_LENGTH.unpack(header)[0])
+                if source is not None:
+                    # Hub: relay to every other worker before handling locally
+                    await self._relay(_LENGTH.pack(len(body)) + body, exclude=source)
+                frame = json.loads(body)
+                await self._deliver(frame["channel"], frame["message"])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def _drop_peer(self, writer: asyncio.StreamWriter):
+        self._peers.discard(writer)
+        writer.close()
+
+    async def _relay(self, frame: bytes, exclude: Optional[asyncio.StreamWriter] = None):
+        # Queue the frame for every peer before waiting on any, so one slow
+        # worker delays the others by at most a single write timeout
+        writers = []
+        for writer in list(self._peers):
+            if writer is exclude:
+                continue
+            try:
+                writer.write(frame)
+            except Exception:
+                self._drop_peer(writer)
+                continue
+            if writer.transport.get_write_buffer_size() > PEER_BUFFER_LIMIT_BYTES:
+                logger.warning("Backplane peer fell too far behind; disconnecting it")
+                self._drop_peer(writer)
+                continue
+            writers.append(writer)
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(writer.drain(), PEER_WRITE_TIMEOUT_SECONDS) for writer in writers),
+            return_exceptions=True
+        )
+        for writer, result in zip(writers, results):
+            if isinstance(result, Exception):
+                self._drop_peer(writer)
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        body = dumps({"channel": channel, "message": message}).encode("utf-8")
+        frame = _LENGTH.pack(len(body)) + body
+        if self._server is not None:
+            await self._relay(frame)
+        elif self._hub is not None:
+            try:
+                self._hub.write(frame)
+                await self._hub.drain()
+            except Exception as e:
+                logger.error(f"Backplane publish failed: {e}")
+        await self._deliver(channel, message)
+
+def create_backplane(kind: str, path: Optional[str] = None) -> Backplane:
+    """
+    Build the configured backplane: 'inprocess' (default) or 'unix'
+    """
+    if kind == "unix":
+        return UnixSocketBackplane(path)
+    return InProcessBackplane()
@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Layout of a checkpoint file (an uncompressed .npz archive, loaded without pickle):
+#   one array per per-rake engine array, plus '__meta__', the UTF-8 JSON of
+#   everything else (fleet, pending events, RNG state, clock and settings)
+CHECKPOINT_FILE = "simulation.ckpt.npz"
+CHECKPOINT_VERSION = 1
+_META = "__meta__"
+
+class CheckpointStore:
+    """
+    Keeps the latest simulation checkpoint in a directory
+
+    Checkpoints are written to a temporary file, fsynced and renamed over the
+    previous one, so a crash mid-write always leaves the last complete
+    checkpoint in place.
+    """
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, CHECKPOINT_FILE)
+
+    def save(self, state: Dict[str, Any]) -> int:
+        """
+        Atomically replace the checkpoint with an engine state() copy
+
+        Returns:
+            Size of the checkpoint in bytes
+        """
+        meta = json.dumps({"version": CHECKPOINT_VERSION, **state["meta"]}, separators=(",", ":")).encode("utf-8")
+        fd, temp_path = tempfile.mkstemp(prefix=".checkpoint-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **state["arrays"], **{_META: np.frombuffer(meta, dtype=np.uint8)})
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._sync_directory()
+        return os.path.getsize(self.path)
+
+    def _sync_directory(self):
+        # Make the rename itself durable (not supported on every platform)
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        The latest checkpoint as an engine state, or None if there is no usable one
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as archive:
+                meta = json.loads(archive[_META].tobytes().decode("utf-8"))
+                arrays = {name: archive[name] for name in archive.files if name != _META}
+        except Exception as e:
+            logger.error(f"Ignoring unreadable simulation checkpoint {self.path}: {e}")
+            return None
+        if meta.pop("version", None) != CHECKPOINT_VERSION:
+            logger.error(f"Ignoring simulation checkpoint {self.path} with an unsupported version")
+            return None
+        return {"arrays": arrays, "meta": meta}
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
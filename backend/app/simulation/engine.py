@@ -0,0 +1,611 @@
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.simulation.network import resolve_destination, route_network
+
+# Event kinds handled by the engine
+DEPARTURE = "departure"
+ARRIVAL = "arrival"
+DELAY = "delay"
+BREAKDOWN = "breakdown"
+WEATHER = "weather"
+RESUME = "resume"
+WEATHER_CLEAR = "weather_clear"
+RANDOM_EVENT = "random_event"
+
+# Weather slows rakes down by this factor for the duration of the event
+WEATHER_SPEED_FACTORS = {"light": 0.9, "medium": 0.7, "severe": 0.4}
+WEATHER_DURATION_MINUTES = {"light": 60, "medium": 120, "severe": 240}
+
+# Every status the engine reports, in a fixed order for compact numeric encodings
+STATUSES = ("Loading", "Departed", "In Transit", "Arriving", "Arrived", "Delayed", "Breakdown")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Simulated hours a rake waits at its destination before running the trip again
+DEFAULT_TURNAROUND_HOURS = 2.0
+# Fleet-wide rate of randomly generated delays, breakdowns and weather events
+DEFAULT_EVENT_RATE_PER_HOUR = 0.5
+# Number of recent events kept for consumers that poll events_since()
+EVENT_HISTORY = 1000
+
+# Per-rake arrays saved in checkpoints, in addition to the fleet metadata; route
+# indexes are assigned per process, so restore() resolves them again
+FLEET_ARRAYS = (
+    "distance_km", "covered_km", "cruise_kmph", "speed_factor", "moving", "updated_at", "resume_at", "version",
+    "moving_seconds", "halted_seconds", "halted_since", "trips_completed", "first_arrival"
+)
+
+def status_for_progress(progress: float) -> str:
+    """
+    Map transit progress (0-100) to the rake status used across the API
+    """
+    if progress >= 100:
+        return "Arrived"
+    if progress >= 90:
+        return "Arriving"
+    if progress >= 10:
+        return "In Transit"
+    return "Departed"
+
+class SimulationEngine:
+    """
+    Discrete-event simulation of the rake fleet
+
+    Departures, arrivals, delays, breakdowns and weather are kept in a heap
+    ordered by simulated time. Between events every moving rake advances at its
+    cruise speed, so positions can be computed for any instant without stepping.
+    Simulated time is decoupled from wall time: sync() advances the clock by the
+    wall time elapsed since the last call multiplied by the speed factor.
+    """
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        speed: float = 1.0,
+        start_time: Optional[datetime] = None,
+        random_events: bool = False,
+        event_rate_per_hour: float = DEFAULT_EVENT_RATE_PER_HOUR,
+        turnaround_hours: float = DEFAULT_TURNAROUND_HOURS,
+        record_events: bool = True
+    ):
+        self.rng = random.Random(seed)
+        self.start_time = start_time or datetime.now()
+        self.clock = 0.0  # simulated seconds since start_time
+        self.speed = max(speed, 0.0)
+        self.running = False
+        self.random_events = random_events
+        self.event_rate_per_hour = event_rate_per_hour
+        self.turnaround_hours = turnaround_hours
+        self.record_events = record_events
+
+        self._queue: List[Tuple[float, int, str, int, Dict[str, Any]]] = []
+        self._seq = itertools.count()
+        self._last_wall: Optional[float] = None
+        self._random_event_scheduled = False
+
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=EVENT_HISTORY)
+        self._event_seq = 0
+
+        self._reset_fleet()
+
+    def _reset_fleet(self, size: int = 0):
+        self.rakes: List[Dict[str, Any]] = []
+        self.index: Dict[str, int] = {}
+        self.status: List[str] = []
+        self.distance_km = np.zeros(size)
+        self.covered_km = np.zeros(size)
+        self.cruise_kmph = np.zeros(size)
+        self.speed_factor = np.ones(size)
+        self.moving = np.zeros(size, dtype=bool)
+        self.updated_at = np.zeros(size)  # simulated seconds of last settle
+        self.resume_at = np.zeros(size)  # simulated seconds a halted rake restarts
+        self.version = np.zeros(size, dtype=np.int64)  # invalidates stale arrivals
+        self.route = np.zeros(size, dtype=np.int64)  # index into route_network
+        # Per-rake accounting used by what-if analysis
+        self.moving_seconds = np.zeros(size)
+        self.halted_seconds = np.zeros(size)
+        self.halted_since = np.full(size, np.nan)
+        self.trips_completed = np.zeros(size, dtype=np.int64)
+        self.first_arrival = np.full(size, np.nan)  # simulated seconds
+
+    def load_fleet(self, rakes: List[Dict[str, Any]]):
+        """
+        Replace the fleet and reschedule its pending arrivals and departures
+
+        Args:
+            rakes: Dicts with 'id', 'from', 'to', 'progress', 'status' and
+                optional 'freight', 'weight', 'utilization', 'departure_time'
+        """
+        self._queue = []
+        self._random_event_scheduled = False
+        self._reset_fleet(len(rakes))
+
+        for i, rake in enumerate(rakes):
+            route = resolve_destination(rake.get("to") or "Unknown")
+            self.rakes.append({
+                "id": rake["id"],
+                "from": rake.get("from") or "Bokaro",
+                "to": rake.get("to") or "Unknown",
+                "freight": rake.get("freight") or "N/A",
+                "weight": rake.get("weight") or 0,
+                "utilization": rake.get("utilization") or 0,
+                "departure_time": rake.get("departure_time") or self.now(),
+                "arrival_time": None
+            })
+            self.index[rake["id"]] = i
+            self.distance_km[i] = route["distance_km"]
+            self.cruise_kmph[i] = route["speed_kmph"]
+            self.route[i] = route["route"]
+
+            progress = min(max(float(rake.get("progress") or 0), 0.0), 100.0)
+            self.covered_km[i] = self.distance_km[i] * progress / 100.0
+            self.updated_at[i] = self.clock
+
+            status = rake.get("status") or status_for_progress(progress)
+            if progress >= 100 or status == "Arrived":
+                self.covered_km[i] = self.distance_km[i]
+                self.status.append("Arrived")
+                self._schedule(self.clock + self.turnaround_hours * 3600, DEPARTURE, i)
+            elif status == "Loading":
+                self.status.append("Loading")
+                self._schedule(self.clock, DEPARTURE, i)
+            else:
+                self.status.append(status_for_progress(progress))
+                self.moving[i] = True
+                self._schedule_arrival(i)
+
+        if self.random_events:
+            self._schedule_random_event()
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Copy of the complete simulation state for a checkpoint
+
+        Returns:
+            'arrays' with every per-rake array and JSON-serializable 'meta'
+            (fleet, pending events, RNG state, clock and settings); times are
+            simulated seconds since start_time
+        """
+        rng_version, rng_state, gauss_next = self.rng.getstate()
+        next_seq = next(self._seq)
+        self._seq = itertools.count(next_seq)
+        return {
+            "arrays": {name: getattr(self, name).copy() for name in FLEET_ARRAYS},
+            "meta": {
+                "start_time": self.start_time.isoformat(),
+                "clock": self.clock,
+                "speed": self.speed,
+                "running": self.running,
+                "random_events": self.random_events,
+                "event_rate_per_hour": self.event_rate_per_hour,
+                "turnaround_hours": self.turnaround_hours,
+                "rakes": [
+                    {
+                        **rake,
+                        "departure_time": self._seconds(rake["departure_time"]),
+                        "arrival_time": self._seconds(rake["arrival_time"])
+                    }
+                    for rake in self.rakes
+                ],
+                "status": list(self.status),
+                "queue": [list(item) for item in self._queue],
+                "next_seq": next_seq,
+                "random_event_scheduled": self._random_event_scheduled,
+                "rng": [rng_version, list(rng_state), gauss_next],
+                "events": list(self.events),
+                "event_seq": self._event_seq
+            }
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        """
+        Replace the whole simulation with a state() copy; the restored engine is paused
+        """
+        arrays, meta = state["arrays"], state["meta"]
+        self._reset_fleet(len(meta["rakes"]))
+        for name in FLEET_ARRAYS:
+            setattr(self, name, np.array(arrays[name], dtype=getattr(self, name).dtype))
+
+        self.start_time = datetime.fromisoformat(meta["start_time"])
+        self.clock = float(meta["clock"])
+        self.speed = float(meta["speed"])
+        self.running = False
+        self.random_events = bool(meta["random_events"])
+        self.event_rate_per_hour = float(meta["event_rate_per_hour"])
+        self.turnaround_hours = float(meta["turnaround_hours"])
+        self._last_wall = None
+
+        for i, rake in enumerate(meta["rakes"]):
+            self.rakes.append({
+                **rake,
+                "departure_time": self._time(rake["departure_time"]),
+                "arrival_time": self._time(rake["arrival_time"])
+            })
+            self.index[rake["id"]] = i
+            self.route[i] = resolve_destination(rake["to"])["route"]
+        self.status = list(meta["status"])
+
+        self._queue = [tuple(item) for item in meta["queue"]]
+        heapq.heapify(self._queue)
+        self._seq = itertools.count(int(meta["next_seq"]))
+        self._random_event_scheduled = bool(meta["random_event_scheduled"])
+        rng_version, rng_state, gauss_next = meta["rng"]
+        self.rng.setstate((rng_version, tuple(rng_state), gauss_next))
+        self.events = deque(meta["events"], maxlen=EVENT_HISTORY)
+        self._event_seq = int(meta["event_seq"])
+
+    def now(self) -> datetime:
+        """
+        Current simulated time as a datetime
+        """
+        return self.start_time + timedelta(seconds=self.clock)
+
+    def sync(self, wall_now: Optional[float] = None) -> float:
+        """
+        Advance simulated time by the wall time elapsed since the last sync
+
+        Safe to call from several loops: elapsed time is only counted once.
+
+        Returns:
+            Current simulated clock in seconds
+        """
+        wall_now = time.monotonic() if wall_now is None else wall_now
+        if self.running and self._last_wall is not None:
+            self.run_until(self.clock + max(wall_now - self._last_wall, 0.0) * self.speed)
+        self._last_wall = wall_now
+        return self.clock
+
+    def start(self):
+        self.sync()
+        self.running = True
+        if self.random_events:
+            self._schedule_random_event()
+
+    def pause(self):
+        self.sync()
+        self.running = False
+
+    def set_speed(self, speed: float):
+        """
+        Change the acceleration factor (simulated seconds per wall second)
+        """
+        self.sync()
+        self.speed = max(float(speed), 0.0)
+
+    def set_random_events(self, enabled: bool):
+        self.random_events = enabled
+        if enabled:
+            self._schedule_random_event()
+
+    def run_until(self, sim_time: float):
+        """
+        Process every queued event up to sim_time and move the clock there
+        """
+        while self._queue and self._queue[0][0] <= sim_time:
+            event_time, _, kind, rake, payload = heapq.heappop(self._queue)
+            self.clock = max(self.clock, event_time)
+            self._handle(kind, rake, payload)
+        self.clock = max(self.clock, sim_time)
+
+    def _schedule(self, sim_time: float, kind: str, rake: int = -1, payload: Optional[Dict[str, Any]] = None):
+        heapq.heappush(self._queue, (sim_time, next(self._seq), kind, rake, payload or {}))
+
+    def schedule_event(self, kind: str, rake_id: Optional[str], details: Optional[Dict[str, Any]] = None,
+                       at: Optional[float] = None):
+        """
+        Queue a delay, breakdown or weather event for a rake
+
+        Args:
+            kind: DELAY, BREAKDOWN or WEATHER
+            rake_id: Target rake ID
+            details: Event details (minutes, severity, estimated_fix_time, ...)
+            at: Simulated time in seconds; defaults to now
+        """
+        rake = self.index.get(rake_id, -1) if rake_id is not None else -1
+        self._schedule(self.clock if at is None else at, kind, rake, dict(details or {}))
+
+    def apply_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Apply a batch of externally submitted events at the current clock
+
+        Each event only settles and reschedules the rake it targets, so the
+        cost is O(log n) per event rather than a full-fleet recomputation.
+
+        Args:
+            events: Items with 'kind', 'rake_id' and 'details'
+
+        Returns:
+            Number of events that targeted a rake in the fleet
+        """
+        applied = 0
+        for event in events:
+            if event.get("rake_id") in self.index:
+                self.schedule_event(event["kind"], event["rake_id"], event.get("details"))
+                applied += 1
+        self.run_until(self.clock)
+        return applied
+
+    def _current_speed(self, i: int) -> float:
+        return self.cruise_kmph[i] * self.speed_factor[i]
+
+    def _settle(self, i: int):
+        # Bring rake i's covered distance up to the current clock
+        if self.moving[i]:
+            elapsed = self.clock - self.updated_at[i]
+            self.moving_seconds[i] += elapsed
+            self.covered_km[i] = min(self.distance_km[i], self.covered_km[i] + self._current_speed(i) * elapsed / 3600.0)
+        self.updated_at[i] = self.clock
+
+    def _schedule_arrival(self, i: int):
+        self.version[i] += 1
+        remaining_km = max(self.distance_km[i] - self.covered_km[i], 0.0)
+        speed = max(self._current_speed(i), 1e-6)
+        self._schedule(self.clock + remaining_km / speed * 3600.0, ARRIVAL, i, {"version": int(self.version[i])})
+
+    def _halt(self, i: int, minutes: float, status: str):
+        self._settle(i)
+        if np.isnan(self.halted_since[i]):
+            self.halted_since[i] = self.clock
+        self.moving[i] = False
+        self.version[i] += 1  # drop the pending arrival
+        self.resume_at[i] = max(self.resume_at[i], self.clock + minutes * 60.0)
+        self.status[i] = status
+        self._schedule(self.resume_at[i], RESUME, i)
+
+    def _record(self, event_type: str, rake: int, details: Dict[str, Any]):
+        if not self.record_events:
+            return
+        self._event_seq += 1
+        self.events.append({
+            "seq": self._event_seq,
+            "event_type": event_type,
+            "rake_id": self.rakes[rake]["id"] if rake >= 0 else None,
+            "details": details,
+            "timestamp": self.now().isoformat()
+        })
+
+    def events_since(self, seq: int) -> List[Dict[str, Any]]:
+        """
+        Events recorded after sequence number seq, oldest first
+        """
+        return [event for event in self.events if event["seq"] > seq]
+
+    @property
+    def last_event_seq(self) -> int:
+        return self._event_seq
+
+    def _handle(self, kind: str, rake: int, payload: Dict[str, Any]):
+        if kind == RANDOM_EVENT:
+            self._random_event_scheduled = False
+            self._generate_random_event()
+            return
+        if rake < 0 and kind != WEATHER:
+            return
+
+        if kind == DEPARTURE:
+            self.covered_km[rake] = 0.0
+            self.updated_at[rake] = self.clock
+            self.moving[rake] = True
+            self.status[rake] = "Departed"
+            self.rakes[rake]["departure_time"] = self.now()
+            self.rakes[rake]["arrival_time"] = None
+            self._schedule_arrival(rake)
+            self._record(DEPARTURE, rake, {})
+        elif kind == ARRIVAL:
+            if payload.get("version") != self.version[rake] or not self.moving[rake]:
+                return
+            self._settle(rake)
+            self.covered_km[rake] = self.distance_km[rake]
+            self.moving[rake] = False
+            self.status[rake] = "Arrived"
+            self.trips_completed[rake] += 1
+            if np.isnan(self.first_arrival[rake]):
+                self.first_arrival[rake] = self.clock
+            self.rakes[rake]["arrival_time"] = self.now()
+            self._schedule(self.clock + self.turnaround_hours * 3600, DEPARTURE, rake)
+            self._record(ARRIVAL, rake, {})
+        elif kind == DELAY:
+            if self.status[rake] in ("Arrived", "Loading"):
+                return
+            self._halt(rake, float(payload.get("minutes", 30)), "Delayed")
+            self._record(DELAY, rake, payload)
+        elif kind == BREAKDOWN:
+            if self.status[rake] in ("Arrived", "Loading"):
+                return
+            self._halt(rake, float(payload.get("estimated_fix_time", 60)), "Breakdown")
+            self._record(BREAKDOWN, rake, payload)
+        elif kind == RESUME:
+            if self.moving[rake] or self.status[rake] in ("Arrived", "Loading") or self.clock < self.resume_at[rake]:
+                return
+            self.halted_seconds[rake] += self.clock - self.halted_since[rake]
+            self.halted_since[rake] = np.nan
+            self.updated_at[rake] = self.clock
+            self.moving[rake] = True
+            self.status[rake] = status_for_progress(self.covered_km[rake] / self.distance_km[rake] * 100.0)
+            self._schedule_arrival(rake)
+        elif kind == WEATHER:
+            if rake < 0:
+                return
+            severity = payload.get("severity", "medium")
+            self._settle(rake)
+            self.speed_factor[rake] = WEATHER_SPEED_FACTORS.get(severity, 0.7)
+            if self.moving[rake]:
+                self._schedule_arrival(rake)
+            duration = payload.get("minutes", WEATHER_DURATION_MINUTES.get(severity, 120))
+            self._schedule(self.clock + duration * 60.0, WEATHER_CLEAR, rake)
+            self._record(WEATHER, rake, payload)
+        elif kind == WEATHER_CLEAR:
+            self._settle(rake)
+            self.speed_factor[rake] = 1.0
+            if self.moving[rake]:
+                self._schedule_arrival(rake)
+
+    def _schedule_random_event(self):
+        if self._random_event_scheduled or self.event_rate_per_hour <= 0:
+            return
+        self._random_event_scheduled = True
+        self._schedule(self.clock + self.rng.expovariate(self.event_rate_per_hour / 3600.0), RANDOM_EVENT)
+
+    def _generate_random_event(self):
+        if not self.random_events:
+            return
+        candidates = [i for i in range(len(self.rakes)) if self.moving[i]]
+        if candidates:
+            rake = self.rng.choice(candidates)
+            event_type = self.rng.choice([DELAY, BREAKDOWN, WEATHER])
+            details: Dict[str, Any] = {}
+            if event_type == DELAY:
+                details["minutes"] = self.rng.randint(15, 90)
+                details["reason"] = self.rng.choice(["Traffic congestion", "Signal failure", "Track maintenance"])
+            elif event_type == BREAKDOWN:
+                details["severity"] = self.rng.choice(["minor", "major"])
+                details["estimated_fix_time"] = self.rng.randint(30, 180)  # minutes
+            else:
+                details["severity"] = self.rng.choice(["light", "medium", "severe"])
+                details["condition"] = self.rng.choice(["rain", "fog", "heat"])
+            self._handle(event_type, rake, details)
+        self._schedule_random_event()
+
+    def covered_now(self) -> np.ndarray:
+        """
+        Distance covered by every rake at the current clock (vectorized)
+        """
+        elapsed_h = (self.clock - self.updated_at) / 3600.0
+        advance = np.where(self.moving, self.cruise_kmph * self.speed_factor * elapsed_h, 0.0)
+        return np.minimum(self.covered_km + advance, self.distance_km)
+
+    def progress(self, i: int) -> float:
+        covered = self.covered_now()[i] if len(self.rakes) else 0.0
+        return float(covered / self.distance_km[i] * 100.0) if self.distance_km[i] else 0.0
+
+    def utilization_totals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Seconds each rake has spent moving and halted (delays, breakdowns) up to now
+        """
+        moving = self.moving_seconds + np.where(self.moving, self.clock - self.updated_at, 0.0)
+        halted = self.halted_seconds + np.where(np.isnan(self.halted_since), 0.0, self.clock - self.halted_since)
+        return moving, halted
+
+    def current_status(self, i: int, covered_km: Optional[float] = None) -> str:
+        """
+        Status of rake i at the current clock; moving rakes derive it from progress
+        """
+        if not self.moving[i]:
+            return self.status[i]
+        covered_km = self.covered_now()[i] if covered_km is None else covered_km
+        return status_for_progress(min(covered_km / self.distance_km[i] * 100.0, 99.9))
+
+    def eta(self, i: int, covered_km: Optional[float] = None) -> datetime:
+        covered_km = self.covered_now()[i] if covered_km is None else covered_km
+        remaining_km = max(self.distance_km[i] - covered_km, 0.0)
+        start = self.clock if self.moving[i] else max(self.clock, self.resume_at[i])
+        if self.status[i] == "Arrived":
+            return self.rakes[i]["arrival_time"] or self.now()
+        speed = max(self.cruise_kmph[i] * self.speed_factor[i], 1e-6)
+        return self.start_time + timedelta(seconds=start + remaining_km / speed * 3600.0)
+
+    def _seconds(self, value: Optional[datetime]) -> float:
+        # Simulated seconds since start_time, NaN when unknown
+        return (value - self.start_time).total_seconds() if isinstance(value, datetime) else np.nan
+
+    def _time(self, seconds: Optional[float]) -> Optional[datetime]:
+        # Inverse of _seconds
+        if seconds is None or np.isnan(seconds):
+            return None
+        return self.start_time + timedelta(seconds=float(seconds))
+
+    def fleet_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Per-rake state at the current clock as numeric columns
+
+        Times are simulated seconds since start_time (NaN when unknown) and
+        status is an index into STATUSES, so the result fits in shared memory.
+        """
+        covered = self.covered_now()
+        fraction = np.divide(covered, self.distance_km, out=np.zeros_like(covered), where=self.distance_km > 0)
+        lat, lng = route_network.interpolate(self.route, fraction)
+
+        size = len(self.rakes)
+        status, eta = np.empty(size), np.empty(size)
+        departure, arrival = np.empty(size), np.empty(size)
+        for i, rake in enumerate(self.rakes):
+            status[i] = STATUS_CODES[self.current_status(i, covered[i])]
+            eta[i] = self._seconds(self.eta(i, covered[i]))
+            departure[i] = self._seconds(rake["departure_time"])
+            arrival[i] = self._seconds(rake["arrival_time"])
+        return {
+            "lat": lat,
+            "lng": lng,
+            "speed": np.where(self.moving, self.cruise_kmph * self.speed_factor, 0.0),
+            "progress": fraction * 100.0,
+            "status": status,
+            "eta": eta,
+            "departure": departure,
+            "arrival": arrival
+        }
+
+    def persisted_rows(self) -> List[Dict[str, Any]]:
+        """
+        Progress, status, ETA and arrival time of every rake, as written to the rakes table
+        """
+        covered = self.covered_now()
+        rows = []
+        for i, rake in enumerate(self.rakes):
+            rows.append({
+                "id": rake["id"],
+                "transit_progress": float(covered[i] / self.distance_km[i] * 100.0) if self.distance_km[i] else 0.0,
+                "status": self.current_status(i, covered[i]),
+                "eta": self.eta(i, covered[i]),
+                "arrival_time": rake["arrival_time"] if self.status[i] == "Arrived" else None
+            })
+        return rows
+
+    def positions(self) -> Dict[str, Any]:
+        """
+        Fleet positions in the position_update format used by /ws/simulation
+        """
+        covered = self.covered_now()
+        fraction = np.divide(covered, self.distance_km, out=np.zeros_like(covered), where=self.distance_km > 0)
+        lat, lng = route_network.interpolate(self.route, fraction)
+        speed = np.where(self.moving, self.cruise_kmph * self.speed_factor, 0.0)
+
+        rakes_data = []
+        for i, rake in enumerate(self.rakes):
+            rakes_data.append({
+                "rake_id": rake["id"],
+                "position": {"lat": float(lat[i]), "lng": float(lng[i])},
+                "status": self.current_status(i, covered[i]).lower(),
+                "speed": round(float(speed[i]), 1),
+                "destination": rake["to"],
+                "eta": self.eta(i, covered[i]).isoformat(),
+                "utilization": rake["utilization"],
+                "load_details": f"{rake['freight']} - {rake['weight']} tons"
+            })
+        return {"rakes": rakes_data, "timestamp": self.now().isoformat()}
+
+    def rake_cards(self) -> List[Dict[str, Any]]:
+        """
+        Fleet summary in the simulation_update format used by the dashboard
+        """
+        covered = self.covered_now()
+        cards = []
+        for i, rake in enumerate(self.rakes):
+            departure = rake["departure_time"]
+            cards.append({
+                "id": rake["id"],
+                "from": rake["from"],
+                "to": rake["to"],
+                "progress": round(float(covered[i] / self.distance_km[i] * 100.0), 1) if self.distance_km[i] else 0,
+                "status": self.current_status(i, covered[i]),
+                "departureTime": departure.strftime("%H:%M %p") if isinstance(departure, datetime) else "N/A",
+                "eta": self.eta(i, covered[i]).strftime("%H:%M %p"),
+                "freight": rake["freight"],
+                "weight": f"{rake['weight']} Tons"
+            })
+        return cards
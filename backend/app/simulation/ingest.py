@@ -0,0 +1,124 @@
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from app.simulation.engine import BREAKDOWN, DELAY, WEATHER
+from app.simulation.subscriptions import SpatialGrid
+from app.utils.helpers import calculate_distance
+
+# Event types accepted from the API, mapped onto engine event kinds
+EVENT_TYPES = {"delay": DELAY, "breakdown": BREAKDOWN, "weather": WEATHER}
+
+# Events waiting for the next tick; beyond this, new events are rejected
+MAX_PENDING_EVENTS = 100000
+
+KM_PER_DEGREE = 111.32
+
+def parse_region(region: Any) -> Tuple[Tuple[float, float, float, float], Optional[Tuple[float, float, float]]]:
+    """
+    Parse a weather region into a bounding box and an optional circle
+
+    Accepts [south, west, north, east], {"south", "west", "north", "east"}
+    or {"lat", "lng", "radius_km"}.
+
+    Returns:
+        (bbox, circle) where circle is (lat, lng, radius_km) or None
+
+    Raises:
+        ValueError: If the region is malformed
+    """
+    if isinstance(region, dict) and "radius_km" in region:
+        lat, lng, radius_km = float(region["lat"]), float(region["lng"]), float(region["radius_km"])
+        if radius_km <= 0:
+            raise ValueError("radius_km must be positive")
+        dlat = radius_km / KM_PER_DEGREE
+        dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        return (lat - dlat, lng - dlng, lat + dlat, lng + dlng), (lat, lng, radius_km)
+
+    if isinstance(region, dict):
+        region = [region.get("south"), region.get("west"), region.get("north"), region.get("east")]
+    if not isinstance(region, (list, tuple)) or len(region) != 4 or any(value is None for value in region):
+        raise ValueError("region must be [south, west, north, east] or {lat, lng, radius_km}")
+    bbox = tuple(float(value) for value in region)
+    if bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+        raise ValueError("region south/west must not exceed north/east")
+    return bbox, None
+
+def rakes_in_region(region: Any, index: SpatialGrid) -> List[str]:
+    """
+    IDs of the rakes inside a weather region, found through the snapshot's spatial index
+    """
+    bbox, circle = parse_region(region)
+    found = []
+    for i in index.query(bbox):
+        rake = index.rakes[i]
+        if circle is not None:
+            position = rake.get("position") or {}
+            lat, lng, radius_km = circle
+            if calculate_distance(lat, lng, position.get("lat", 0.0), position.get("lng", 0.0)) > radius_km:
+                continue
+        found.append(rake["rake_id"])
+    return found
+
+def expand_event(event_type: str, rake_id: Optional[str], details: Optional[Dict[str, Any]],
+                 index: SpatialGrid) -> List[Dict[str, Any]]:
+    """
+    Turn one API event into per-rake engine events
+
+    A weather event with a 'region' in its details hits every rake inside the
+    region; one without a rake or region hits the whole fleet.
+
+    Raises:
+        ValueError: If the event type is unknown or the rake does not exist
+    """
+    kind = EVENT_TYPES.get(event_type)
+    if kind is None:
+        raise ValueError(f"Unknown event type: {event_type}")
+    details = dict(details or {})
+
+    if kind == WEATHER and not rake_id:
+        region = details.pop("region", None)
+        if region is not None:
+            rake_ids = rakes_in_region(region, index)
+        else:
+            rake_ids = list(index.by_id)
+        return [{"kind": kind, "rake_id": target, "details": details} for target in rake_ids]
+
+    if rake_id not in index.by_id:
+        raise ValueError(f"Unknown rake: {rake_id}")
+    return [{"kind": kind, "rake_id": rake_id, "details": details}]
+
+class EventInbox:
+    """
+    Bounded FIFO of engine events waiting to be applied in the next tick
+
+    Submitting is O(1) per event; the simulation loop drains the whole batch
+    once per tick, so bursts of events never trigger per-event recomputation.
+    """
+    def __init__(self, max_pending: int = MAX_PENDING_EVENTS):
+        self.max_pending = max_pending
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self.accepted = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, events: Iterable[Dict[str, Any]]) -> int:
+        """
+        Queue events; returns how many were accepted before the inbox filled up
+        """
+        accepted = 0
+        for event in events:
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                continue
+            self._pending.append(event)
+            accepted += 1
+        self.accepted += accepted
+        return accepted
+
+    def drain(self) -> List[Dict[str, Any]]:
+        batch = list(self._pending)
+        self._pending.clear()
+        return batch
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a cancelled loop to finish its current tick
+STOP_TIMEOUT_SECONDS = 5.0
+
+class LoopRegistry:
+    """
+    Single-flight registry of long-running simulation loops, keyed by simulation ID
+
+    ensure() only creates a task when none is running for the key, so repeated
+    start requests reuse the existing loop instead of piling up duplicates.
+    """
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def get(self, key: str) -> Optional[asyncio.Task]:
+        task = self._tasks.get(key)
+        return task if task is not None and not task.done() else None
+
+    def is_running(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def ensure(self, key: str, factory: Callable[[], Awaitable[None]]) -> asyncio.Task:
+        """
+        Return the running loop for key, starting one from factory if there is none
+        """
+        task = self.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.create_task(factory(), name=f"simulation-loop-{key}")
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return task
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Simulation loop {key} failed: {task.exception()}")
+
+    async def stop(self, key: str, timeout: float = STOP_TIMEOUT_SECONDS) -> bool:
+        """
+        Cancel the loop for key and wait for it to finish
+
+        Returns:
+            True if a loop was running
+        """
+        task = self._tasks.pop(key, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        await asyncio.wait({task}, timeout=timeout)
+        return True
+
+    async def shutdown(self, timeout: float = STOP_TIMEOUT_SECONDS):
+        """
+        Cancel every loop and wait for them together (application shutdown)
+        """
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
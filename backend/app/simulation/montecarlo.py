@@ -0,0 +1,163 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.simulation.engine import DEFAULT_EVENT_RATE_PER_HOUR, SimulationEngine
+
+# Tons carried by one rake when a plan allocation is split into rakes
+RAKE_CAPACITY_TONS = 4000.0
+# Penalty per rake-hour spent halted by delays and breakdowns (INR)
+DELAY_COST_PER_HOUR = 5000.0
+# Replications handed to each worker process at a time
+CHUNK_SIZE = 25
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def plan_to_fleet(plan: List[Dict[str, Any]], rake_capacity: float = RAKE_CAPACITY_TONS) -> List[Dict[str, Any]]:
+    """
+    Turn an optimization plan into the rakes needed to carry it
+
+    Args:
+        plan: Allocation items with 'from' (or 'from_stockyard'), 'destination' and 'quantity'
+        rake_capacity: Tons per rake
+
+    Returns:
+        Fleet in the engine's load_fleet format, every rake loading at t=0.
+        Rake IDs are "<order_id>-<allocation>-<rake>" (1-based), unique even when
+        the optimizer splits one order across several stockyards.
+    """
+    fleet = []
+    for a, allocation in enumerate(plan):
+        quantity = float(allocation.get("quantity") or 0)
+        if quantity <= 0:
+            continue
+        origin = allocation.get("from_stockyard") or allocation.get("from") or "Bokaro"
+        num_rakes = max(1, math.ceil(quantity / rake_capacity))
+        for n in range(num_rakes):
+            weight = min(rake_capacity, quantity - n * rake_capacity)
+            fleet.append({
+                "id": f"{allocation.get('order_id', 'PLAN')}-{a + 1}-{n + 1}",
+                "from": origin,
+                "to": allocation.get("destination") or "Unknown",
+                "progress": 0,
+                "status": "Loading",
+                "freight": allocation.get("material") or "N/A",
+                "weight": round(weight, 1),
+                "utilization": round(weight / rake_capacity * 100.0, 1)
+            })
+    return fleet
+
+def run_replication(
+    fleet: List[Dict[str, Any]],
+    seed: int,
+    days: float = 30,
+    event_rate_per_hour: float = DEFAULT_EVENT_RATE_PER_HOUR,
+    delay_cost_per_hour: float = DELAY_COST_PER_HOUR
+) -> Dict[str, Any]:
+    """
+    Run one seeded headless replication as fast as possible (no sleeps, no broadcasts)
+
+    Returns:
+        Per-replication arrival times (hours), fleet utilization (0-1),
+        delay hours, delay cost and trips completed
+    """
+    engine = SimulationEngine(
+        seed=seed,
+        start_time=datetime(2000, 1, 1),
+        random_events=True,
+        event_rate_per_hour=event_rate_per_hour,
+        record_events=False
+    )
+    engine.load_fleet(fleet)
+    engine.running = True
+    horizon = days * 86400.0
+    engine.run_until(horizon)
+
+    moving, halted = engine.utilization_totals()
+    delay_hours = float(halted.sum() / 3600.0)
+    return {
+        "arrival_hours": (engine.first_arrival / 3600.0).tolist(),
+        "utilization": float(moving.sum() / (horizon * max(len(fleet), 1))),
+        "delay_hours": delay_hours,
+        "delay_cost": delay_hours * delay_cost_per_hour,
+        "trips": int(engine.trips_completed.sum())
+    }
+
+def _run_chunk(fleet: List[Dict[str, Any]], seeds: List[int], days: float,
+               event_rate_per_hour: float, delay_cost_per_hour: float) -> List[Dict[str, Any]]:
+    return [run_replication(fleet, seed, days, event_rate_per_hour, delay_cost_per_hour) for seed in seeds]
+
+def _distribution(values: np.ndarray) -> Dict[str, Any]:
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"count": 0}
+    summary = {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max())
+    }
+    for pct, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f"p{pct}"] = float(value)
+    return summary
+
+def run_monte_carlo(
+    plan: List[Dict[str, Any]],
+    replications: int = 1000,
+    days: float = 30,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    event_rate_per_hour: float = DEFAULT_EVENT_RATE_PER_HOUR,
+    delay_cost_per_hour: float = DELAY_COST_PER_HOUR
+) -> Dict[str, Any]:
+    """
+    Run many seeded replications of a plan in a process pool
+
+    Replication i uses seed + i, so results are reproducible for a given seed.
+
+    Args:
+        plan: Allocation items from /rake/optimize
+        replications: Number of replications
+        days: Simulated days per replication
+        seed: Base seed
+        workers: Worker processes (defaults to the CPU count; 1 runs in-process)
+
+    Returns:
+        Distributions of arrival time per rake, fleet utilization and delay cost
+    """
+    fleet = plan_to_fleet(plan)
+    seeds = [seed + i for i in range(replications)]
+    chunks = [seeds[i:i + CHUNK_SIZE] for i in range(0, len(seeds), CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+
+    results: List[Dict[str, Any]] = []
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            results.extend(_run_chunk(fleet, chunk, days, event_rate_per_hour, delay_cost_per_hour))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures = [
+                pool.submit(_run_chunk, fleet, chunk, days, event_rate_per_hour, delay_cost_per_hour)
+                for chunk in chunks
+            ]
+            for future in futures:
+                results.extend(future.result())
+
+    arrivals = np.array([result["arrival_hours"] for result in results], dtype=float).reshape(len(results), len(fleet))
+    return {
+        "replications": len(results),
+        "simulated_days": days,
+        "seed": seed,
+        "rakes": len(fleet),
+        "arrival_hours": {
+            rake["id"]: _distribution(arrivals[:, i]) for i, rake in enumerate(fleet)
+        },
+        "utilization": _distribution(np.array([result["utilization"] for result in results])),
+        "delay_hours": _distribution(np.array([result["delay_hours"] for result in results])),
+        "delay_cost": _distribution(np.array([result["delay_cost"] for result in results])),
+        "trips": _distribution(np.array([result["trips"] for result in results], dtype=float))
+    }
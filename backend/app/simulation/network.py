@@ -0,0 +1,259 @@
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.helpers import calculate_distance
+
+# Static rail network used by the simulation (routes, stations, stockyards).
+# In a future version this could be stored in the database.
+SIMULATION_CONFIG: Dict[str, Any] = {
+    "routes": [
+        {
+            "id": "route-001",
+            "name": "Bokaro-Kolkata",
+            "path": [
+                {"lat": 23.6345, "lng": 86.1432},
+                {"lat": 23.5489, "lng": 86.3562},
+                {"lat": 23.4567, "lng": 86.7890},
+                {"lat": 22.9865, "lng": 87.3421},
+                {"lat": 22.5672, "lng": 88.3694}  # Kolkata
+            ],
+            "distance": 260,  # km
+            "avg_transit_time": 8  # hours
+        },
+        {
+            "id": "route-002",
+            "name": "Bokaro-Durgapur",
+            "path": [
+                {"lat": 23.6345, "lng": 86.1432},
+                {"lat": 23.5832, "lng": 86.7023},
+                {"lat": 23.5489, "lng": 87.3198}  # Durgapur
+            ],
+            "distance": 128,  # km
+            "avg_transit_time": 4  # hours
+        }
+    ],
+    "stations": [
+        {
+            "id": "station-001",
+            "name": "Bokaro Steel City",
+            "position": {"lat": 23.6345, "lng": 86.1432},
+            "capacity": 12,  # rakes
+            "facilities": ["loading", "unloading", "maintenance"]
+        },
+        {
+            "id": "station-002",
+            "name": "Kolkata Terminal",
+            "position": {"lat": 22.5672, "lng": 88.3694},
+            "capacity": 8,  # rakes
+            "facilities": ["unloading"]
+        },
+        {
+            "id": "station-003",
+            "name": "Durgapur",
+            "position": {"lat": 23.5489, "lng": 87.3198},
+            "capacity": 6,  # rakes
+            "facilities": ["unloading"]
+        },
+        {
+            "id": "station-004",
+            "name": "Mumbai Terminal",
+            "position": {"lat": 19.0760, "lng": 72.8777},
+            "capacity": 10,  # rakes
+            "facilities": ["unloading", "maintenance"]
+        }
+    ],
+    "stockyards": [
+        {
+            "id": "stockyard-001",
+            "name": "Bokaro Main Yard",
+            "position": {"lat": 23.6298, "lng": 86.1458},
+            "materials": [
+                {"type": "HR Coil", "quantity": 2500},
+                {"type": "CR Coil", "quantity": 1800},
+                {"type": "Plate", "quantity": 950}
+            ]
+        }
+    ]
+}
+
+ORIGIN_POSITION = {"lat": 23.6345, "lng": 86.1432}  # Bokaro
+
+# Rail distance is longer than the great-circle distance between two stations
+RAIL_CIRCUITY = 1.2
+DEFAULT_SPEED_KMPH = 40.0
+
+def _keyword(name: str) -> str:
+    return name.split()[0].split("-")[-1].lower()
+
+_STATIONS = {_keyword(station["name"]): station for station in SIMULATION_CONFIG["stations"]}
+_ROUTES = {_keyword(route["name"]): route for route in SIMULATION_CONFIG["routes"]}
+
+def _find(table: Dict[str, Dict[str, Any]], destination: str) -> Optional[Dict[str, Any]]:
+    lowered = destination.lower()
+    for keyword, entry in table.items():
+        if keyword in lowered:
+            return entry
+    return None
+
+def _placeholder_position(destination: str) -> Dict[str, float]:
+    # Stable pseudo-location for destinations we have no coordinates for, so a
+    # rake keeps the same heading between calls
+    digest = hashlib.md5(destination.encode("utf-8")).digest()
+    return {
+        "lat": 23.0 + (digest[0] / 255.0) * 2 - 1,
+        "lng": 87.0 + (digest[1] / 255.0) * 2 - 1
+    }
+
+class RouteNetwork:
+    """
+    Precomputed route polylines for fast position lookups
+
+    Every route's vertices are packed into one flat array with a cumulative
+    distance column that is offset per route, so placing the whole fleet is a
+    single searchsorted (binary search) plus a linear interpolation.
+    Configured stations without a path get a direct origin-to-station segment
+    up front; any other destination has its segment appended once, by name.
+    """
+    def __init__(self, config: Dict[str, Any]):
+        self._lock = threading.Lock()
+        self.route_ids: List[str] = []
+        self._route_index: Dict[str, int] = {}
+        self._by_destination: Dict[str, int] = {}
+        self._next_offset = 0.0
+        self.lat = np.zeros(0)
+        self.lng = np.zeros(0)
+        self.cumulative = np.zeros(0)
+        self.start = np.zeros(0, dtype=np.int64)
+        self.end = np.zeros(0, dtype=np.int64)
+        self.offset = np.zeros(0)
+        self.length_km = np.zeros(0)
+        for route in config["routes"]:
+            self._add(route["id"], [(point["lat"], point["lng"]) for point in route["path"]])
+        for station in config["stations"]:
+            if _find(_ROUTES, station["name"]) is None:
+                self._add_direct(f"direct:{station['id']}", station["position"])
+
+    def _add(self, route_id: str, points: List[Tuple[float, float]]) -> int:
+        if len(points) < 2:
+            points = [points[0], points[0]] if points else [(ORIGIN_POSITION["lat"], ORIGIN_POSITION["lng"])] * 2
+        path = np.asarray(points, dtype=float)
+        lat, lng = np.radians(path[:, 0]), np.radians(path[:, 1])
+        # Haversine length of each segment
+        a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+        segment_km = 2 * 6371.0 * np.arcsin(np.sqrt(a))
+        cum = np.concatenate(([0.0], np.cumsum(segment_km)))
+        length = float(cum[-1])
+        offset = self._next_offset
+        vertex = len(self.lat)
+
+        # Existing routes keep their indexes and offsets, so only the new route's
+        # columns are appended. Per-route columns are published last, which keeps
+        # every array a reader can index through a known route consistent.
+        self.lat = np.concatenate((self.lat, path[:, 0]))
+        self.lng = np.concatenate((self.lng, path[:, 1]))
+        # Offset each route (plus a gap) so routes never share a distance value
+        self.cumulative = np.concatenate((self.cumulative, cum + offset))
+        self.start = np.append(self.start, vertex)
+        self.end = np.append(self.end, vertex + len(path) - 1)
+        self.offset = np.append(self.offset, offset)
+        self.length_km = np.append(self.length_km, length)
+        self._next_offset = offset + length + 1.0
+
+        self.route_ids.append(route_id)
+        idx = self._route_index[route_id] = len(self.route_ids) - 1
+        return idx
+
+    def _add_direct(self, route_id: str, position: Dict[str, float]) -> int:
+        return self._add(route_id, [
+            (ORIGIN_POSITION["lat"], ORIGIN_POSITION["lng"]),
+            (position["lat"], position["lng"])
+        ])
+
+    def route_for(self, destination: str) -> int:
+        """
+        Index of the route serving a destination, adding a direct segment if needed
+        """
+        destination = destination or "Unknown"
+        cached = self._by_destination.get(destination)
+        if cached is not None:
+            return cached
+
+        route = _find(_ROUTES, destination)
+        station = _find(_STATIONS, destination)
+        if route:
+            idx = self._route_index[route["id"]]
+        elif station:
+            idx = self._route_index[f"direct:{station['id']}"]
+        else:
+            route_id = f"direct:{destination}"
+            with self._lock:
+                idx = self._route_index.get(route_id)
+                if idx is None:
+                    idx = self._add_direct(route_id, _placeholder_position(destination))
+        self._by_destination[destination] = idx
+        return idx
+
+    def interpolate(self, routes: np.ndarray, fraction: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions for many rakes at once
+
+        Args:
+            routes: Route index per rake
+            fraction: Share of the route covered per rake (0-1)
+
+        Returns:
+            (lat, lng) arrays
+        """
+        routes = np.asarray(routes, dtype=np.int64)
+        if routes.size == 0:
+            return np.zeros(0), np.zeros(0)
+        fraction = np.clip(np.asarray(fraction, dtype=float), 0.0, 1.0)
+        target = self.offset[routes] + fraction * self.length_km[routes]
+
+        idx = np.searchsorted(self.cumulative, target, side="right") - 1
+        idx = np.clip(idx, self.start[routes], self.end[routes] - 1)
+        span = self.cumulative[idx + 1] - self.cumulative[idx]
+        t = np.divide(target - self.cumulative[idx], span, out=np.zeros_like(target), where=span > 0)
+        t = np.clip(t, 0.0, 1.0)
+
+        lat = self.lat[idx] + (self.lat[idx + 1] - self.lat[idx]) * t
+        lng = self.lng[idx] + (self.lng[idx + 1] - self.lng[idx]) * t
+        return lat, lng
+
+# Route geometry is built once when the module is imported and shared by every caller
+route_network = RouteNetwork(SIMULATION_CONFIG)
+
+def resolve_destination(destination: str) -> Dict[str, Any]:
+    """
+    Resolve a destination name to coordinates, rail distance and cruise speed
+
+    Args:
+        destination: Destination name, e.g. "CMO Kolkata" or "Durgapur"
+
+    Returns:
+        Dictionary with 'position', 'distance_km', 'speed_kmph' and 'route'
+        (index into route_network)
+    """
+    destination = destination or "Unknown"
+    route = _find(_ROUTES, destination)
+    station = _find(_STATIONS, destination)
+    position = station["position"] if station else _placeholder_position(destination)
+
+    if route:
+        distance_km = float(route["distance"])
+        speed_kmph = distance_km / route["avg_transit_time"]
+    else:
+        distance_km = RAIL_CIRCUITY * calculate_distance(
+            ORIGIN_POSITION["lat"], ORIGIN_POSITION["lng"], position["lat"], position["lng"]
+        )
+        speed_kmph = DEFAULT_SPEED_KMPH
+
+    return {
+        "position": position,
+        "distance_km": max(distance_km, 1.0),
+        "speed_kmph": speed_kmph,
+        "route": route_network.route_for(destination)
+    }
@@ -0,0 +1,97 @@
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Union
+
+# Latest-state messages that may be coalesced for slow clients; anything else
+# (events, control notices) is always delivered as it happens
+COALESCED_TYPES = frozenset(("position_update",))
+
+# Sliding window used to measure a client's effective frame rate
+RATE_WINDOW_SECONDS = 10.0
+MIN_FPS = 0.01
+
+def parse_max_fps(value: Any) -> Optional[float]:
+    """
+    Validate a client's requested maximum frame rate; None or 0 means unlimited
+
+    Raises:
+        ValueError: If the value is not a non-negative number
+    """
+    if value is None:
+        return None
+    max_fps = float(value)
+    if max_fps < 0:
+        raise ValueError("max_fps must not be negative")
+    if max_fps == 0:
+        return None
+    return max(max_fps, MIN_FPS)
+
+class ClientRate:
+    """
+    Frame-rate limit and delivery statistics for one WebSocket client
+
+    Position frames that arrive before the client's next slot replace the
+    pending one, so a slow client always receives the latest state and never
+    a backlog. The caller flushes the pending frame once next_due() elapses.
+    """
+    def __init__(self, max_fps: Optional[float] = None):
+        self.max_fps = max_fps
+        self.last_sent: Optional[float] = None
+        self.pending: Optional[Union[str, bytes]] = None
+        self.flush_scheduled = False
+        self.sent = 0
+        self.coalesced = 0
+        self._sent_at: Deque[float] = deque()
+
+    @property
+    def min_interval(self) -> float:
+        return 1.0 / self.max_fps if self.max_fps else 0.0
+
+    def _record(self, now: float):
+        self.last_sent = now
+        self.sent += 1
+        self._sent_at.append(now)
+        while self._sent_at and self._sent_at[0] < now - RATE_WINDOW_SECONDS:
+            self._sent_at.popleft()
+
+    def admit(self, frame: Union[str, bytes], now: float) -> bool:
+        """
+        Whether a coalescable frame may be sent now; if not, it becomes the pending frame
+        """
+        if self.last_sent is None or now - self.last_sent >= self.min_interval:
+            if self.pending is not None:
+                self.coalesced += 1
+                self.pending = None
+            self._record(now)
+            return True
+        if self.pending is not None:
+            self.coalesced += 1
+        self.pending = frame
+        return False
+
+    def next_due(self, now: float) -> float:
+        """
+        Seconds until the pending frame may be sent
+        """
+        if self.last_sent is None:
+            return 0.0
+        return max(self.last_sent + self.min_interval - now, 0.0)
+
+    def take_pending(self, now: float) -> Optional[Union[str, bytes]]:
+        frame, self.pending = self.pending, None
+        if frame is not None:
+            self._record(now)
+        return frame
+
+    def effective_fps(self, now: float) -> float:
+        recent = [sent_at for sent_at in self._sent_at if sent_at >= now - RATE_WINDOW_SECONDS]
+        if len(recent) < 2:
+            return float(len(recent)) / RATE_WINDOW_SECONDS
+        return (len(recent) - 1) / max(recent[-1] - recent[0], 1e-6)
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            "max_fps": self.max_fps,
+            "effective_fps": round(self.effective_fps(now), 2),
+            "frames_sent": self.sent,
+            "frames_coalesced": self.coalesced
+        }
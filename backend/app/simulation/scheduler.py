@@ -0,0 +1,156 @@
+import asyncio
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# What to do when a tick overruns its deadline
+SKIP = "skip"          # drop the missed ticks and stay on the original grid
+CATCH_UP = "catch_up"  # run the missed ticks back to back, up to max_catch_up of them
+POLICIES = (SKIP, CATCH_UP)
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram; observing is O(log buckets) and allocation-free
+    """
+    def __init__(self, buckets_ms: Tuple[float, ...] = BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)  # last bucket is +inf
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000.0
+        low, high = 0, len(self.buckets_ms)
+        while low < high:
+            mid = (low + high) // 2
+            if ms <= self.buckets_ms[mid]:
+                high = mid
+            else:
+                low = mid + 1
+        self.counts[low] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the pct-th percentile, in milliseconds
+        """
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * pct / 100.0)
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets_ms[i] if i < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(self.buckets_ms, self.counts)},
+                "le_inf": self.counts[-1]
+            }
+        }
+
+class TickMetrics:
+    """
+    Per-phase tick timings plus schedule lag and missed-tick counters
+    """
+    def __init__(self):
+        self.phases: Dict[str, Histogram] = {}
+        self.lag = Histogram()
+        self.ticks = 0
+        self.missed = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram = self.phases.get(name)
+            if histogram is None:
+                histogram = self.phases[name] = Histogram()
+            histogram.observe(time.perf_counter() - started)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "missed_ticks": self.missed,
+            "lag": self.lag.to_dict(),
+            "phases": {name: histogram.to_dict() for name, histogram in self.phases.items()}
+        }
+
+class TickScheduler:
+    """
+    Paces a loop on absolute deadlines of the monotonic clock
+
+    Deadlines are start + n * interval, so the time spent doing a tick's work
+    never accumulates into drift. When a tick overruns, the SKIP policy runs
+    the latest due tick and drops the older ones, while CATCH_UP runs every
+    missed tick back to back (up to max_catch_up, beyond which it re-anchors).
+    """
+    def __init__(self, interval: float, policy: str = SKIP, max_catch_up: int = 5,
+                 metrics: Optional[TickMetrics] = None, clock: Callable[[], float] = time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown tick policy: {policy}")
+        self.interval = interval
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.metrics = metrics or TickMetrics()
+        self.clock = clock
+        self.deadline: Optional[float] = None
+
+    def reset(self):
+        """
+        Re-anchor the schedule so the next tick is due now
+        """
+        self.deadline = None
+
+    async def wait(self) -> int:
+        """
+        Sleep until the next tick is due
+
+        Returns:
+            Number of ticks dropped because of an overrun
+        """
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+            self.metrics.ticks += 1
+            return 0
+
+        self.deadline += self.interval
+        missed = 0
+        if now > self.deadline:
+            # Deadlines that passed entirely while the previous tick was running
+            behind = int((now - self.deadline) // self.interval)
+            if self.policy == SKIP:
+                # Run the latest due tick now and drop the older ones, staying on the grid
+                self.deadline += behind * self.interval
+                missed = behind
+            elif behind > self.max_catch_up:
+                # Too far behind to catch up; start a fresh grid from now
+                self.deadline = now
+                missed = behind
+            self.metrics.missed += missed
+
+        delay = self.deadline - self.clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.metrics.lag.observe(max(self.clock() - self.deadline, 0.0))
+        self.metrics.ticks += 1
+        return missed
@@ -0,0 +1,482 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+import numpy as np
+
+from app.simulation.engine import (
+    DEFAULT_EVENT_RATE_PER_HOUR, DEFAULT_TURNAROUND_HOURS, EVENT_HISTORY, STATUSES, SimulationEngine
+)
+from app.simulation.network import route_network
+
+logger = logging.getLogger(__name__)
+
+# Partitioning strategies
+PARTITION_HASH = "hash"          # stable hash of the rake ID
+PARTITION_CORRIDOR = "corridor"  # whole routes per shard, balanced by rake count
+PARTITIONS = (PARTITION_HASH, PARTITION_CORRIDOR)
+
+# Columns each shard writes to its shared memory block, one float64 per rake
+COLUMNS = ("lat", "lng", "speed", "progress", "status", "eta", "departure", "arrival")
+_COLUMN = {name: row for row, name in enumerate(COLUMNS)}
+
+# Seconds the coordinator waits for a shard before giving up on a tick
+SHARD_TIMEOUT_SECONDS = 30.0
+
+# Status names indexed by the shards' status codes, as the two output formats spell them
+_STATUS_NAMES = np.array(STATUSES, dtype=object)
+_STATUS_LABELS = np.array([status.lower() for status in STATUSES], dtype=object)
+_ARRIVED = STATUSES.index("Arrived")
+
+T = TypeVar("T")
+
+def partition_fleet(rakes: List[Dict[str, Any]], shards: int, strategy: str = PARTITION_HASH) -> List[List[int]]:
+    """
+    Assign fleet indexes to shards
+
+    Hashing spreads rakes evenly and keeps a rake on the same shard across
+    reloads. Corridor partitioning keeps every rake of a route together (so
+    corridor-wide events stay on one shard) and packs the largest corridors first.
+    """
+    members: List[List[int]] = [[] for _ in range(shards)]
+    if strategy == PARTITION_CORRIDOR:
+        corridors: Dict[int, List[int]] = {}
+        for i, rake in enumerate(rakes):
+            corridors.setdefault(route_network.route_for(rake.get("to") or "Unknown"), []).append(i)
+        for corridor in sorted(corridors.values(), key=len, reverse=True):
+            min(members, key=len).extend(corridor)
+        for shard in members:
+            shard.sort()
+    else:
+        for i, rake in enumerate(rakes):
+            members[zlib.crc32(str(rake["id"]).encode("utf-8")) % shards].append(i)
+    return members
+
+def _shard_main(shard: int, commands, results, options: Dict[str, Any]):
+    """
+    Shard process: owns one partition's engine and writes its state to shared memory
+    """
+    engine = SimulationEngine(
+        seed=None if options["seed"] is None else options["seed"] + shard,
+        start_time=options["start_time"],
+        turnaround_hours=options["turnaround_hours"]
+    )
+    shm: Optional[SharedMemory] = None
+    columns: Optional[np.ndarray] = None
+    published = 0
+
+    while True:
+        command, tick, payload = commands.get()
+        if command == "stop":
+            break
+        try:
+            if command == "load":
+                columns = None
+                if shm is not None:
+                    shm.close()
+                shm = SharedMemory(name=payload["shm"])
+                engine.clock = payload["clock"]
+                engine.event_rate_per_hour = payload["event_rate_per_hour"]
+                engine.random_events = payload["random_events"]
+                engine.load_fleet(payload["fleet"])
+                columns = np.ndarray((len(COLUMNS), max(len(engine.rakes), 1)), dtype=np.float64, buffer=shm.buf)
+                published = engine.last_event_seq
+            elif command == "tick":
+                if payload["random_events"] != engine.random_events:
+                    engine.set_random_events(payload["random_events"])
+                if payload["clock"] > engine.clock:
+                    engine.run_until(payload["clock"])
+                if payload["events"]:
+                    engine.apply_events(payload["events"])
+
+            if engine.rakes:
+                for name, values in engine.fleet_columns().items():
+                    columns[_COLUMN[name], :len(engine.rakes)] = values
+            events = engine.events_since(published)
+            published = engine.last_event_seq
+            results.put(("done", shard, tick, events))
+        except Exception as e:
+            results.put(("error", shard, tick, str(e)))
+
+    columns = None
+    if shm is not None:
+        shm.close()
+
+class ShardedSimulation:
+    """
+    Runs the fleet as several SimulationEngine partitions in worker processes
+
+    The coordinator owns the simulated clock. Each tick it tells every shard
+    to advance to that clock; shards run in parallel and write their rakes'
+    state as numeric columns into their own shared memory block, and the
+    coordinator merges the blocks back into fleet order. Only events cross
+    the process boundary as Python objects.
+
+    Exposes the subset of the SimulationEngine interface the simulation
+    service uses, so it can stand in for the single-process engine. Methods
+    that talk to the shards block until every shard answers; from async code,
+    run them through call() so the event loop keeps serving clients meanwhile.
+    """
+    def __init__(
+        self,
+        shards: int,
+        partition: str = PARTITION_HASH,
+        seed: Optional[int] = None,
+        speed: float = 1.0,
+        start_time: Optional[datetime] = None,
+        random_events: bool = False,
+        event_rate_per_hour: float = DEFAULT_EVENT_RATE_PER_HOUR,
+        turnaround_hours: float = DEFAULT_TURNAROUND_HOURS,
+        timeout: float = SHARD_TIMEOUT_SECONDS
+    ):
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown shard partition: {partition}")
+        self.shards = max(int(shards), 1)
+        self.partition = partition
+        self.seed = seed
+        self.start_time = start_time or datetime.now()
+        self.clock = 0.0
+        self.speed = max(speed, 0.0)
+        self.running = False
+        self.random_events = random_events
+        self.event_rate_per_hour = event_rate_per_hour
+        self.turnaround_hours = turnaround_hours
+        self.timeout = timeout
+
+        self.rakes: List[Dict[str, Any]] = []
+        self.index: Dict[str, int] = {}
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=EVENT_HISTORY)
+        self._event_seq = 0
+        self._last_wall: Optional[float] = None
+        self._synced_clock: Optional[float] = None
+
+        self._members: List[np.ndarray] = []
+        self._placement: Dict[str, int] = {}
+        self._shm: List[Optional[SharedMemory]] = []
+        self._views: List[Optional[np.ndarray]] = []
+        self._processes: List[multiprocessing.Process] = []
+        self._commands: List[Any] = []
+        self._results = None
+        self._ticks = itertools.count(1)
+        # One command in flight at a time; call() runs every coordinator call on one thread
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Per-rake labels copied into every output, built once per load
+        self._ids: List[str] = []
+        self._origins: List[str] = []
+        self._destinations: List[str] = []
+        self._freights: List[str] = []
+        self._utilizations: List[Any] = []
+        self._load_details: List[str] = []
+        self._weights: List[str] = []
+
+    async def call(self, fn: Callable[..., T], *args) -> T:
+        """
+        Run a blocking coordinator call (usually one of this object's methods)
+        on the coordinator thread and await its result
+
+        Calls run one at a time in submission order, so a slow shard delays only
+        the simulation, never the event loop.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulation-shards")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _ensure_started(self):
+        if self._processes:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._results = context.Queue()
+        options = {"seed": self.seed, "start_time": self.start_time, "turnaround_hours": self.turnaround_hours}
+        for shard in range(self.shards):
+            commands = context.Queue()
+            process = context.Process(
+                target=_shard_main, args=(shard, commands, self._results, options),
+                name=f"simulation-shard-{shard}", daemon=True
+            )
+            process.start()
+            self._commands.append(commands)
+            self._processes.append(process)
+        self._shm = [None] * self.shards
+        self._views = [None] * self.shards
+
+    def _dispatch(self, command: str, payloads: Dict[int, Dict[str, Any]]):
+        # Send one command to the given shards and wait until all of them answer
+        with self._lock:
+            tick = next(self._ticks)
+            for shard, payload in payloads.items():
+                self._commands[shard].put((command, tick, payload))
+
+            pending = set(payloads)
+            deadline = time.monotonic() + self.timeout
+            while pending:
+                try:
+                    status, shard, reply_tick, result = self._results.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    raise RuntimeError(f"Simulation shards {sorted(pending)} did not respond")
+                if reply_tick != tick:
+                    continue
+                if status == "error":
+                    raise RuntimeError(f"Simulation shard {shard} failed: {result}")
+                pending.discard(shard)
+                for event in result:
+                    self._event_seq += 1
+                    self.events.append({**event, "seq": self._event_seq})
+
+    def load_fleet(self, rakes: List[Dict[str, Any]]):
+        """
+        Partition the fleet and (re)load every shard with its rakes
+        """
+        self._ensure_started()
+        members = partition_fleet(rakes, self.shards, self.partition)
+
+        old_shm = self._shm
+        self._views = [None] * self.shards
+        self._shm = []
+        payloads = {}
+        for shard, indexes in enumerate(members):
+            shm = SharedMemory(create=True, size=len(COLUMNS) * max(len(indexes), 1) * 8)
+            self._shm.append(shm)
+            payloads[shard] = {
+                "shm": shm.name,
+                "clock": self.clock,
+                "random_events": self.random_events,
+                # The fleet-wide event rate is split in proportion to each shard's rakes
+                "event_rate_per_hour": self.event_rate_per_hour * len(indexes) / max(len(rakes), 1),
+                "fleet": [rakes[i] for i in indexes]
+            }
+        self._dispatch("load", payloads)
+
+        for shm in old_shm:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._members = [np.array(indexes, dtype=np.int64) for indexes in members]
+        self._views = [
+            np.ndarray((len(COLUMNS), max(len(indexes), 1)), dtype=np.float64, buffer=shm.buf)
+            for indexes, shm in zip(members, self._shm)
+        ]
+        self._placement = {rakes[i]["id"]: shard for shard, indexes in enumerate(members) for i in indexes}
+        self.index = {rake["id"]: i for i, rake in enumerate(rakes)}
+        self.rakes = [{
+            "id": rake["id"],
+            "from": rake.get("from") or "Bokaro",
+            "to": rake.get("to") or "Unknown",
+            "freight": rake.get("freight") or "N/A",
+            "weight": rake.get("weight") or 0,
+            "utilization": rake.get("utilization") or 0
+        } for rake in rakes]
+        self._ids = [rake["id"] for rake in self.rakes]
+        self._origins = [rake["from"] for rake in self.rakes]
+        self._destinations = [rake["to"] for rake in self.rakes]
+        self._freights = [rake["freight"] for rake in self.rakes]
+        self._utilizations = [rake["utilization"] for rake in self.rakes]
+        self._load_details = [f"{rake['freight']} - {rake['weight']} tons" for rake in self.rakes]
+        self._weights = [f"{rake['weight']} Tons" for rake in self.rakes]
+        self._synced_clock = self.clock
+
+    def _advance(self, events_by_shard: Optional[Dict[int, List[Dict[str, Any]]]] = None):
+        events_by_shard = events_by_shard or {}
+        shards = range(self.shards) if self._synced_clock != self.clock else events_by_shard
+        self._dispatch("tick", {
+            shard: {"clock": self.clock, "random_events": self.random_events, "events": events_by_shard.get(shard, [])}
+            for shard in shards
+        })
+        self._synced_clock = self.clock
+
+    def now(self) -> datetime:
+        return self.start_time + timedelta(seconds=self.clock)
+
+    def sync(self, wall_now: Optional[float] = None) -> float:
+        """
+        Advance the simulated clock by elapsed wall time and bring every shard up to it
+
+        Blocks until the slowest shard has written its tick.
+        """
+        wall_now = time.monotonic() if wall_now is None else wall_now
+        if self.running and self._last_wall is not None:
+            self.clock += max(wall_now - self._last_wall, 0.0) * self.speed
+        self._last_wall = wall_now
+        if self.rakes and self._synced_clock != self.clock:
+            self._advance()
+        return self.clock
+
+    def start(self):
+        self.sync()
+        self.running = True
+
+    def pause(self):
+        self.sync()
+        self.running = False
+
+    def set_speed(self, speed: float):
+        self.sync()
+        self.speed = max(float(speed), 0.0)
+
+    def set_random_events(self, enabled: bool):
+        self.random_events = enabled
+
+    def run_until(self, sim_time: float):
+        self.clock = max(self.clock, sim_time)
+        if self.rakes:
+            self._advance()
+
+    def apply_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Route each event to the shard that owns its rake and apply them at the current clock
+        """
+        events_by_shard: Dict[int, List[Dict[str, Any]]] = {}
+        for event in events:
+            shard = self._placement.get(event.get("rake_id"))
+            if shard is not None:
+                events_by_shard.setdefault(shard, []).append(event)
+        if events_by_shard:
+            self._advance(events_by_shard)
+        return sum(len(batch) for batch in events_by_shard.values())
+
+    def events_since(self, seq: int) -> List[Dict[str, Any]]:
+        return [event for event in self.events if event["seq"] > seq]
+
+    @property
+    def last_event_seq(self) -> int:
+        return self._event_seq
+
+    def merged_columns(self) -> np.ndarray:
+        """
+        Every shard's latest columns merged back into fleet order, shape (len(COLUMNS), rakes)
+        """
+        merged = np.empty((len(COLUMNS), len(self.rakes)))
+        for members, view in zip(self._members, self._views):
+            if len(members):
+                merged[:, members] = view[:, :len(members)]
+        return merged
+
+    def _times(self, seconds: np.ndarray) -> np.ndarray:
+        # Simulated seconds (NaN when unknown) as datetime64[us] wall times (NaT when unknown)
+        unknown = np.isnan(seconds)
+        micros = np.rint(np.where(unknown, 0.0, seconds) * 1e6).astype(np.int64)
+        times = np.datetime64(self.start_time, "us") + micros.astype("timedelta64[us]")
+        times[unknown] = np.datetime64("NaT")
+        return times
+
+    @staticmethod
+    def _isoformat(times: np.ndarray) -> List[Optional[str]]:
+        # datetime.isoformat() for every time, whole seconds without a fraction
+        text = np.char.replace(np.datetime_as_string(times, unit="us"), ".000000", "").astype(object)
+        text[np.isnat(times)] = None
+        return text.tolist()
+
+    @staticmethod
+    def _clock_labels(times: np.ndarray) -> List[str]:
+        # strftime("%H:%M %p") for every time, "N/A" when unknown
+        minutes = (times - times.astype("datetime64[D]")).astype("timedelta64[m]").astype(np.int64)
+        hours = minutes // 60
+        text = np.char.add(
+            np.char.add(np.char.zfill(hours.astype(str), 2), ":"),
+            np.char.add(np.char.zfill((minutes % 60).astype(str), 2), np.where(hours < 12, " AM", " PM"))
+        ).astype(object)
+        text[np.isnat(times)] = "N/A"
+        return text.tolist()
+
+    def positions(self) -> Dict[str, Any]:
+        merged = self.merged_columns()
+        status = merged[_COLUMN["status"]].astype(np.int64)
+        rakes_data = [
+            {
+                "rake_id": rake_id,
+                "position": {"lat": lat, "lng": lng},
+                "status": label,
+                "speed": speed,
+                "destination": destination,
+                "eta": eta,
+                "utilization": utilization,
+                "load_details": load_details
+            }
+            for rake_id, lat, lng, label, speed, destination, eta, utilization, load_details in zip(
+                self._ids,
+                merged[_COLUMN["lat"]].tolist(),
+                merged[_COLUMN["lng"]].tolist(),
+                _STATUS_LABELS[status].tolist(),
+                np.round(merged[_COLUMN["speed"]], 1).tolist(),
+                self._destinations,
+                self._isoformat(self._times(merged[_COLUMN["eta"]])),
+                self._utilizations,
+                self._load_details
+            )
+        ]
+        return {"rakes": rakes_data, "timestamp": self.now().isoformat()}
+
+    def rake_cards(self) -> List[Dict[str, Any]]:
+        merged = self.merged_columns()
+        status = merged[_COLUMN["status"]].astype(np.int64)
+        return [
+            {
+                "id": rake_id,
+                "from": origin,
+                "to": destination,
+                "progress": progress,
+                "status": name,
+                "departureTime": departure,
+                "eta": eta,
+                "freight": freight,
+                "weight": weight
+            }
+            for rake_id, origin, destination, progress, name, departure, eta, freight, weight in zip(
+                self._ids,
+                self._origins,
+                self._destinations,
+                np.round(merged[_COLUMN["progress"]], 1).tolist(),
+                _STATUS_NAMES[status].tolist(),
+                self._clock_labels(self._times(merged[_COLUMN["departure"]])),
+                self._clock_labels(self._times(merged[_COLUMN["eta"]])),
+                self._freights,
+                self._weights
+            )
+        ]
+
+    def persisted_rows(self) -> List[Dict[str, Any]]:
+        merged = self.merged_columns()
+        status = merged[_COLUMN["status"]].astype(np.int64)
+        arrival = self._times(merged[_COLUMN["arrival"]])
+        arrival[status != _ARRIVED] = np.datetime64("NaT")
+        return [
+            {"id": rake_id, "transit_progress": progress, "status": name, "eta": eta, "arrival_time": arrived}
+            for rake_id, progress, name, eta, arrived in zip(
+                self._ids,
+                merged[_COLUMN["progress"]].tolist(),
+                _STATUS_NAMES[status].tolist(),
+                self._times(merged[_COLUMN["eta"]]).tolist(),
+                arrival.tolist()
+            )
+        ]
+
+    def close(self):
+        """
+        Stop the shard processes and release their shared memory
+        """
+        for commands in self._commands:
+            commands.put(("stop", 0, None))
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self._views = []
+        for shm in self._shm:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._processes, self._commands, self._shm = [], [], []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
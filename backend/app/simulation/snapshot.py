@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from app.simulation.subscriptions import SpatialGrid
+from app.utils.binary_frames import encode_message
+
+class Snapshot:
+    """
+    One immutable view of the fleet, taken once per simulation tick
+
+    Readers share it instead of querying the database or the engine. Encoded
+    position frames and the spatial index are built lazily, at most once per
+    snapshot, so any number of reconnecting clients cost one encode.
+    """
+    def __init__(self, version: int, positions: Dict[str, Any], rake_cards: List[Dict[str, Any]]):
+        self.version = version
+        self.positions = positions
+        self.rake_cards = rake_cards
+        self.timestamp = datetime.now().isoformat()
+        self._frames: Dict[str, Union[str, bytes]] = {}
+        self._index: Optional[SpatialGrid] = None
+
+    @property
+    def message(self) -> Dict[str, Any]:
+        return {"type": "position_update", "data": self.positions, "timestamp": self.timestamp}
+
+    @property
+    def index(self) -> SpatialGrid:
+        if self._index is None:
+            self._index = SpatialGrid(self.positions.get("rakes", []))
+        return self._index
+
+    def frame(self, encoding: str) -> Union[str, bytes]:
+        """
+        The unfiltered position_update frame in the given encoding, encoded once
+        """
+        frame = self._frames.get(encoding)
+        if frame is None:
+            frame = self._frames[encoding] = encode_message(self.message, encoding)
+        return frame
+
+class SnapshotCache:
+    """
+    Holds the latest fleet snapshot; replaced (never mutated) once per tick
+    """
+    def __init__(self):
+        self.current: Optional[Snapshot] = None
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def update(self, positions: Optional[Dict[str, Any]] = None,
+               rake_cards: Optional[List[Dict[str, Any]]] = None) -> Snapshot:
+        """
+        Publish a new snapshot; a part left as None is carried over from the previous one
+        """
+        previous = self.current
+        if positions is None:
+            positions = previous.positions if previous else {"rakes": [], "timestamp": datetime.now().isoformat()}
+        if rake_cards is None:
+            rake_cards = previous.rake_cards if previous else []
+        self._version += 1
+        self.current = Snapshot(self._version, positions, rake_cards)
+        return self.current
+
+    def invalidate(self):
+        self.current = None
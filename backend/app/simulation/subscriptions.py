@@ -0,0 +1,174 @@
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Topics a WebSocket client can subscribe to
+TOPIC_POSITIONS = "positions"
+TOPIC_EVENTS = "events"
+TOPIC_CONTROL = "control"
+ALL_TOPICS = frozenset((TOPIC_POSITIONS, TOPIC_EVENTS, TOPIC_CONTROL))
+
+# Message type -> topic. Types not listed here (connection, config and error
+# messages) are delivered to every client regardless of subscription.
+MESSAGE_TOPICS = {
+    "position_update": TOPIC_POSITIONS,
+    "simulation_update": TOPIC_POSITIONS,
+    "event": TOPIC_EVENTS,
+    "event_notification": TOPIC_EVENTS,
+    "simulation_control": TOPIC_CONTROL,
+    "simulation_started": TOPIC_CONTROL,
+    "simulation_status": TOPIC_CONTROL
+}
+
+# Grid cell size for the spatial index, in degrees (~55 km at Indian latitudes)
+GRID_CELL_DEGREES = 0.5
+
+class SpatialGrid:
+    """
+    Uniform lat/lng grid over one tick's rake positions
+
+    Built once per position broadcast and shared by every subscriber, so a
+    bounding-box query only looks at rakes in the cells it overlaps.
+    """
+    def __init__(self, rakes: List[Dict[str, Any]], cell_size: float = GRID_CELL_DEGREES):
+        self.cell_size = cell_size
+        self.rakes = rakes
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.by_id: Dict[str, int] = {}
+        for i, rake in enumerate(rakes):
+            position = rake.get("position") or {}
+            self.cells[self._cell(position.get("lat", 0.0), position.get("lng", 0.0))].append(i)
+            self.by_id[rake.get("rake_id")] = i
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_size), math.floor(lng / self.cell_size)
+
+    def _inside(self, i: int, bbox: Tuple[float, float, float, float]) -> bool:
+        south, west, north, east = bbox
+        position = self.rakes[i].get("position") or {}
+        return south <= position.get("lat", 0.0) <= north and west <= position.get("lng", 0.0) <= east
+
+    def query(self, bbox: Tuple[float, float, float, float]) -> List[int]:
+        """
+        Indexes of rakes inside bbox (south, west, north, east), in fleet order
+        """
+        south, west, north, east = bbox
+        min_row, min_col = self._cell(south, west)
+        max_row, max_col = self._cell(north, east)
+
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self.cells):
+            # Large viewport: walking the occupied cells is cheaper than the covered ones
+            candidates = [
+                i for (row, col), members in self.cells.items()
+                if min_row <= row <= max_row and min_col <= col <= max_col
+                for i in members
+            ]
+        else:
+            candidates = [
+                i for row in range(min_row, max_row + 1) for col in range(min_col, max_col + 1)
+                for i in self.cells.get((row, col), ())
+            ]
+        return sorted(i for i in candidates if self._inside(i, bbox))
+
+    def contains(self, rake_id: str, bbox: Tuple[float, float, float, float]) -> bool:
+        i = self.by_id.get(rake_id)
+        return i is not None and self._inside(i, bbox)
+
+class Subscription:
+    """
+    What one WebSocket client wants to receive
+
+    A client may narrow rakes by bounding box, by rake IDs, or both (the union
+    of the two is delivered), and may drop whole topics. The default
+    subscription receives everything.
+    """
+    def __init__(
+        self,
+        topics: Optional[Iterable[str]] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        rake_ids: Optional[Iterable[str]] = None
+    ):
+        self.topics = frozenset(topics) if topics is not None else ALL_TOPICS
+        self.bbox = bbox
+        self.rake_ids = frozenset(rake_ids) if rake_ids else None
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> "Subscription":
+        """
+        Parse a client 'subscribe' message
+
+        Raises:
+            ValueError: If topics or bbox are malformed
+        """
+        topics = message.get("topics")
+        if topics is not None:
+            unknown = set(topics) - ALL_TOPICS
+            if unknown:
+                raise ValueError(f"Unknown topics: {sorted(unknown)}")
+
+        bbox = message.get("bbox")
+        if bbox is not None:
+            if isinstance(bbox, dict):
+                bbox = [bbox.get("south"), bbox.get("west"), bbox.get("north"), bbox.get("east")]
+            if len(bbox) != 4 or any(value is None for value in bbox):
+                raise ValueError("bbox must be [south, west, north, east]")
+            bbox = tuple(float(value) for value in bbox)
+            if bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+                raise ValueError("bbox south/west must not exceed north/east")
+
+        return cls(topics=topics, bbox=bbox, rake_ids=message.get("rake_ids"))
+
+    @property
+    def is_filtered(self) -> bool:
+        return self.bbox is not None or self.rake_ids is not None
+
+    @property
+    def filter_key(self) -> Optional[Tuple]:
+        """
+        Hashable key shared by subscriptions that select the same rakes
+        """
+        if not self.is_filtered:
+            return None
+        return self.bbox, tuple(sorted(self.rake_ids)) if self.rake_ids else None
+
+    def wants(self, message_type: str) -> bool:
+        topic = MESSAGE_TOPICS.get(message_type)
+        return topic is None or topic in self.topics
+
+    def select(self, index: SpatialGrid) -> List[Dict[str, Any]]:
+        """
+        Rakes from an indexed tick that this subscription can see
+        """
+        if not self.is_filtered:
+            return index.rakes
+        selected = set(index.query(self.bbox)) if self.bbox is not None else set()
+        if self.rake_ids:
+            selected.update(index.by_id[rake_id] for rake_id in self.rake_ids if rake_id in index.by_id)
+        return [index.rakes[i] for i in sorted(selected)]
+
+    def matches_rake(self, rake_id: Optional[str], index: Optional[SpatialGrid]) -> bool:
+        """
+        Whether an event about rake_id is relevant, using the latest tick's positions
+        """
+        if not self.is_filtered or rake_id is None:
+            return True
+        if self.rake_ids and rake_id in self.rake_ids:
+            return True
+        return self.bbox is not None and index is not None and index.contains(rake_id, self.bbox)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "topics": sorted(self.topics),
+            "bbox": list(self.bbox) if self.bbox else None,
+            "rake_ids": sorted(self.rake_ids) if self.rake_ids else None
+        }
+
+def filter_positions(positions: Dict[str, Any], subscription: Subscription,
+                     index: Optional[SpatialGrid] = None) -> Dict[str, Any]:
+    """
+    Narrow a position payload ({"rakes": [...], "timestamp": ...}) to a subscription
+    """
+    if not subscription.is_filtered:
+        return positions
+    index = index or SpatialGrid(positions.get("rakes", []))
+    return {**positions, "rakes": subscription.select(index)}
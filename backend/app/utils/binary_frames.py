@@ -0,0 +1,186 @@
+import logging
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from app.utils.serialization import dumps
+
+# WebSocket subprotocols understood by /ws/simulation. JSON is the default when
+# a client does not ask for anything (or asks for something we do not know).
+SUBPROTOCOL_JSON = "rakevision.json"
+SUBPROTOCOL_BINARY = "rakevision.bin.v2"
+SUPPORTED_SUBPROTOCOLS = (SUBPROTOCOL_BINARY, SUBPROTOCOL_JSON)
+
+ENCODING_JSON = "json"
+ENCODING_BINARY = "binary"
+
+# Frame layout (all little-endian):
+#   header:  magic "RV", version u8, message kind u8, timestamp i64 (us since epoch),
+#            string count u32, record count u32
+#   strings: for each string, length u16 followed by UTF-8 bytes
+#   records: fixed-width rake records, see _RECORD
+FRAME_MAGIC = b"RV"
+FRAME_VERSION = 2
+KIND_POSITION_UPDATE = 1
+
+_HEADER = struct.Struct("<2sBBqII")
+_STRING_LEN = struct.Struct("<H")
+MAX_STRING_BYTES = 0xFFFF
+# rake_id, destination, status, load_details (string table indexes),
+# lat, lng, speed, utilization (float64 so values survive the round trip exactly),
+# eta (us since epoch, NO_TIMESTAMP when unknown)
+_RECORD = struct.Struct("<IIIIddddq")
+
+NO_TIMESTAMP = -(2 ** 63)
+_EPOCH = datetime(1970, 1, 1)
+
+def negotiate_subprotocol(requested: Sequence[str]) -> Optional[str]:
+    """
+    Pick the subprotocol to accept from the client's Sec-WebSocket-Protocol list
+
+    Returns:
+        The first supported subprotocol the client offered, or None
+    """
+    for subprotocol in requested or ():
+        if subprotocol in SUPPORTED_SUBPROTOCOLS:
+            return subprotocol
+    return None
+
+def encoding_for_subprotocol(subprotocol: Optional[str]) -> str:
+    """
+    Map a negotiated subprotocol onto a frame encoding
+    """
+    return ENCODING_BINARY if subprotocol == SUBPROTOCOL_BINARY else ENCODING_JSON
+
+def _to_micros(value: Union[str, datetime, None]) -> int:
+    if value is None:
+        return NO_TIMESTAMP
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+def _from_micros(value: int) -> Optional[str]:
+    if value == NO_TIMESTAMP:
+        return None
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, value: Any, field: str) -> int:
+        value = "" if value is None else str(value)
+        idx = self.index.get(value)
+        if idx is None:
+            length = len(value.encode("utf-8"))
+            if length > MAX_STRING_BYTES:
+                raise ValueError(
+                    f"{field} is {length} bytes; binary frames hold at most {MAX_STRING_BYTES}"
+                )
+            idx = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+def encode_position_update(message: Dict[str, Any]) -> bytes:
+    """
+    Pack a position_update message into a compact binary frame
+
+    Args:
+        message: {"type": "position_update", "data": {"rakes": [...], "timestamp": ...}}
+
+    Returns:
+        Binary frame
+
+    Raises:
+        ValueError: if a string field does not fit its u16 length prefix
+    """
+    data = message.get("data") or {}
+    rakes = data.get("rakes", [])
+    strings = _StringTable()
+
+    records = bytearray(_RECORD.size * len(rakes))
+    for i, rake in enumerate(rakes):
+        position = rake.get("position") or {}
+        _RECORD.pack_into(
+            records, i * _RECORD.size,
+            strings.add(rake.get("rake_id"), "rake_id"),
+            strings.add(rake.get("destination"), "destination"),
+            strings.add(rake.get("status"), "status"),
+            strings.add(rake.get("load_details"), "load_details"),
+            position.get("lat") or 0.0,
+            position.get("lng") or 0.0,
+            rake.get("speed") or 0.0,
+            rake.get("utilization") or 0.0,
+            _to_micros(rake.get("eta"))
+        )
+
+    parts = [_HEADER.pack(
+        FRAME_MAGIC, FRAME_VERSION, KIND_POSITION_UPDATE,
+        _to_micros(data.get("timestamp") or message.get("timestamp")),
+        len(strings.strings), len(rakes)
+    )]
+    for value in strings.strings:
+        encoded = value.encode("utf-8")
+        parts.append(_STRING_LEN.pack(len(encoded)))
+        parts.append(encoded)
+    parts.append(bytes(records))
+    return b"".join(parts)
+
+def decode_position_update(frame: bytes) -> Dict[str, Any]:
+    """
+    Unpack a binary frame produced by encode_position_update
+
+    Returns:
+        position_update message with the same shape as the JSON encoding
+    """
+    magic, version, kind, timestamp, num_strings, num_records = _HEADER.unpack_from(frame, 0)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION or kind != KIND_POSITION_UPDATE:
+        raise ValueError("Not a position update frame")
+
+    offset = _HEADER.size
+    strings = []
+    for _ in range(num_strings):
+        (length,) = _STRING_LEN.unpack_from(frame, offset)
+        offset += _STRING_LEN.size
+        strings.append(bytes(frame[offset:offset + length]).decode("utf-8"))
+        offset += length
+
+    rakes = []
+    end = offset + _RECORD.size * num_records
+    for rake_id, destination, status, load_details, lat, lng, speed, utilization, eta in \
+            _RECORD.iter_unpack(frame[offset:end]):
+        rakes.append({
+            "rake_id": strings[rake_id],
+            "position": {"lat": lat, "lng": lng},
+            "status": strings[status],
+            "speed": speed,
+            "destination": strings[destination],
+            "eta": _from_micros(eta),
+            "utilization": utilization,
+            "load_details": strings[load_details]
+        })
+
+    iso_timestamp = _from_micros(timestamp)
+    return {
+        "type": "position_update",
+        "data": {"rakes": rakes, "timestamp": iso_timestamp},
+        "timestamp": iso_timestamp
+    }
+
+def encode_message(message: Dict[str, Any], encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """
+    Encode a message for a connection's negotiated encoding
+
+    Only position updates have a binary form; every other message is sent as
+    JSON text so control and event traffic stays readable for all clients. A
+    position update that cannot be packed falls back to JSON as well.
+    """
+    if encoding == ENCODING_BINARY and message.get("type") == "position_update":
+        try:
+            return encode_position_update(message)
+        except ValueError as e:
+            logging.error(f"Sending position update as JSON: {e}")
+    return dumps(message)
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.utils.serialization import dumps
+
+class EntityCache:
+    """
+    Bounded, thread-safe cache of entity snapshots with a time-to-live
+    
+    Entries are column dicts (see snapshot), never ORM instances, so they can be
+    shared between the database pool's threads. The least recently used entry is
+    evicted beyond max_size. Services invalidate entries on their own writes; the
+    TTL bounds staleness from writes made by other processes.
+    """
+    
+    def __init__(self, name: str, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.name = name
+        self.max_size = settings.ENTITY_CACHE_SIZE if max_size is None else max_size
+        self.ttl = settings.ENTITY_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so loads that raced a write are not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+    
+    def put(self, key: Hashable, value: Dict[str, Any], generation: Optional[int] = None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def get_or_load(self, key: Hashable, load: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Cached snapshot for key, calling load() on a miss; misses (None) are not cached
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            generation = self._generation
+        value = load()
+        if value is not None:
+            self.put(key, value, generation)
+        return value
+    
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"name": self.name, "size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+def snapshot(instance, aliases: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Column values of an ORM instance as a plain dict (None for None)
+    
+    aliases maps response field names to column names, as for Projection, so
+    the dict carries the keys the response schema expects.
+    """
+    if instance is None:
+        return None
+    fields = {column: field for field, column in (aliases or {}).items()}
+    return {
+        fields.get(attr.key, attr.key): getattr(instance, attr.key)
+        for attr in inspect(instance).mapper.column_attrs
+    }
+
+def entity_etag(data: Dict[str, Any]) -> str:
+    """
+    Strong ETag for an entity snapshot
+    """
+    return '"' + hashlib.sha1(dumps(data).encode("utf-8")).hexdigest() + '"'
+
+def not_modified(request: Request, response: Response, etag: str) -> bool:
+    """
+    Set the ETag header and report whether If-None-Match already names it
+    """
+    response.headers["ETag"] = etag
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
@@ -0,0 +1,54 @@
+import base64
+import json
+from typing import List, Optional
+
+from fastapi import HTTPException, Response
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(resource: str, key: str) -> str:
+    """
+    Opaque token for the page after the row with primary key `key`
+    """
+    payload = json.dumps({"r": resource, "k": key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def decode_cursor(resource: str, token: str) -> str:
+    """
+    Primary key a cursor continues after
+
+    Raises:
+        ValueError: If the token is malformed or was issued for another resource
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        key = payload["k"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Malformed cursor")
+    if payload.get("r") != resource or not isinstance(key, str):
+        raise ValueError("Cursor does not belong to this listing")
+    return key
+
+def cursor_key(resource: str, cursor: Optional[str], skip: int) -> Optional[str]:
+    """
+    Validate a list request's paging parameters and decode its cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid or combined with skip
+    """
+    if cursor is None:
+        return None
+    if skip:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+    try:
+        return decode_cursor(resource, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def set_next_cursor(response: Response, resource: str, keys: List[str], limit: int):
+    """
+    Advertise the next page's cursor when this page is full
+    """
+    if keys and len(keys) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(resource, keys[-1])
@@ -0,0 +1,59 @@
+from typing import Dict, List, Optional, Sequence, Type
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from app.utils.pagination import set_next_cursor
+from app.utils.serialization import dumps
+
+class Projection:
+    """
+    Response fields of a list endpoint mapped to table columns
+    
+    Built from the endpoint's response schema, so the tuple fast path returns
+    the same fields the Pydantic model documents. Schema fields named
+    differently from their column are mapped through aliases.
+    """
+    
+    def __init__(self, model, schema: Type[BaseModel], aliases: Optional[Dict[str, str]] = None):
+        aliases = aliases or {}
+        table = model.__table__
+        self.key = next(iter(table.primary_key.columns))
+        self.columns = {
+            name: table.c[aliases.get(name, name)]
+            for name in schema.model_fields
+            if aliases.get(name, name) in table.c
+        }
+    
+    def fields(self, fields: Optional[str] = None) -> List[str]:
+        """
+        Parse a comma-separated fields= parameter; all fields when it is empty
+        
+        Raises:
+            HTTPException: 400 if a field is not part of the response
+        """
+        if not fields:
+            return list(self.columns)
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in self.columns]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}; use any of {', '.join(self.columns)}"
+            )
+        return names
+    
+    def select_columns(self, names: Sequence[str]) -> list:
+        """
+        Columns to select for the named fields: the primary key (for paging) first
+        """
+        return [self.key] + [self.columns[name] for name in names]
+    
+    def response(self, names: Sequence[str], rows: Sequence[tuple], resource: str, limit: int) -> Response:
+        """
+        Encode rows selected with select_columns straight to a JSON list response
+        """
+        body = dumps([dict(zip(names, row[1:])) for row in rows])
+        response = Response(content=body, media_type="application/json")
+        set_next_cursor(response, resource, [row[0] for row in rows], limit)
+        return response
@@ -0,0 +1,78 @@
+import asyncio
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+from fastapi import WebSocket
+
+# orjson is several times faster than the stdlib encoder; use it when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(data: Any) -> str:
+    """
+    Serialize data to a compact JSON text frame
+
+    Args:
+        data: JSON-serializable object (datetimes are encoded as ISO strings)
+
+    Returns:
+        JSON document as a string
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=_json_default).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+
+def _json_default(value: Any) -> Any:
+    # Shared by both encoders for types they cannot encode natively: ISO 8601
+    # datetimes (as orjson and Pydantic write them), str() for anything else
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+async def send_frame(websocket: WebSocket, frame: Any) -> None:
+    """
+    Send a pre-encoded frame as a text or binary WebSocket message
+    """
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        await websocket.send_bytes(bytes(frame))
+    else:
+        await websocket.send_text(frame)
+
+async def broadcast_frame(
+    connections: Iterable[Tuple[Hashable, WebSocket]],
+    frame: Any
+) -> List[Hashable]:
+    """
+    Send one pre-encoded frame to many connections concurrently
+
+    Args:
+        connections: (key, websocket) pairs to send to
+        frame: Frame produced by dumps() (text) or a binary encoder (bytes)
+
+    Returns:
+        Keys of the connections the frame could not be delivered to
+    """
+    targets = list(connections)
+    if not targets:
+        return []
+
+    results = await asyncio.gather(
+        *(send_frame(websocket, frame) for _, websocket in targets),
+        return_exceptions=True
+    )
+    return [key for (key, _), result in zip(targets, results) if isinstance(result, Exception)]
+
+async def broadcast_message(
+    connections: Iterable[Tuple[Hashable, WebSocket]],
+    message: Dict[str, Any]
+) -> List[Hashable]:
+    """
+    Encode a message exactly once and send it to every connection
+
+    Returns:
+        Keys of the connections the message could not be delivered to
+    """
+    return await broadcast_frame(connections, dumps(message))
@@ -0,0 +1,77 @@
+"""
+Benchmark: per-client send_json vs. encode-once broadcast
+
+Run from the backend directory:
+    python -m benchmarks.bench_broadcast [clients] [rakes] [rounds]
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app.utils.serialization import broadcast_message
+
+class FakeWebSocket:
+    """
+    Minimal stand-in for a Starlette WebSocket that encodes like the real one
+    but discards the frame instead of writing it to a socket
+    """
+    def __init__(self):
+        self.sent = 0
+
+    async def send_json(self, data, mode: str = "text"):
+        # Starlette's send_json encodes on every call
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        self.sent += len(text)
+
+    async def send_text(self, data: str):
+        self.sent += len(data)
+
+    async def send_bytes(self, data: bytes):
+        self.sent += len(data)
+
+def build_message(num_rakes: int) -> dict:
+    now = datetime.now()
+    return {
+        "type": "position_update",
+        "data": {
+            "rakes": [
+                {
+                    "rake_id": f"R-{1000 + i}",
+                    "position": {"lat": 23.6345 - i * 1e-4, "lng": 86.1432 + i * 1e-4},
+                    "status": "in transit",
+                    "speed": 45,
+                    "destination": "Kolkata",
+                    "eta": (now + timedelta(hours=5)).isoformat(),
+                    "utilization": 92,
+                    "load_details": "HR Coil - 1200 tons"
+                }
+                for i in range(num_rakes)
+            ],
+            "timestamp": now.isoformat()
+        },
+        "timestamp": now.isoformat()
+    }
+
+async def per_client(connections, message):
+    for connection in connections:
+        await connection.send_json(message)
+
+async def encode_once(connections, message):
+    await broadcast_message(enumerate(connections), message)
+
+async def main(num_clients: int = 1000, num_rakes: int = 200, rounds: int = 5):
+    connections = [FakeWebSocket() for _ in range(num_clients)]
+    message = build_message(num_rakes)
+
+    for name, fn in (("send_json per client", per_client), ("encode once", encode_once)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await fn(connections, message)
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"{name:>22}: {elapsed * 1000:8.2f} ms per broadcast to {num_clients} clients")
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    asyncio.run(main(*args))
@@ -0,0 +1,132 @@
+"""
+Load test: simulation tick latency under concurrent REST traffic
+
+Runs the live simulation loop and a fake WebSocket client, then measures how
+far each tick's broadcast lands from its one-second deadline while idle, while
+clients query the database directly on the event loop (the old blocking
+path), and while they call the REST API, whose queries run on the database
+thread pool. Each client sends a fixed number of requests per second, so the
+comparison isolates blocking from plain CPU saturation. Seeds BENCH-
+stockyards and removes them afterwards.
+
+Run from the backend directory:
+    python -m benchmarks.bench_db_load [concurrency] [seconds] [rows] [requests_per_second]
+"""
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("SIMULATION_RECORDING_DIR", "")
+os.environ.setdefault("SIMULATION_CHECKPOINT_DIR", "")
+
+import httpx
+
+from app.core.database import SessionLocal, init_db
+from app.main import app
+from app.models.inventory import Inventory
+from app.services import simulation_service
+from app.services.inventory_service import get_all_stockyards
+from app.simulation.scheduler import Histogram
+
+PREFIX = "BENCH-"
+PAGE = 200
+
+class FakeWebSocket:
+    """
+    Records when each broadcast frame reaches this client
+    """
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, data: str):
+        self.received.append(time.monotonic())
+
+    async def send_bytes(self, data: bytes):
+        self.received.append(time.monotonic())
+
+def seed(rows: int):
+    db = SessionLocal()
+    try:
+        db.query(Inventory).filter(Inventory.stockyard_id.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.add_all([
+            Inventory(stockyard_id=f"{PREFIX}{i:06d}", material="Coal", capacity=1000.0 + i, location="23.6345,86.1432")
+            for i in range(rows)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(Inventory).filter(Inventory.stockyard_id.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+async def paced(stop: asyncio.Event, rate: float, request):
+    interval = 1.0 / rate
+    deadline = time.monotonic()
+    while not stop.is_set():
+        await request()
+        deadline += interval
+        await asyncio.sleep(max(deadline - time.monotonic(), 0.0))
+
+async def blocking_request():
+    # The pre-executor pattern: a synchronous session used inside a coroutine
+    db = SessionLocal()
+    try:
+        [row.stockyard_id for row in get_all_stockyards(db, skip=PAGE * 40, limit=PAGE, material="Coal")]
+    finally:
+        db.close()
+
+def rest_request(client: httpx.AsyncClient):
+    async def request():
+        response = await client.get("/api/inventory/stockyards", params={"skip": PAGE * 40, "limit": PAGE, "material": "Coal"})
+        response.raise_for_status()
+    return request
+
+async def measure(name: str, seconds: float, websocket: FakeWebSocket, clients=None):
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(client(stop)) for client in (clients or [])]
+    simulation_service.tick_metrics.lag = lag = Histogram()
+    start = len(websocket.received)
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    received = websocket.received[start:]
+    gaps = Histogram()
+    for previous, current in zip(received, received[1:]):
+        gaps.observe(abs(current - previous - simulation_service.TICK_INTERVAL_SECONDS))
+    print(
+        f"{name:>22}: {len(received):3d} ticks, schedule lag p50 {lag.percentile(50)} ms "
+        f"p99 {lag.percentile(99)} ms, tick jitter p99 {gaps.percentile(99)} ms max {gaps.max_ms:.1f} ms"
+    )
+
+async def main(concurrency: int = 8, seconds: float = 10.0, rows: int = 20000, rate: int = 5):
+    init_db()
+    seed(rows)
+    websocket = FakeWebSocket()
+    simulation_service.active_connections["bench"] = websocket
+    await simulation_service.start_backplane()
+    await simulation_service.start_simulation_loop()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await measure("idle", seconds, websocket)
+            await measure("blocking sessions", seconds, websocket,
+                          [lambda stop: paced(stop, rate, blocking_request) for _ in range(concurrency)])
+            await measure("REST on thread pool", seconds, websocket,
+                          [lambda stop: paced(stop, rate, rest_request(client)) for _ in range(concurrency)])
+    finally:
+        simulation_service.remove_connection("bench")
+        await simulation_service.simulation_loops.shutdown()
+        await simulation_service.stop_backplane()
+        cleanup()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:5]]
+    asyncio.run(main(*args))
@@ -0,0 +1,118 @@
+"""
+Benchmark: database throughput per engine profile
+
+For each SQLite profile, measures single-row write transactions per second and
+read queries per second from the database thread pool while one writer keeps
+committing (the simulation's access pattern). The "development (no statement
+cache)" row isolates the compiled-statement cache. Pass a PostgreSQL URL to
+benchmark the "default" and "production" pool profiles against it instead.
+
+Run from the backend directory:
+    python -m benchmarks.bench_db_profiles [seconds] [readers] [postgres_url]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_db_engine, engine_profile
+from app.models.inventory import Inventory
+
+ROWS = 5000
+
+def prepare(db_engine):
+    Base.metadata.create_all(bind=db_engine, tables=[Inventory.__table__])
+    Session = sessionmaker(bind=db_engine)
+    db = Session()
+    try:
+        db.query(Inventory).delete()
+        db.add_all([
+            Inventory(stockyard_id=f"SY-{i:06d}", material=("Coal", "Iron Ore", "Limestone")[i % 3],
+                      capacity=float(i), location="23.6345,86.1432")
+            for i in range(ROWS)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return Session
+
+def writes_per_second(Session, seconds: float) -> float:
+    db = Session()
+    count = 0
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            yard = db.get(Inventory, f"SY-{count % ROWS:06d}")
+            yard.capacity += 1
+            db.commit()
+            count += 1
+    finally:
+        db.close()
+    return count / seconds
+
+def reads_per_second(Session, seconds: float, readers: int) -> float:
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def writer():
+        db = Session()
+        i = 0
+        try:
+            while not stop.is_set():
+                db.get(Inventory, f"SY-{i % ROWS:06d}").capacity += 1
+                db.commit()
+                i += 1
+        finally:
+            db.close()
+
+    def reader(slot: int):
+        db = Session()
+        try:
+            while not stop.is_set():
+                db.query(Inventory).filter(Inventory.material == "Coal").offset(slot * 10).limit(50).all()
+                db.expunge_all()
+                counts[slot] += 1
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=readers + 1) as pool:
+        pool.submit(writer)
+        for slot in range(readers):
+            pool.submit(reader, slot)
+        time.sleep(seconds)
+        stop.set()
+    return sum(counts) / seconds
+
+def run(name: str, uri: str, profile: dict, seconds: float, readers: int):
+    db_engine = create_db_engine(uri, profile, echo=False)
+    try:
+        Session = prepare(db_engine)
+        writes = writes_per_second(Session, seconds)
+        reads = reads_per_second(Session, seconds, readers)
+        print(f"{name:>36}: {writes:9.0f} writes/s {reads:9.0f} reads/s with a concurrent writer")
+    finally:
+        db_engine.dispose()
+
+def main(seconds: float = 3.0, readers: int = 4, postgres_url: str = ""):
+    if postgres_url:
+        for name in ("default", "production"):
+            run(name, postgres_url, engine_profile(name), seconds, readers)
+        return
+
+    variants = [
+        ("default", engine_profile("default")),
+        ("development", engine_profile("development")),
+        ("development (no statement cache)", {**engine_profile("development"), "statement_cache_size": 0}),
+        ("edge", engine_profile("edge"))
+    ]
+    with tempfile.TemporaryDirectory(prefix="rakevision-bench-") as directory:
+        for i, (name, profile) in enumerate(variants):
+            run(name, f"sqlite:///{os.path.join(directory, f'bench-{i}.db')}", profile, seconds, readers)
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    main(float(args[0]) if args else 3.0, int(args[1]) if len(args) > 1 else 4, args[2] if len(args) > 2 else "")
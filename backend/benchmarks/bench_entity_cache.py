@@ -0,0 +1,49 @@
+"""
+Benchmark: single-entity lookups through the entity cache
+
+Times get_stockyard for a working set of stockyards with the cache disabled
+(every call queries the database) and enabled (repeat calls are served from
+memory), from one session as the database thread pool uses them.
+
+Run from the backend directory:
+    python -m benchmarks.bench_entity_cache [lookups]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+import app.services.inventory_service as inventory_service
+from app.core.database import Base, create_db_engine, engine_profile
+from app.models.inventory import Inventory
+from app.utils.entity_cache import EntityCache
+
+ROWS = 5000
+WORKING_SET = 200
+
+def main(lookups: int = 50000):
+    with tempfile.TemporaryDirectory(prefix="rakevision-bench-") as directory:
+        db_engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'cache.db')}", engine_profile("development"), echo=False)
+        Base.metadata.create_all(bind=db_engine, tables=[Inventory.__table__])
+        db = sessionmaker(bind=db_engine)()
+        db.add_all([Inventory(stockyard_id=f"SY-{i:06d}", material="Coal", capacity=float(i), location="23.6,86.1")
+                    for i in range(ROWS)])
+        db.commit()
+
+        for name, max_size in (("no cache", 0), ("entity cache", 1024)):
+            cache = EntityCache("stockyards", max_size=max_size, ttl=30)
+            inventory_service.stockyard_cache = cache
+            started = time.perf_counter()
+            for i in range(lookups):
+                inventory_service.get_stockyard(db, f"SY-{(i * 7919) % WORKING_SET:06d}")
+                # A session per request in the app; drop identity-map hits here too
+                db.expunge_all()
+            elapsed = time.perf_counter() - started
+            print(f"{name:>12}: {lookups / elapsed:10,.0f} lookups/s {cache.stats()}")
+        db.close()
+        db_engine.dispose()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
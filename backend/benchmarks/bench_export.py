@@ -0,0 +1,66 @@
+"""
+Benchmark: streaming table export versus materializing the JSON list
+
+Fills a scratch database with orders, then compares peak traced memory and
+time for stream_export (selected columns through a server-side cursor) against
+loading every ORM object and Pydantic model the way the list endpoints do.
+
+Run from the backend directory:
+    python -m benchmarks.bench_export [rows]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_db_engine, engine_profile
+from app.models.order import Order
+from app.models.rake import Rake  # noqa: F401 - registers the table orders.rake_id refers to
+from app.schemas.order_schema import OrderImportRow
+from app.services.export_service import export_columns, stream_export
+from app.services.order_service import import_orders
+from benchmarks.bench_order_import import generate_csv
+
+def measure(name: str, call):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = call()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:>28}: {elapsed:6.2f}s, {size / 1e6:6.1f} MB out, peak {peak / 1e6:6.1f} MB")
+
+def main(rows: int = 100000):
+    with tempfile.TemporaryDirectory(prefix="rakevision-bench-") as directory:
+        db_engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'export.db')}", engine_profile("development"), echo=False)
+        Base.metadata.create_all(bind=db_engine)
+        Session = sessionmaker(bind=db_engine)
+        db = Session()
+        import_orders(db, io.BytesIO(generate_csv(rows)), "csv")
+        db.close()
+        print(f"{rows} orders")
+
+        def stream(fmt: str, fields=None):
+            columns = export_columns("orders", fields)
+            return lambda: sum(len(chunk) for chunk in stream_export("orders", fmt, columns, bind=db_engine))
+
+        def materialize():
+            db = Session()
+            try:
+                models = [OrderImportRow.model_validate(order, from_attributes=True) for order in db.query(Order).all()]
+                return len("[" + ",".join(model.model_dump_json() for model in models) + "]")
+            finally:
+                db.close()
+
+        measure("stream csv", stream("csv"))
+        measure("stream ndjson", stream("ndjson"))
+        measure("stream csv (3 columns)", stream("csv", ["id", "quantity", "created_at"]))
+        measure("ORM + Pydantic JSON list", materialize)
+        db_engine.dispose()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
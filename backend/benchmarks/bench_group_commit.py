@@ -0,0 +1,86 @@
+"""
+Benchmark: per-request commits versus the group-commit writer
+
+Concurrent clients keep updating stockyards, as bursts of yard scanner writes
+would. Each write either commits in its own transaction on the database thread
+pool, or joins a GroupCommitWriter batch. SQLite runs with synchronous=FULL so
+every commit pays for its fsync; because fsync is nearly free on a page-cached
+virtual disk, each commit also waits fsync_ms (default 2, a typical SSD flush)
+while it holds the write lock. Pass 0 to measure the bare filesystem.
+
+Run from the backend directory:
+    python -m benchmarks.bench_group_commit [seconds] [clients] [fsync_ms]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_db_engine, db_executor, engine_profile
+from app.core.group_commit import GroupCommitWriter
+from app.models.inventory import Inventory
+from app.schemas.inventory_schema import InventoryUpdate
+from app.services.inventory_service import update_stockyard
+
+ROWS = 1000
+
+async def run(name: str, write, seconds: float, clients: int, writer=None):
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    async def client(slot: int):
+        i = slot
+        while time.perf_counter() < deadline:
+            await write(f"SY-{i % ROWS:06d}", InventoryUpdate(material="Coal", capacity=float(i), location="23.6,86.1"))
+            counts[slot] += 1
+            i += clients
+
+    await asyncio.gather(*(client(slot) for slot in range(clients)))
+    if writer is not None:
+        await writer.stop()
+    extra = ""
+    if writer is not None:
+        metrics = writer.metrics()
+        extra = f", mean batch {metrics['mean_batch_size']:.1f}, max {metrics['max_batch_size']}"
+    print(f"{name:>16}: {sum(counts) / seconds:8,.0f} writes/s{extra}")
+
+async def main(seconds: float = 3.0, clients: int = 32, fsync_ms: float = 2.0):
+    with tempfile.TemporaryDirectory(prefix="rakevision-bench-") as directory:
+        profile = {**engine_profile("development"), "synchronous": "FULL"}
+        db_engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'writes.db')}", profile, echo=False)
+        Base.metadata.create_all(bind=db_engine, tables=[Inventory.__table__])
+        if fsync_ms:
+            event.listen(db_engine, "commit", lambda connection: time.sleep(fsync_ms / 1000))
+        Session = sessionmaker(bind=db_engine)
+        db = Session()
+        db.add_all([Inventory(stockyard_id=f"SY-{i:06d}", material="Coal", capacity=0.0, location="23.6,86.1")
+                    for i in range(ROWS)])
+        db.commit()
+        db.close()
+
+        loop = asyncio.get_running_loop()
+
+        def commit_alone(stockyard_id, update):
+            db = Session()
+            try:
+                return update_stockyard(db, stockyard_id, update)
+            finally:
+                db.close()
+
+        async def per_request(stockyard_id, update):
+            return await loop.run_in_executor(db_executor, commit_alone, stockyard_id, update)
+
+        await run("per request", per_request, seconds, clients)
+        writer = GroupCommitWriter(session_factory=Session)
+        await run("group commit", lambda stockyard_id, update: writer.submit(update_stockyard, stockyard_id, update),
+                  seconds, clients, writer)
+        db_engine.dispose()
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    asyncio.run(main(float(args[0]) if args else 3.0, int(args[1]) if len(args) > 1 else 32,
+                     float(args[2]) if len(args) > 2 else 2.0))
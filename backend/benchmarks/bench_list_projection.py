@@ -0,0 +1,77 @@
+"""
+Benchmark: list pages through ORM + Pydantic versus the tuple projection
+
+Times building the JSON body of a page of stockyards both ways: loading ORM
+entities and serializing them through the response model (what FastAPI does
+for response_model=List[Inventory]), and selecting the response columns as
+tuples encoded straight to JSON (Projection.response).
+
+Run from the backend directory:
+    python -m benchmarks.bench_list_projection [page_size] [repeats]
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_db_engine, engine_profile
+from app.models.inventory import Inventory
+from app.schemas.inventory_schema import Inventory as InventoryResponse
+from app.services.inventory_service import get_all_stockyards, get_stockyard_rows, stockyard_projection
+from app.utils.serialization import dumps
+
+ROWS = 20000
+
+def main(page_size: int = 1000, repeats: int = 20):
+    with tempfile.TemporaryDirectory(prefix="rakevision-bench-") as directory:
+        db_engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'list.db')}", engine_profile("development"), echo=False)
+        Base.metadata.create_all(bind=db_engine, tables=[Inventory.__table__])
+        Session = sessionmaker(bind=db_engine)
+        db = Session()
+        db.add_all([Inventory(stockyard_id=f"SY-{i:06d}", material=("Coal", "Iron Ore")[i % 2], capacity=float(i),
+                              location="23.6345,86.1432") for i in range(ROWS)])
+        db.commit()
+        db.close()
+
+        adapter = TypeAdapter(List[InventoryResponse])
+
+        def orm_page():
+            db = Session()
+            try:
+                stockyards = get_all_stockyards(db, limit=page_size)
+                return dumps(jsonable_encoder(adapter.validate_python(stockyards, from_attributes=True)))
+            finally:
+                db.close()
+
+        def projected_page(names):
+            def page():
+                db = Session()
+                try:
+                    rows = get_stockyard_rows(db, stockyard_projection.select_columns(names), limit=page_size)
+                    return stockyard_projection.response(names, rows, "stockyards", page_size).body
+                finally:
+                    db.close()
+            return page
+
+        variants = [
+            ("ORM + Pydantic", orm_page),
+            ("projection", projected_page(stockyard_projection.fields())),
+            ("projection, 2 fields", projected_page(stockyard_projection.fields("stockyard_id,capacity")))
+        ]
+        for name, page in variants:
+            page()
+            started = time.perf_counter()
+            for _ in range(repeats):
+                size = len(page())
+            elapsed = (time.perf_counter() - started) / repeats
+            print(f"{name:>22}: {elapsed * 1000:7.1f} ms per {page_size}-row page ({size / 1e3:.0f} kB)")
+        db_engine.dispose()
+
+if __name__ == "__main__":
+    args = sys.argv[1:3]
+    main(int(args[0]) if args else 1000, int(args[1]) if len(args) > 1 else 20)
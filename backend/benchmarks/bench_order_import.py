@@ -0,0 +1,80 @@
+"""
+Benchmark: bulk order import versus one create_order call per row
+
+Generates a CSV of orders, imports it with import_orders (chunked executemany
+transactions), and compares against rows added the way create_order adds them
+(one commit and refresh each). Peak memory is traced in a separate import, since
+tracing slows it down; it stays flat as the file grows.
+
+Run from the backend directory:
+    python -m benchmarks.bench_order_import [rows]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_db_engine, engine_profile
+from app.models.order import Order
+from app.models.rake import Rake  # noqa: F401 - registers the table orders.rake_id refers to
+from app.services.order_service import import_orders
+
+MATERIALS = ("Coal", "Iron Ore", "Limestone", "Steel Coils")
+
+def generate_csv(rows: int) -> bytes:
+    lines = ["customer_name,material,quantity,destination,priority"]
+    lines.extend(f"Customer {i},{MATERIALS[i % 4]},{(i % 500) + 1},City {i % 40},{(i % 5) + 1}" for i in range(rows))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def fresh_session(directory: str, name: str):
+    db_engine = create_db_engine(f"sqlite:///{os.path.join(directory, name)}", engine_profile("development"), echo=False)
+    Base.metadata.create_all(bind=db_engine)
+    return db_engine, sessionmaker(bind=db_engine)()
+
+def main(rows: int = 50000):
+    payload = generate_csv(rows)
+    with tempfile.TemporaryDirectory(prefix="rakevision-bench-") as directory:
+        db_engine, db = fresh_session(directory, "import.db")
+        started = time.perf_counter()
+        result = import_orders(db, io.BytesIO(payload), "csv")
+        elapsed = time.perf_counter() - started
+        count = db.query(Order).count()
+        db.close()
+        db_engine.dispose()
+        print(f"import_orders: {result['imported']} rows ({count} stored) in {elapsed:.2f}s "
+              f"= {result['imported'] / elapsed:,.0f} rows/s")
+
+        for name, size in (("small", min(rows, 5000)), ("large", rows)):
+            db_engine, db = fresh_session(directory, f"traced-{name}.db")
+            stream = io.BytesIO(generate_csv(size))
+            tracemalloc.start()
+            import_orders(db, stream, "csv")
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            db.close()
+            db_engine.dispose()
+            print(f"import_orders: peak {peak / 1e6:.1f} MB traced for {size} rows")
+
+        # One row at a time is slow, so time a sample and report its rate
+        sample = min(rows, 2000)
+        db_engine, db = fresh_session(directory, "single.db")
+        started = time.perf_counter()
+        for i in range(sample):
+            db_order = Order(id=f"ORD-{uuid.uuid4().hex[:8].upper()}", customer_name=f"Customer {i}",
+                             material=MATERIALS[i % 4], quantity=(i % 500) + 1, destination=f"City {i % 40}",
+                             origin="Bokaro", priority=(i % 5) + 1)
+            db.add(db_order)
+            db.commit()
+            db.refresh(db_order)
+        elapsed = time.perf_counter() - started
+        db.close()
+        db_engine.dispose()
+        print(f"one per call:  {sample} rows in {elapsed:.2f}s = {sample / elapsed:,.0f} rows/s")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,104 @@
+"""
+Benchmark: single-process engine vs. sharded simulation tick throughput
+
+Each tick advances the simulated clock by a minute with random events on and
+builds everything the service publishes and persists from it: positions,
+dashboard rake cards and rake table rows. Scaling depends on the number of
+cores, which is printed first.
+
+For each shard count it also reports the longest event-loop stall while
+ticking, once calling the coordinator directly (as the service used to) and
+once through ShardedSimulation.call (as the service does).
+
+Run from the backend directory:
+    python -m benchmarks.bench_sharding [rakes] [ticks] [max_shards]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+from app.simulation.engine import SimulationEngine
+from app.simulation.network import SIMULATION_CONFIG
+from app.simulation.sharding import ShardedSimulation
+
+TICK_SECONDS = 60.0
+
+def build_fleet(num_rakes: int) -> list:
+    destinations = [station["name"] for station in SIMULATION_CONFIG["stations"]] or ["Kolkata"]
+    return [
+        {
+            "id": f"R-{100000 + i}",
+            "from": "Bokaro",
+            "to": destinations[i % len(destinations)],
+            "progress": (i * 7) % 100,
+            "status": "In Transit",
+            "freight": "HR Coil",
+            "weight": 1200,
+            "utilization": 90
+        }
+        for i in range(num_rakes)
+    ]
+
+def run(engine, fleet: list, ticks: int) -> float:
+    engine.load_fleet(fleet)
+    start = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        engine.run_until(tick * TICK_SECONDS)
+        engine.positions()
+        engine.rake_cards()
+        engine.persisted_rows()
+    return ticks / (time.perf_counter() - start)
+
+async def loop_stall(engine: ShardedSimulation, ticks: int, off_loop: bool) -> float:
+    """
+    Longest gap (ms) between 1 ms heartbeats on the event loop while the engine ticks
+    """
+    longest = 0.0
+    ticking = True
+
+    async def heartbeat():
+        nonlocal longest
+        while ticking:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            longest = max(longest, time.perf_counter() - before)
+
+    beat = asyncio.create_task(heartbeat())
+    base = engine.clock
+    for tick in range(1, ticks + 1):
+        if off_loop:
+            await engine.call(engine.run_until, base + tick * TICK_SECONDS)
+        else:
+            engine.run_until(base + tick * TICK_SECONDS)
+            await asyncio.sleep(0)
+    ticking = False
+    await beat
+    return longest * 1000.0
+
+def main(num_rakes: int = 50000, ticks: int = 20, max_shards: int = 4):
+    fleet = build_fleet(num_rakes)
+    start_time = datetime.now()
+    print(f"{'cores':>16}: {os.cpu_count()}")
+
+    engine = SimulationEngine(seed=1, start_time=start_time, random_events=True, event_rate_per_hour=num_rakes / 10)
+    print(f"{'single process':>16}: {run(engine, fleet, ticks):8.2f} ticks/s for {num_rakes} rakes")
+
+    shards = 2
+    while shards <= max_shards:
+        sharded = ShardedSimulation(
+            shards, seed=1, start_time=start_time, random_events=True, event_rate_per_hour=num_rakes / 10
+        )
+        try:
+            print(f"{f'{shards} shards':>16}: {run(sharded, fleet, ticks):8.2f} ticks/s for {num_rakes} rakes")
+            blocking = asyncio.run(loop_stall(sharded, ticks, off_loop=False))
+            off_loop = asyncio.run(loop_stall(sharded, ticks, off_loop=True))
+            print(f"{'':>16}  longest loop stall {blocking:8.1f} ms blocking, {off_loop:6.1f} ms through call()")
+        finally:
+            sharded.close()
+        shards *= 2
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    main(*args)
@@ -0,0 +1,21 @@
+import pytest
+
+import app.core.database as database
+
+@pytest.fixture
+def scratch_db(tmp_path):
+    """
+    Point the application's engine and sessions at a freshly migrated SQLite database
+    """
+    db_engine = database.create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", echo=False)
+    primary, bind = database.engine, database.SessionLocal.kw["bind"]
+    database.engine = db_engine
+    database.SessionLocal.configure(bind=db_engine)
+    database.run_migrations()
+    try:
+        yield db_engine
+    finally:
+        database.configure_replicas([])
+        database.engine = primary
+        database.SessionLocal.configure(bind=bind)
+        db_engine.dispose()
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from app.simulation import backplane as backplane_module
+from app.simulation.backplane import UnixSocketBackplane
+
+class _Transport:
+    def __init__(self, buffered=0):
+        self.buffered = buffered
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+class _Peer:
+    def __init__(self, drain_seconds=0.0, buffered=0):
+        self.drain_seconds = drain_seconds
+        self.transport = _Transport(buffered)
+        self.frames = []
+        self.closed = False
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+    async def drain(self):
+        await asyncio.sleep(self.drain_seconds)
+
+    def close(self):
+        self.closed = True
+
+def test_relay_drains_peers_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(backplane_module, "PEER_WRITE_TIMEOUT_SECONDS", 0.2)
+    hub = UnixSocketBackplane(str(tmp_path / "backplane.sock"))
+    fast = _Peer()
+    stuck = [_Peer(drain_seconds=10), _Peer(drain_seconds=10)]
+    flooded = _Peer(buffered=backplane_module.PEER_BUFFER_LIMIT_BYTES + 1)
+    hub._peers.update([fast, flooded, *stuck])
+
+    start = time.monotonic()
+    asyncio.run(hub._relay(b"frame"))
+    elapsed = time.monotonic() - start
+
+    # Both stuck peers time out together rather than one after the other
+    assert elapsed < 0.35
+    assert hub._peers == {fast}
+    assert fast.frames == [b"frame"] and not fast.closed
+    assert flooded.closed and all(peer.closed for peer in stuck)
+
+def test_relay_skips_the_sender(tmp_path):
+    hub = UnixSocketBackplane(str(tmp_path / "backplane.sock"))
+    sender, other = _Peer(), _Peer()
+    hub._peers.update([sender, other])
+
+    asyncio.run(hub._relay(b"frame", exclude=sender))
+
+    assert sender.frames == []
+    assert other.frames == [b"frame"]
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from app.simulation.snapshot import SnapshotCache
+from app.utils.binary_frames import (
+    ENCODING_BINARY, ENCODING_JSON, MAX_STRING_BYTES,
+    decode_position_update, encode_message, encode_position_update
+)
+
+def _snapshot(rake_id="R-101"):
+    positions = {
+        "rakes": [
+            {
+                "rake_id": rake_id,
+                "position": {"lat": 23.6345, "lng": 86.1432},
+                "status": "in_transit",
+                "speed": 47.3,
+                "destination": "Bhilai",
+                "eta": "2026-10-19T14:30:00",
+                "utilization": 91.7,
+                "load_details": "Coal 3200t"
+            },
+            {
+                "rake_id": "R-102",
+                "position": {"lat": 21.2094, "lng": 81.3785},
+                "status": "loading",
+                "speed": 0.0,
+                "destination": "Bhilai",
+                "eta": None,
+                "utilization": 0.0,
+                "load_details": ""
+            }
+        ],
+        "timestamp": "2026-10-19T12:00:00"
+    }
+    snapshot = SnapshotCache().update(positions, [])
+    snapshot.timestamp = positions["timestamp"]
+    return snapshot
+
+def test_json_round_trip():
+    snapshot = _snapshot()
+
+    decoded = json.loads(snapshot.frame(ENCODING_JSON))
+
+    assert decoded == snapshot.message
+
+def test_binary_round_trip():
+    snapshot = _snapshot()
+
+    frame = snapshot.frame(ENCODING_BINARY)
+    decoded = decode_position_update(frame)
+
+    assert isinstance(frame, bytes)
+    assert decoded["type"] == "position_update"
+    assert decoded["timestamp"] == snapshot.timestamp
+    assert decoded["data"] == snapshot.positions
+
+def test_binary_keeps_coordinate_precision():
+    snapshot = _snapshot()
+
+    decoded = decode_position_update(snapshot.frame(ENCODING_BINARY))
+
+    for rake, expected in zip(decoded["data"]["rakes"], snapshot.positions["rakes"]):
+        assert rake["position"]["lat"] == pytest.approx(expected["position"]["lat"], abs=1e-9)
+        assert rake["position"]["lng"] == pytest.approx(expected["position"]["lng"], abs=1e-9)
+        assert rake["speed"] == pytest.approx(expected["speed"], abs=1e-9)
+        assert rake["utilization"] == pytest.approx(expected["utilization"], abs=1e-9)
+
+def test_binary_matches_json():
+    snapshot = _snapshot()
+
+    from_json = json.loads(snapshot.frame(ENCODING_JSON))
+    from_binary = decode_position_update(snapshot.frame(ENCODING_BINARY))
+
+    assert from_binary == from_json
+
+def test_other_messages_stay_json():
+    message = {"type": "event", "data": {"seq": 1}}
+
+    assert json.loads(encode_message(message, ENCODING_BINARY)) == message
+
+def test_decode_rejects_other_frames():
+    frame = bytearray(encode_position_update(_snapshot().message))
+    frame[0:2] = b"XX"
+
+    with pytest.raises(ValueError):
+        decode_position_update(bytes(frame))
+
+def test_overlong_string_raises_value_error():
+    message = _snapshot("R" * (MAX_STRING_BYTES + 1)).message
+
+    with pytest.raises(ValueError, match="rake_id"):
+        encode_position_update(message)
+
+def test_overlong_string_falls_back_to_json():
+    message = _snapshot("R" * (MAX_STRING_BYTES + 1)).message
+
+    frame = encode_message(message, ENCODING_BINARY)
+
+    assert isinstance(frame, str)
+    assert json.loads(frame) == message
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.order import Order
+from app.models.rake import Rake
+from app.services.order_service import order_cache
+from app.services.rake_service import rake_cache
+
+@pytest.fixture
+def client(scratch_db):
+    db = SessionLocal()
+    db.add(Rake(id="R1", wagons=58, capacity=3500, status="In Transit"))
+    db.add(Order(id="ORD-1", customer_name="Tata", material="Coal", quantity=1200.0,
+                 destination="Kolkata", priority=1, rake_id="R1"))
+    db.commit()
+    db.close()
+    order_cache.clear()
+    rake_cache.clear()
+    yield TestClient(app)
+    order_cache.clear()
+    rake_cache.clear()
+
+@pytest.mark.parametrize("path, field, entity_id", [
+    ("/api/orders/ORD-1", "order_id", "ORD-1"),
+    ("/api/rake/R1", "rake_id", "R1")
+])
+def test_entity_etag(client, path, field, entity_id):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.json()[field] == entity_id
+    etag = response.headers["ETag"]
+
+    # Served from the entity cache, with the same ETag
+    cached = client.get(path)
+    assert cached.status_code == 200
+    assert cached.headers["ETag"] == etag
+
+    not_modified = client.get(path, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+    changed = client.get(path, headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
+
+def test_missing_entity_is_404(client):
+    assert client.get("/api/orders/ORD-404").status_code == 404
@@ -0,0 +1,37 @@
+import json
+from datetime import date, datetime, timezone
+
+from app.core.database import SessionLocal
+from app.models.order import Order
+from app.services.export_service import _day_start, stream_export
+
+def _order(order_id, created_at):
+    return Order(
+        id=order_id, customer_name="Bhilai Steel Plant", material="Coal",
+        quantity=3200, destination="Bhilai", created_at=created_at
+    )
+
+def test_day_bounds_are_utc_aware():
+    start = _day_start(date(2026, 10, 19))
+
+    assert start == datetime(2026, 10, 19, tzinfo=timezone.utc)
+    assert start.utcoffset().total_seconds() == 0
+
+def test_export_date_range_covers_whole_utc_days(scratch_db):
+    with SessionLocal() as db:
+        db.query(Order).delete()
+        db.add_all([
+            _order("ORD-BEFORE", datetime(2026, 10, 18, 23, 59, 59, tzinfo=timezone.utc)),
+            _order("ORD-FIRST", datetime(2026, 10, 19, 0, 0, tzinfo=timezone.utc)),
+            _order("ORD-LAST", datetime(2026, 10, 19, 23, 59, 59, tzinfo=timezone.utc)),
+            _order("ORD-AFTER", datetime(2026, 10, 20, 0, 0, tzinfo=timezone.utc))
+        ])
+        db.commit()
+
+    chunks = stream_export(
+        "orders", "ndjson", ["id"],
+        date_from=date(2026, 10, 19), date_to=date(2026, 10, 19), bind=scratch_db
+    )
+    rows = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+
+    assert [row["id"] for row in rows] == ["ORD-FIRST", "ORD-LAST"]
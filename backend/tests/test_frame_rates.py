@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from app.services import simulation_service
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, frame):
+        self.sent.append(frame)
+
+def test_coalesced_frame_is_flushed(monkeypatch):
+    socket = _Socket()
+    monkeypatch.setitem(simulation_service.active_connections, "c1", socket)
+    simulation_service.set_client_rate("c1", 20)
+
+    async def run():
+        now = time.monotonic()
+        assert simulation_service._admit_frame("c1", "first", now)
+        assert not simulation_service._admit_frame("c1", "second", now)
+        assert not simulation_service._admit_frame("c1", "latest", now)
+
+        await asyncio.sleep(0.1)
+
+    try:
+        asyncio.run(run())
+    finally:
+        simulation_service.connection_rates.pop("c1", None)
+
+    assert socket.sent == ["latest"]
+    assert not simulation_service._flush_tasks
@@ -0,0 +1,20 @@
+from app.simulation.montecarlo import plan_to_fleet, run_monte_carlo
+
+# One order split across two stockyards, the second allocation needing two rakes
+SPLIT_PLAN = [
+    {"order_id": "O1", "from_stockyard": "Bokaro Main Yard", "destination": "Kolkata", "quantity": 3000},
+    {"order_id": "O1", "from_stockyard": "Durgapur Yard", "destination": "Kolkata", "quantity": 5000}
+]
+
+def test_split_order_gets_unique_rake_ids():
+    fleet = plan_to_fleet(SPLIT_PLAN)
+
+    ids = [rake["id"] for rake in fleet]
+    assert ids == ["O1-1-1", "O1-2-1", "O1-2-2"]
+    assert [rake["weight"] for rake in fleet] == [3000.0, 4000.0, 1000.0]
+
+def test_every_rake_keeps_its_distribution():
+    result = run_monte_carlo(SPLIT_PLAN, replications=4, days=2, workers=1)
+
+    assert result["rakes"] == 3
+    assert sorted(result["arrival_hours"]) == ["O1-1-1", "O1-2-1", "O1-2-2"]
@@ -0,0 +1,65 @@
+"""
+The main service queries must use the hot-filter indexes from the migrations
+
+Each service call runs against a freshly migrated SQLite database while the
+SQL it executes is captured; EXPLAIN QUERY PLAN must show the expected index.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.database import SessionLocal
+from app.models.rake import Rake
+from app.services.inventory_service import get_all_stockyards
+from app.services.order_service import get_all_orders, get_order_rows, order_projection
+from app.services.rake_service import get_all_rakes
+from app.services.simulation_service import fetch_active_fleet
+
+CHECKS = [
+    ("orders by status", lambda db: get_all_orders(db, status="Pending"), "ix_orders_status"),
+    ("order page after a cursor", lambda db: get_all_orders(db, status="Pending", after="ORD-1"), "ix_orders_status"),
+    ("orders by status and priority", lambda db: get_all_orders(db, status="Pending", priority=1), "ix_orders_status_priority"),
+    ("orders by priority", lambda db: get_all_orders(db, priority=1), "ix_orders_priority"),
+    ("order rows by status",
+     lambda db: get_order_rows(db, order_projection.select_columns(["order_id", "quantity"]), status="Pending"),
+     "ix_orders_status"),
+    ("rakes by status", lambda db: get_all_rakes(db, status="In Transit"), "ix_rakes_status"),
+    ("stockyards by material", lambda db: get_all_stockyards(db, material="Coal"), "ix_stockyards_material"),
+    ("stockyard page after a cursor", lambda db: get_all_stockyards(db, material="Coal", after="SY-1"), "ix_stockyards_material"),
+    ("active fleet", fetch_active_fleet, ("ix_rakes_active", "ix_rakes_status")),
+    ("active fleet destinations", fetch_active_fleet, "ix_orders_rake_id")
+]
+
+def capture(db_engine, call):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        call()
+    finally:
+        event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+@pytest.fixture
+def db(scratch_db):
+    db = SessionLocal()
+    db.add(Rake(id="R1", wagons=58, capacity=3500, status="In Transit"))
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("call, expected", [check[1:] for check in CHECKS], ids=[check[0] for check in CHECKS])
+def test_query_uses_index(scratch_db, db, call, expected):
+    expected = expected if isinstance(expected, tuple) else (expected,)
+
+    plans = []
+    with scratch_db.connect() as connection:
+        for statement, parameters in capture(scratch_db, lambda: call(db)):
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append(" | ".join(row[-1] for row in rows))
+
+    assert any(f"INDEX {index} " in f"{plan} " for plan in plans for index in expected), plans
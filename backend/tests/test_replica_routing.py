@@ -0,0 +1,76 @@
+"""
+Read/write session routing against two local SQLite files
+
+The scratch primary is copied to a scratch "replica" that never catches up.
+Writes must reach the primary only, reads in other requests must come from
+the replica, and reads later in the writing request must see the write.
+Each asyncio.run stands for one request, running in its own task context.
+"""
+import asyncio
+import shutil
+
+import pytest
+
+import app.core.database as database
+from app.models.rake import Rake
+from app.schemas.inventory_schema import InventoryCreate
+from app.services.inventory_service import create_stockyard_async, get_all_stockyards_async, get_stockyard_rows_async
+from app.services.inventory_service import stockyard_projection
+from app.services.simulation_service import read_active_fleet, read_active_rake_ids
+
+def stockyard_ids(rows) -> list:
+    return [getattr(row, "stockyard_id", None) or row[0] for row in rows]
+
+@pytest.fixture
+def replica(scratch_db, tmp_path):
+    scratch_db.dispose()
+    replica_path = tmp_path / "replica.db"
+    shutil.copyfile(tmp_path / "test.db", replica_path)
+    database.configure_replicas([f"sqlite:///{replica_path}"])
+    return replica_path
+
+def test_writing_request_reads_its_own_writes(replica):
+    async def write_then_read():
+        await create_stockyard_async(stockyard=InventoryCreate(
+            stockyard_id="SY-RW-1", material="Coal", capacity=100.0, location="23.6,86.1"))
+        assert database.pinned_to_primary.get()
+        return await get_all_stockyards_async(material="Coal")
+
+    assert "SY-RW-1" in stockyard_ids(asyncio.run(write_then_read()))
+
+def test_other_requests_read_the_replica(replica):
+    asyncio.run(create_stockyard_async(stockyard=InventoryCreate(
+        stockyard_id="SY-RW-1", material="Coal", capacity=100.0, location="23.6,86.1")))
+
+    async def read_only_request():
+        assert not database.pinned_to_primary.get()
+        rows = await get_all_stockyards_async(material="Coal")
+        projected = await get_stockyard_rows_async(stockyard_projection.select_columns(["stockyard_id"]))
+        return rows, projected
+
+    rows, projected = asyncio.run(read_only_request())
+
+    assert "SY-RW-1" not in stockyard_ids(rows)
+    assert "SY-RW-1" not in stockyard_ids(projected)
+
+def test_reads_use_the_primary_without_replicas(replica):
+    asyncio.run(create_stockyard_async(stockyard=InventoryCreate(
+        stockyard_id="SY-RW-1", material="Coal", capacity=100.0, location="23.6,86.1")))
+    database.configure_replicas([])
+
+    rows = asyncio.run(get_all_stockyards_async(material="Coal"))
+
+    assert "SY-RW-1" in stockyard_ids(rows)
+
+def test_simulation_polling_reads_the_replica(replica):
+    db = database.SessionLocal()
+    db.add(Rake(id="R-NEW", wagons=58, capacity=3500, status="In Transit"))
+    db.commit()
+    db.close()
+
+    assert "R-NEW" not in {rake["id"] for rake in read_active_fleet()}
+    assert "R-NEW" not in read_active_rake_ids()
+
+    database.configure_replicas([])
+    assert "R-NEW" in {rake["id"] for rake in read_active_fleet()}
+    assert "R-NEW" in read_active_rake_ids()
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.simulation.engine import SimulationEngine
+from app.simulation.sharding import ShardedSimulation
+
+START = datetime(2026, 10, 19, 9, 30)
+
+FLEET = [
+    {"id": f"R{i}", "from": "Bokaro", "to": destination, "progress": progress, "status": status,
+     "freight": "HR Coil", "weight": 1200, "utilization": 90}
+    for i, (destination, progress, status) in enumerate([
+        ("CMO Kolkata", 45, "In Transit"),
+        ("Durgapur", 78, "In Transit"),
+        ("CMO Mumbai", 99, "Arriving"),
+        ("Customer B456", 0, "Loading"),
+        ("Kolkata Terminal", 100, "Arrived")
+    ])
+]
+
+@pytest.fixture(scope="module")
+def engines():
+    single = SimulationEngine(seed=1, start_time=START)
+    sharded = ShardedSimulation(2, seed=1, start_time=START)
+    try:
+        for engine in (single, sharded):
+            engine.load_fleet(FLEET)
+            engine.run_until(5400.0)
+        yield single, sharded
+    finally:
+        sharded.close()
+
+def _eta_seconds(value):
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+def test_positions_match_single_process(engines):
+    single, sharded = engines
+
+    expected, merged = single.positions(), sharded.positions()
+
+    assert merged["timestamp"] == expected["timestamp"]
+    for ours, theirs in zip(merged["rakes"], expected["rakes"]):
+        assert {**ours, "position": None, "eta": None} == {**theirs, "position": None, "eta": None}
+        assert ours["position"] == pytest.approx(theirs["position"])
+        assert _eta_seconds(ours["eta"]) == pytest.approx(_eta_seconds(theirs["eta"]), abs=1e-3)
+
+def test_cards_and_rows_match_single_process(engines):
+    single, sharded = engines
+
+    assert sharded.rake_cards() == single.rake_cards()
+    for ours, theirs in zip(sharded.persisted_rows(), single.persisted_rows()):
+        assert ours["id"] == theirs["id"]
+        assert ours["status"] == theirs["status"]
+        assert ours["transit_progress"] == pytest.approx(theirs["transit_progress"])
+        assert (ours["eta"] - theirs["eta"]).total_seconds() == pytest.approx(0, abs=1e-3)
+
+def test_call_runs_off_the_event_loop(engines):
+    _, sharded = engines
+
+    async def tick():
+        return await sharded.call(sharded.sync)
+
+    assert asyncio.run(tick()) == sharded.clock
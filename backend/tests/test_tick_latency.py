@@ -0,0 +1,138 @@
+import asyncio
+import time
+from contextlib import contextmanager
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+import app.services.simulation_service as simulation_service
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.main import app
+from app.models.inventory import Inventory
+from app.simulation.backplane import create_backplane
+from app.simulation.engine import SimulationEngine
+from app.simulation.snapshot import SnapshotCache
+
+TICK_SECONDS = 0.2
+# Each slowed query holds its thread this long; a query on the event loop would stall every tick by as much
+QUERY_SECONDS = 0.3
+# Allowed drift of a tick from its schedule, well below QUERY_SECONDS
+TOLERANCE_SECONDS = 0.1
+
+class FakeWebSocket:
+    """
+    Records when each broadcast frame reaches this client
+    """
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, data: str):
+        self.received.append(time.monotonic())
+
+    async def send_bytes(self, data: bytes):
+        self.received.append(time.monotonic())
+
+@contextmanager
+def slow_queries(db_engine, table: str):
+    # Every statement touching the table sleeps on whichever thread runs it
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if f"FROM {table}" in statement:
+            time.sleep(QUERY_SECONDS)
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+async def longest_stall(work) -> float:
+    """
+    Longest gap between 10 ms heartbeats on the event loop while work() runs
+    """
+    longest = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal longest
+        while running:
+            before = time.monotonic()
+            await asyncio.sleep(0.01)
+            longest = max(longest, time.monotonic() - before - 0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    # Let the heartbeat start before work() can block the loop
+    await asyncio.sleep(0)
+    try:
+        await work()
+    finally:
+        running = False
+        await beat
+    return longest
+
+@pytest.fixture
+def simulation(scratch_db, monkeypatch):
+    # A fresh engine, snapshot cache and backplane, without checkpoints
+    monkeypatch.setattr(settings, "SIMULATION_CHECKPOINT_DIR", "")
+    monkeypatch.setattr(simulation_service, "checkpoint_store", None)
+    monkeypatch.setattr(simulation_service, "simulation_engine", SimulationEngine())
+    monkeypatch.setattr(simulation_service, "snapshots", SnapshotCache())
+    monkeypatch.setattr(simulation_service, "backplane", create_backplane("inprocess"))
+    return scratch_db
+
+def test_ticks_keep_schedule_under_slow_rest_traffic(simulation):
+    db = SessionLocal()
+    db.add_all([Inventory(stockyard_id=f"SY-{i}", material="Coal", capacity=100.0, location="23.6,86.1") for i in range(50)])
+    db.commit()
+    db.close()
+    websocket = FakeWebSocket()
+    completed = []
+
+    async def scenario():
+        simulation_service.active_connections["load-test"] = websocket
+        await simulation_service.start_backplane()
+        await simulation_service.start_simulation_loop(tick_interval=TICK_SECONDS)
+        stop = asyncio.Event()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                async def rest_client():
+                    while not stop.is_set():
+                        response = await client.get("/api/inventory/stockyards", params={"material": "Coal"})
+                        assert response.status_code == 200
+                        completed.append(response)
+
+                with slow_queries(simulation, "stockyards"):
+                    clients = [asyncio.create_task(rest_client()) for _ in range(4)]
+                    await asyncio.sleep(2.0)
+                    stop.set()
+                    await asyncio.gather(*clients)
+        finally:
+            simulation_service.remove_connection("load-test")
+            await simulation_service.simulation_loops.shutdown()
+            await simulation_service.stop_backplane()
+
+    asyncio.run(scenario())
+
+    gaps = [current - previous for previous, current in zip(websocket.received, websocket.received[1:])]
+    assert len(completed) >= 8
+    assert len(gaps) >= 5
+    assert max(abs(gap - TICK_SECONDS) for gap in gaps) < TOLERANCE_SECONDS
+
+def test_snapshot_and_controls_load_the_fleet_off_the_loop(simulation):
+    async def first_snapshot():
+        snapshot = await simulation_service.current_snapshot()
+        assert len(snapshot.positions["rakes"]) == len(simulation_service.SAMPLE_FLEET)
+
+    async def stop_and_reload():
+        assert await simulation_service.apply_control("stop") == "stopped"
+
+    async def scenario():
+        with slow_queries(simulation, "rakes"):
+            return await longest_stall(first_snapshot), await longest_stall(stop_and_reload)
+
+    first, stop = asyncio.run(scenario())
+
+    assert first < TOLERANCE_SECONDS
+    assert stop < TOLERANCE_SECONDS